@@ -0,0 +1,91 @@
+"""
+Micro-benchmarks for tg-react.
+
+Run them from the repository root, e.g. ``python -m benchmarks.settings_access``.
+They use the demo project settings (``dummy_settings``) and are not collected by pytest.
+
+``python -m benchmarks.suite`` runs the whole accounts API / middleware suite and stores the
+results as JSON in ``.benchmarks/``, ``python -m benchmarks.compare`` compares two such files.
+``python -m benchmarks.loadtest`` measures latency percentiles of the demo project under real
+WSGI and ASGI servers and stores them in the same format.
+"""
+import json
+import os
+import platform
+import subprocess
+import timeit
+from datetime import datetime, timezone
+
+
+RESULTS_DIR = ".benchmarks"
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dummy_settings")
+
+    import django  # NOQA
+
+    django.setup()
+
+
+def measure(func, number=10000, repeat=5):
+    """Return the best per-call time of ``func`` in microseconds"""
+    timings = timeit.repeat(func, number=number, repeat=repeat)
+
+    return min(timings) / number * 1e6
+
+
+def report(name, results):
+    print(name)
+    for label, usec in results:
+        print(f"  {label:<40} {usec:10.3f} us/call")
+
+
+def results_path(name_or_path):
+    """Accept a path to a results file or the name of one stored in RESULTS_DIR"""
+    if os.path.sep in name_or_path or name_or_path.endswith(".json"):
+        return name_or_path
+
+    return os.path.join(RESULTS_DIR, f"{name_or_path}.json")
+
+
+def save_results(name_or_path, data):
+    path = results_path(name_or_path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+    return path
+
+
+def load_results(name_or_path):
+    with open(results_path(name_or_path), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_metadata(**extra):
+    """Describe the environment the results were measured in"""
+    import django  # NOQA
+    import rest_framework  # NOQA
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "djangorestframework": rest_framework.VERSION,
+        "platform": platform.platform(),
+        **extra,
+    }
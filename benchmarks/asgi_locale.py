@@ -0,0 +1,134 @@
+"""
+Requests per second through Django's ASGI handler with tg_react's LocaleMiddleware
+running natively async versus forced into sync mode (one sync_to_async thread hop per request).
+
+Requests are driven in-process against the demo project's async ``/test-language-async/`` view,
+once with a fully async middleware stack and once with the demo project's stack. Note that in the
+latter the MiddlewareMixin based Django middleware hop to a thread per middleware when they run in
+async mode, while a sync only middleware at the end of the stack collapses them into one sync chain.
+For numbers under a real server run ``uvicorn example.asgi:application`` from ``demo/`` and use
+any HTTP load generator.
+"""
+import asyncio
+import time
+
+from benchmarks import setup_django
+
+from asgiref.sync import markcoroutinefunction
+
+from tg_react.middleware import LocaleMiddleware
+
+
+class SyncOnlyLocaleMiddleware(LocaleMiddleware):
+    """LocaleMiddleware as it behaved before it was async capable"""
+
+    async_capable = False
+
+
+class AnonymousUserMiddleware:
+    """Async stand-in for the session and auth middleware
+
+    Django's own MiddlewareMixin based middleware hop to a thread for every request on their own,
+    so they are left out to measure only the LocaleMiddleware difference.
+    """
+
+    sync_capable = False
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        markcoroutinefunction(self)
+
+    async def __call__(self, request):
+        from django.contrib.auth.models import AnonymousUser  # NOQA
+
+        request.user = AnonymousUser()
+        return await self.get_response(request)
+
+
+def make_scope(path):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("ascii"),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"accept-language", b"et,en;q=0.8"),
+        ],
+        "server": ("localhost", 80),
+        "client": ("127.0.0.1", 50000),
+    }
+
+
+async def drive(application, total, concurrency, path="/test-language-async/"):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+
+    async def worker(count):
+        for _ in range(count):
+            await application(make_scope(path), receive, send)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker(total // concurrency) for _ in range(concurrency)])
+
+    return total / (time.perf_counter() - started)
+
+
+def main(total=5000, concurrency=50):
+    setup_django()
+
+    from django.conf import settings  # NOQA
+    from django.core.handlers.asgi import ASGIHandler  # NOQA
+    from django.test import override_settings  # NOQA
+
+    variants = [
+        ("sync only (before)", "benchmarks.asgi_locale.SyncOnlyLocaleMiddleware"),
+        ("async capable (after)", "tg_react.middleware.LocaleMiddleware"),
+    ]
+    stacks = [
+        (
+            "async middleware stack",
+            lambda locale_middleware: [
+                "benchmarks.asgi_locale.AnonymousUserMiddleware",
+                locale_middleware,
+            ],
+        ),
+        (
+            "demo project middleware stack",
+            lambda locale_middleware: [
+                locale_middleware
+                if path == "tg_react.middleware.LocaleMiddleware"
+                else path
+                for path in settings.MIDDLEWARE
+            ],
+        ),
+    ]
+
+    for stack_label, build_stack in stacks:
+        print(
+            f"ASGI req/s with {stack_label}, {total} requests, concurrency {concurrency}"
+        )
+
+        for label, middleware_path in variants:
+            with override_settings(MIDDLEWARE=build_stack(middleware_path)):
+                application = ASGIHandler()
+
+                # warm up caches and the thread pool
+                asyncio.run(drive(application, 200, 10))
+                rps = asyncio.run(drive(application, total, concurrency))
+
+            print(f"  {label:<40} {rps:10.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
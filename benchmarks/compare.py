@@ -0,0 +1,89 @@
+"""
+Compare two ``benchmarks.suite`` result files and flag regressions.
+
+    python -m benchmarks.compare BASELINE [CURRENT] [--threshold 10]
+
+Files are given as paths or names in ``.benchmarks/``, CURRENT defaults to ``latest``. Exits with
+status 1 when any benchmark is more than ``--threshold`` percent slower than in the baseline.
+"""
+import argparse
+import sys
+
+from benchmarks import load_results
+
+
+def compare(baseline, current, threshold):
+    """Return (rows, regressions), rows are (name, baseline usec, current usec, change %)"""
+    rows = []
+    regressions = []
+
+    for name in sorted(set(baseline["results"]) | set(current["results"])):
+        before = baseline["results"].get(name, {}).get("usec")
+        after = current["results"].get(name, {}).get("usec")
+
+        change = None
+        if before and after is not None:
+            change = (after - before) / before * 100
+
+            if change > threshold:
+                regressions.append(name)
+
+        rows.append((name, before, after, change))
+
+    return rows, regressions
+
+
+def format_usec(usec):
+    return "-" if usec is None else f"{usec:.3f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("baseline")
+    parser.add_argument("current", nargs="?", default="latest")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Slowdown in percent reported as a regression (default: 10)",
+    )
+    options = parser.parse_args(argv)
+
+    baseline = load_results(options.baseline)
+    current = load_results(options.current)
+
+    rows, regressions = compare(baseline, current, options.threshold)
+
+    print(f"{'benchmark':<40} {'baseline us':>12} {'current us':>12} {'change':>9}")
+    for name, before, after, change in rows:
+        if change is None:
+            status = "missing" if after is None else "new"
+            change_text = ""
+        else:
+            status = "REGRESSION" if name in regressions else ""
+            change_text = f"{change:+.1f}%"
+
+        print(
+            f"{name:<40} {format_usec(before):>12} {format_usec(after):>12} "
+            f"{change_text:>9} {status}".rstrip()
+        )
+
+    for key in ("commit", "python", "django", "fast_hasher"):
+        before = baseline.get("meta", {}).get(key)
+        after = current.get("meta", {}).get(key)
+        if before != after:
+            print(f"note: {key} differs ({before} -> {after})")
+
+    if regressions:
+        print(
+            f"{len(regressions)} regression(s) over {options.threshold:g}%: "
+            + ", ".join(regressions)
+        )
+        return 1
+
+    print("No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Compare DRF's JSONRenderer/JSONParser with the orjson ones on UserDetailsSerializer payloads.
+"""
+import io
+
+from benchmarks import measure, report, setup_django
+
+
+def main():
+    setup_django()
+
+    from django.contrib.auth import get_user_model  # NOQA
+    from django.utils import timezone  # NOQA
+    from rest_framework.parsers import JSONParser  # NOQA
+    from rest_framework.renderers import JSONRenderer  # NOQA
+
+    from tg_react.api.accounts.serializers import UserDetailsSerializer  # NOQA
+    from tg_react.api.fast_json import ORJSONParser, ORJSONRenderer  # NOQA
+
+    user = get_user_model()(
+        pk=1,
+        username="foo",
+        first_name="Foo",
+        last_name="Bar",
+        email="foo@bar.baz",
+        date_joined=timezone.now(),
+        last_login=timezone.now(),
+    )
+    data = UserDetailsSerializer(user).data
+    content = JSONRenderer().render(data)
+
+    results = []
+    for label, renderer in (
+        ("render JSONRenderer", JSONRenderer()),
+        ("render ORJSONRenderer", ORJSONRenderer()),
+    ):
+        results.append((label, measure(lambda: renderer.render(data), number=20000)))
+
+    for label, parser in (
+        ("parse JSONParser", JSONParser()),
+        ("parse ORJSONParser", ORJSONParser()),
+    ):
+        results.append(
+            (label, measure(lambda: parser.parse(io.BytesIO(content)), number=20000))
+        )
+
+    report("UserDetailsSerializer payload", results)
+
+
+if __name__ == "__main__":
+    main()
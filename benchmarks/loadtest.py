@@ -0,0 +1,633 @@
+"""
+Load test of the demo project under real WSGI and ASGI servers.
+
+    python -m benchmarks.loadtest --save baseline
+    # ... change things ...
+    python -m benchmarks.loadtest
+    python -m benchmarks.compare loadtest-baseline loadtest-latest
+
+Each server is started in a subprocess against a throwaway SQLite database: the WSGI one is
+runserver's threaded server (without autoreload), the ASGI one the first installed of uvicorn,
+daphne and hypercorn (``--asgi-server`` picks one, ASGI runs are skipped when none is installed).
+``--url`` runs against an already started server instead, its database needs the users created
+by ``python -m benchmarks.loadtest_server prepare CONCURRENCY``.
+
+``--concurrency`` virtual users, driven by asyncio over keep-alive HTTP/1.1 connections, log in
+and then pick requests from ``--mix`` (``/me`` polling, language switches, logins, signups and
+password recovery) for ``--duration`` seconds after ``--warmup``. Latency percentiles
+(p50/p95/p99) and throughput are reported per endpoint and stored as JSON
+(``.benchmarks/loadtest-latest.json`` by default). The ``usec`` of each entry is its p50, so
+``benchmarks.compare`` works with these files too.
+
+Logins and signups are dominated by password hashing, ``--fast-hasher`` uses MD5 there.
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+
+import benchmarks
+from benchmarks import save_results
+from benchmarks.loadtest_server import PASSWORD, get_username
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = "me=70,lang=10,login=10,signup=5,forgot_password=5"
+
+ASGI_SERVERS = {
+    "uvicorn": lambda host, port: [
+        "-m",
+        "uvicorn",
+        "example.asgi:application",
+        "--host",
+        host,
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+        "--no-access-log",
+    ],
+    "daphne": lambda host, port: [
+        "-m",
+        "daphne",
+        "-b",
+        host,
+        "-p",
+        str(port),
+        "example.asgi:application",
+    ],
+    "hypercorn": lambda host, port: [
+        "-m",
+        "hypercorn",
+        "--bind",
+        f"{host}:{port}",
+        "example.asgi:application",
+    ],
+}
+
+
+class HTTPConnection:
+    """Minimal keep-alive HTTP/1.1 client connection on asyncio streams"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+
+        self.reader = self.writer = None
+
+    async def request(self, method, path, headers=(), body=b""):
+        """Return (status, [(header, value)], body)"""
+        # The server may close an idle keep-alive connection, retry once on a new one
+        reused = self.writer is not None
+        try:
+            return await self._request(method, path, headers, body)
+
+        except (ConnectionError, asyncio.IncompleteReadError):
+            await self.close()
+            if not reused:
+                raise
+
+        return await self._request(method, path, headers, body)
+
+    async def _request(self, method, path, headers, body):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+
+        lines = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            f"Content-Length: {len(body)}",
+            *(f"{name}: {value}" for name, value in headers),
+        ]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by the server")
+
+        version, status = status_line.decode("latin-1").split(" ", 2)[:2]
+
+        response_headers = []
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers.append((name.strip().lower(), value.strip()))
+
+        header_map = dict(response_headers)
+        if "chunked" in header_map.get("transfer-encoding", ""):
+            response_body = await self._read_chunked()
+        elif "content-length" in header_map:
+            response_body = await self.reader.readexactly(
+                int(header_map["content-length"])
+            )
+        else:
+            response_body = await self.reader.read()
+            header_map["connection"] = "close"
+
+        if version == "HTTP/1.0" or header_map.get("connection", "") == "close":
+            await self.close()
+
+        return int(status), response_headers, response_body
+
+    async def _read_chunked(self):
+        chunks = []
+        while True:
+            size = int((await self.reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                # Trailers end with an empty line
+                while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+
+
+class Recorder:
+    """Latencies and statuses per endpoint, requests started before ``start`` are ignored"""
+
+    def __init__(self, start=0.0):
+        self.start = start
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def record(self, endpoint, started, elapsed, status):
+        if started < self.start:
+            return
+
+        self.latencies[endpoint].append(elapsed)
+        self.statuses[endpoint][status] += 1
+
+
+class VirtualUser:
+    def __init__(self, connection, recorder, index, rng):
+        self.connection = connection
+        self.recorder = recorder
+        self.username = get_username(index)
+        self.rng = rng
+        self.cookies = {}
+
+    async def call(self, endpoint, method, path, data=None, anonymous=False):
+        """Request ``path`` with the user's cookies (unless ``anonymous``) and record it as
+        ``endpoint``, returns the status (``error`` when the connection failed)"""
+        cookies = {} if anonymous else self.cookies
+        headers = [("Accept", "application/json")]
+
+        if cookies:
+            headers.append(
+                (
+                    "Cookie",
+                    "; ".join(f"{name}={value}" for name, value in cookies.items()),
+                )
+            )
+        if "csrftoken" in cookies:
+            headers.append(("X-CSRFToken", cookies["csrftoken"]))
+
+        body = b""
+        if data is not None:
+            body = json.dumps(data).encode()
+            headers.append(("Content-Type", "application/json"))
+
+        started = time.perf_counter()
+        try:
+            status, response_headers, _body = await self.connection.request(
+                method, path, headers, body
+            )
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            status, response_headers = "error", []
+            await self.connection.close()
+
+        self.recorder.record(endpoint, started, time.perf_counter() - started, status)
+
+        if not anonymous:
+            update_cookies(self.cookies, response_headers)
+
+        return status
+
+    async def login(self):
+        return await self.call(
+            "login",
+            "POST",
+            "/api/login",
+            {"username": self.username, "password": PASSWORD},
+        )
+
+    async def me(self):
+        return await self.call("me", "GET", "/api/me")
+
+    async def lang(self):
+        language = self.rng.choice(["en", "et", "ru"])
+        return await self.call("lang", "PUT", "/api/lang", {"language_code": language})
+
+    async def signup(self):
+        # Signing up logs the new user in, keep it out of this user's session
+        name = f"signup{uuid.uuid4().hex[:12]}"
+        return await self.call(
+            "signup",
+            "POST",
+            "/api/signup",
+            {
+                "email": f"{name}@example.com",
+                "password": PASSWORD,
+                "username": name,
+                "first_name": "Load",
+            },
+            anonymous=True,
+        )
+
+    async def forgot_password(self):
+        return await self.call(
+            "forgot_password",
+            "POST",
+            "/api/forgot_password",
+            {"email": f"{self.username}@example.com"},
+            anonymous=True,
+        )
+
+
+ACTIONS = {
+    "me": VirtualUser.me,
+    "lang": VirtualUser.lang,
+    "login": VirtualUser.login,
+    "signup": VirtualUser.signup,
+    "forgot_password": VirtualUser.forgot_password,
+}
+
+
+def update_cookies(cookies, headers):
+    for name, value in headers:
+        if name != "set-cookie":
+            continue
+
+        for morsel in SimpleCookie(value).values():
+            if morsel["max-age"] == "0" or "1970" in morsel["expires"]:
+                cookies.pop(morsel.key, None)
+            else:
+                cookies[morsel.key] = morsel.value
+
+
+def parse_mix(mix):
+    """Parse ``me=70,login=10`` into {action: weight}"""
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+
+        if name not in ACTIONS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown action {name!r}, choose from {', '.join(ACTIONS)}"
+            )
+
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid weight for {name}: {weight!r}")
+
+    if not any(weight > 0 for weight in weights.values()):
+        raise argparse.ArgumentTypeError("The mix needs at least one positive weight")
+
+    return weights
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(recorder, duration):
+    """Return {endpoint: stats}, plus ``all`` over every endpoint"""
+    summary = {}
+
+    endpoints = sorted(recorder.latencies)
+    groups = [(endpoint, [endpoint]) for endpoint in endpoints]
+    if endpoints:
+        groups.append(("all", endpoints))
+
+    for name, members in groups:
+        latencies = sorted(
+            latency for endpoint in members for latency in recorder.latencies[endpoint]
+        )
+        statuses = Counter()
+        for endpoint in members:
+            statuses.update(recorder.statuses[endpoint])
+
+        errors = sum(
+            count
+            for status, count in statuses.items()
+            if status == "error" or status >= 500
+        )
+
+        summary[name] = {
+            "usec": percentile(latencies, 50) * 1e6,
+            "p50_ms": percentile(latencies, 50) * 1e3,
+            "p95_ms": percentile(latencies, 95) * 1e3,
+            "p99_ms": percentile(latencies, 99) * 1e3,
+            "mean_ms": sum(latencies) / len(latencies) * 1e3,
+            "max_ms": latencies[-1] * 1e3,
+            "requests": len(latencies),
+            "rps": len(latencies) / duration,
+            "errors": errors,
+            "statuses": {
+                str(status): count
+                for status, count in sorted(statuses.items(), key=str)
+            },
+        }
+
+    return summary
+
+
+async def run_user(host, port, recorder, index, options, deadline):
+    rng = random.Random(options.seed + index)
+    connection = HTTPConnection(host, port)
+    user = VirtualUser(connection, recorder, index, rng)
+
+    names = list(options.mix)
+    weights = list(options.mix.values())
+
+    try:
+        await user.login()
+
+        while time.perf_counter() < deadline:
+            action = rng.choices(names, weights)[0]
+            await ACTIONS[action](user)
+
+            if options.think_time:
+                await asyncio.sleep(options.think_time / 1000)
+
+    finally:
+        await connection.close()
+
+
+async def run_load(url, options):
+    """Drive ``url`` with the virtual users, return the summary of the measured period"""
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+
+    start = time.perf_counter() + options.warmup
+    deadline = start + options.duration
+    recorder = Recorder(start)
+
+    await asyncio.gather(
+        *(
+            run_user(host, port, recorder, index, options, deadline)
+            for index in range(options.concurrency)
+        )
+    )
+
+    return summarize(recorder, options.duration)
+
+
+def get_free_port(host):
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def get_env(database, options):
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE="benchmarks.loadtest_settings",
+        PYTHONPATH=os.pathsep.join([BASE_DIR, os.path.join(BASE_DIR, "demo")]),
+        TGR_LOADTEST_DATABASE=database,
+    )
+    if options.fast_hasher:
+        env["TGR_LOADTEST_FAST_HASHER"] = "1"
+
+    return env
+
+
+def wait_for_server(process, host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode}")
+
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+
+    raise RuntimeError(f"Server did not start listening on {host}:{port}")
+
+
+def get_asgi_server(name=None):
+    """Return the name of the ASGI server to use, or None when none is installed"""
+    names = [name] if name else list(ASGI_SERVERS)
+
+    for candidate in names:
+        if importlib.util.find_spec(candidate) is not None:
+            return candidate
+
+    return None
+
+
+def start_server(kind, env, options):
+    """Start the demo project, return (process, url, server description)"""
+    host = "127.0.0.1"
+    port = get_free_port(host)
+
+    if kind == "wsgi":
+        args = ["-m", "benchmarks.loadtest_server", "wsgi", host, str(port)]
+        description = "django runserver WSGIServer (threaded)"
+    else:
+        server = get_asgi_server(options.asgi_server)
+        args = ASGI_SERVERS[server](host, port)
+        description = server
+
+    process = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, *args], cwd=BASE_DIR, env=env
+    )
+    try:
+        wait_for_server(process, host, port)
+    except Exception:
+        process.terminate()
+        process.wait()
+        raise
+
+    return process, f"http://{host}:{port}", description
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def report(name, summary):
+    print(name)
+    print(
+        f"  {'endpoint':<18} {'requests':>9} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'p99 ms':>9} {'errors':>7}"
+    )
+    for endpoint, stats in summary.items():
+        print(
+            f"  {endpoint:<18} {stats['requests']:>9} {stats['rps']:>9.1f} "
+            f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} "
+            f"{stats['errors']:>7}"
+        )
+
+
+def get_servers(options):
+    if options.url:
+        return ["url"]
+
+    servers = ["wsgi", "asgi"] if options.server == "both" else [options.server]
+
+    if "asgi" in servers and get_asgi_server(options.asgi_server) is None:
+        wanted = options.asgi_server or " or ".join(ASGI_SERVERS)
+        message = f"{wanted} is not installed, skipping the ASGI run"
+        if servers == ["asgi"]:
+            raise SystemExit(message)
+
+        print(message)
+        servers.remove("asgi")
+
+    return servers
+
+
+def run(options):
+    """Return (results, {server: description})"""
+    results = {}
+    descriptions = {}
+
+    if options.url:
+        summary = asyncio.run(run_load(options.url, options))
+        report(options.url, summary)
+        results.update({f"url.{name}": stats for name, stats in summary.items()})
+        descriptions["url"] = options.url
+
+        return results, descriptions
+
+    directory = tempfile.mkdtemp(prefix="tgr-loadtest-")
+    try:
+        env = get_env(os.path.join(directory, "db.sqlite3"), options)
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.loadtest_server",
+                "prepare",
+                str(options.concurrency),
+            ],
+            cwd=BASE_DIR,
+            env=env,
+            check=True,
+        )
+
+        for kind in get_servers(options):
+            process, url, description = start_server(kind, env, options)
+            try:
+                summary = asyncio.run(run_load(url, options))
+            finally:
+                stop_server(process)
+
+            report(f"{kind}: {description}", summary)
+            results.update({f"{kind}.{name}": stats for name, stats in summary.items()})
+            descriptions[kind] = description
+
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return results, descriptions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Load test the demo project under WSGI and ASGI servers"
+    )
+    parser.add_argument(
+        "--save",
+        default="loadtest-latest",
+        help="Results name (stored in .benchmarks/) or path, default: loadtest-latest",
+    )
+    parser.add_argument("--server", choices=["wsgi", "asgi", "both"], default="both")
+    parser.add_argument("--asgi-server", choices=list(ASGI_SERVERS))
+    parser.add_argument(
+        "--url", help="Load test an already running demo project instead"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=10, help="Virtual users (default: 10)"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=20, help="Measured seconds (default: 20)"
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=3, help="Unmeasured seconds first (default: 3)"
+    )
+    parser.add_argument(
+        "--think-time",
+        type=float,
+        default=0,
+        help="Milliseconds each virtual user waits between requests (default: 0)",
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=parse_mix(DEFAULT_MIX),
+        help=f"Request weights, default: {DEFAULT_MIX}",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--fast-hasher",
+        action="store_true",
+        help="Use MD5 so hashing does not dominate login and signup",
+    )
+    options = parser.parse_args(argv)
+
+    results, descriptions = run(options)
+
+    meta = benchmarks.get_metadata(
+        fast_hasher=options.fast_hasher,
+        servers=descriptions,
+        concurrency=options.concurrency,
+        duration=options.duration,
+        warmup=options.warmup,
+        think_time=options.think_time,
+        mix=options.mix,
+        seed=options.seed,
+    )
+    path = save_results(options.save, {"meta": meta, "results": results})
+    print(f"Saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
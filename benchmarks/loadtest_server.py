@@ -0,0 +1,67 @@
+"""
+Server side helpers of ``benchmarks.loadtest``, run in subprocesses with
+``DJANGO_SETTINGS_MODULE=benchmarks.loadtest_settings``:
+
+    python -m benchmarks.loadtest_server prepare USERS
+    python -m benchmarks.loadtest_server wsgi HOST PORT
+"""
+import sys
+
+import django
+
+
+PASSWORD = "secret"
+
+
+def get_username(index):
+    return f"loadtest{index}"
+
+
+def prepare(users):
+    """Create the database and the users logged in by the virtual users"""
+    from django.contrib.auth import get_user_model  # NOQA
+    from django.contrib.auth.hashers import make_password  # NOQA
+    from django.core.management import call_command  # NOQA
+
+    call_command("migrate", verbosity=0, interactive=False)
+
+    # Hashing once keeps preparing cheap with the default hasher
+    password = make_password(PASSWORD)
+    user_model = get_user_model()
+    user_model.objects.bulk_create(
+        [
+            user_model(
+                username=get_username(index),
+                email=f"{get_username(index)}@example.com",
+                password=password,
+            )
+            for index in range(users)
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def serve_wsgi(host, port):
+    """Serve the demo project with runserver's threaded WSGI server, without autoreload or
+    static files"""
+    from django.core.servers.basehttp import run  # NOQA
+    from django.core.wsgi import get_wsgi_application  # NOQA
+
+    run(host, port, get_wsgi_application(), threading=True)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    django.setup()
+
+    if argv[0] == "prepare":
+        prepare(int(argv[1]))
+    elif argv[0] == "wsgi":
+        serve_wsgi(argv[1], int(argv[2]))
+    else:
+        raise SystemExit(f"Unknown command {argv[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Demo project settings for the servers started by ``benchmarks.loadtest``.
+
+The harness passes the throwaway SQLite database in ``TGR_LOADTEST_DATABASE`` and sets
+``TGR_LOADTEST_FAST_HASHER`` for ``--fast-hasher``.
+"""
+import os
+
+from example.settings import *  # NOQA
+
+
+DEBUG = False
+ALLOWED_HOSTS = ["127.0.0.1", "localhost"]
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ["TGR_LOADTEST_DATABASE"],
+        # Concurrent signups and logins wait for the write lock instead of failing
+        "OPTIONS": {"timeout": 30},
+    }
+}
+
+EMAIL_BACKEND = "django.core.mail.backends.dummy.EmailBackend"
+
+# auth.User needs an unique username
+TGR_USER_SIGNUP_FIELDS = ["username", "first_name"]
+
+if os.environ.get("TGR_LOADTEST_FAST_HASHER"):
+    PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "loggers": {
+        # One line per request from the WSGI server would skew the results
+        "django.server": {"level": "ERROR"},
+        "django.request": {"level": "ERROR"},
+    },
+}
@@ -0,0 +1,77 @@
+"""
+Password verification throughput of one event loop, with hashing in threads vs process pools.
+
+Runs a batch of concurrent ``tg_react.hashing`` verifications (what every async login does) for
+each pool size. With threads the GIL serializes the work, so throughput stays at roughly one core;
+with a process pool it should scale with the pool size up to the number of cores.
+
+    python -m benchmarks.password_hashing [--logins 48] [--pool-sizes 1,2,4]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks import setup_django
+
+
+def run_batch(encoded, logins):
+    from tg_react.hashing import (  # NOQA pylint: disable=import-outside-toplevel
+        _verify_password,
+        run_hasher,
+    )
+
+    async def batch():
+        results = await asyncio.gather(
+            *(run_hasher(_verify_password, "secret", encoded) for _ in range(logins))
+        )
+        assert all(is_correct for is_correct, _ in results)
+
+    started = time.perf_counter()
+    asyncio.run(batch())
+
+    return logins / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=48)
+    parser.add_argument(
+        "--pool-sizes",
+        default=",".join(str(size) for size in sorted({1, 2, 4, os.cpu_count() or 1})),
+    )
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth.hashers import (  # NOQA pylint: disable=import-outside-toplevel
+        make_password,
+    )
+    from django.test import (  # NOQA pylint: disable=import-outside-toplevel
+        override_settings,
+    )
+
+    from tg_react.hashing import (  # NOQA pylint: disable=import-outside-toplevel
+        get_hashing_executor,
+        shutdown_hashing_executor,
+    )
+
+    encoded = make_password("secret")
+
+    print(f"password verification, {args.logins} concurrent logins")
+    print(f"  {'threads':<40} {run_batch(encoded, args.logins):10.1f} logins/s")
+
+    for size in [int(size) for size in args.pool_sizes.split(",")]:
+        with override_settings(TGR_PASSWORD_HASHING_PROCESSES=size):
+            # Start the pool processes before measuring
+            run_batch(encoded, size)
+
+            label = f"process pool ({size})"
+            print(f"  {label:<40} {run_batch(encoded, args.logins):10.1f} logins/s")
+
+            assert get_hashing_executor() is not None
+            shutdown_hashing_executor()
+
+
+if __name__ == "__main__":
+    main()
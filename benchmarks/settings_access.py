@@ -0,0 +1,44 @@
+"""
+Compare reading TGR_* settings through the per-call getters against the cached snapshot.
+
+The per-call path is what every ``/me`` request paid before the snapshot existed.
+"""
+from benchmarks import measure, report, setup_django
+
+
+def main():
+    setup_django()
+
+    from django.test import override_settings  # NOQA
+
+    from tg_react import settings as tgr_settings  # NOQA
+
+    extra_fields = {
+        "display_name": [
+            "rest_framework.fields.CharField",
+            {"source": "get_full_name", "read_only": True},
+        ],
+        "user_id": ["rest_framework.fields.IntegerField", {"source": "pk"}],
+    }
+
+    with override_settings(TGR_USER_EXTRA_FIELDS=extra_fields):
+
+        def per_call():
+            tgr_settings.get_email_case_sensitive()
+            tgr_settings.exclude_fields_from_user_details()
+            tgr_settings.get_user_extra_fields()
+
+        def snapshot():
+            config = tgr_settings.get_config()
+            config.email_case_sensitive  # NOQA pylint: disable=pointless-statement
+            config.excluded_user_fields  # NOQA pylint: disable=pointless-statement
+            config.user_extra_fields  # NOQA pylint: disable=pointless-statement
+
+        report(
+            "settings access (per /me request)",
+            [("per-call getters", measure(per_call)), ("snapshot", measure(snapshot))],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+Benchmark suite for the accounts API, LocaleMiddleware and the account serializers.
+
+Every endpoint of ``tg_react.api.accounts.urls`` is requested through the demo project's full
+middleware stack with Django's test client, against a throwaway SQLite test database. Results
+are stored as JSON (``.benchmarks/latest.json`` by default), compare them with
+``python -m benchmarks.compare``:
+
+    python -m benchmarks.suite --save baseline
+    # ... change things ...
+    python -m benchmarks.suite
+    python -m benchmarks.compare baseline latest
+
+The login, signup and password restore cases are dominated by password hashing, pass
+``--fast-hasher`` to use MD5 there and measure only the code around it.
+"""
+import argparse
+import itertools
+import json
+import logging
+
+import benchmarks
+from benchmarks import measure, report, save_results, setup_django
+
+
+BENCHMARKS = []
+
+
+def benchmark(name, number=1000):
+    """Register a case, the decorated function does the setup and returns the callable to time"""
+
+    def decorator(func):
+        BENCHMARKS.append((name, number, func))
+        return func
+
+    return decorator
+
+
+_user = None
+
+
+def get_user():
+    global _user  # pylint: disable=global-statement
+
+    if _user is None:
+        from django.contrib.auth import get_user_model  # NOQA
+
+        _user = get_user_model().objects.create_user(
+            username="bench",
+            email="bench@example.com",
+            password="secret",
+            first_name="Bench",
+        )
+
+    return _user
+
+
+def get_client(logged_in=False):
+    from django.test import Client  # NOQA
+
+    client = Client()
+    if logged_in:
+        client.force_login(get_user())
+
+    return client
+
+
+def post_json(client, path, data, method="post"):
+    response = getattr(client, method)(
+        path, json.dumps(data), content_type="application/json"
+    )
+    assert response.status_code < 500, response
+    return response
+
+
+@benchmark("middleware.locale", number=20000)
+def locale_middleware():
+    from django.contrib.auth.models import AnonymousUser  # NOQA
+    from django.http import HttpResponse  # NOQA
+    from django.test import RequestFactory  # NOQA
+
+    from tg_react.middleware import LocaleMiddleware  # NOQA
+
+    middleware = LocaleMiddleware(lambda request: HttpResponse())
+    request = RequestFactory().get("/", HTTP_ACCEPT_LANGUAGE="et,en;q=0.8")
+    request.user = AnonymousUser()
+
+    return lambda: middleware(request)
+
+
+@benchmark("serializers.signup.construct", number=2000)
+def signup_serializer_construct():
+    from tg_react.api.accounts.serializers import SignupSerializer  # NOQA
+
+    data = {
+        "email": "new@example.com",
+        "password": "secret",
+        "username": "new",
+        "first_name": "New",
+    }
+
+    return lambda: SignupSerializer(data=data).fields
+
+
+@benchmark("serializers.signup.is_valid", number=1000)
+def signup_serializer_is_valid():
+    from tg_react.api.accounts.serializers import SignupSerializer  # NOQA
+
+    data = {
+        "email": "new@example.com",
+        "password": "secret",
+        "username": "new",
+        "first_name": "New",
+    }
+
+    return lambda: SignupSerializer(data=data).is_valid()
+
+
+@benchmark("serializers.user_details.construct", number=2000)
+def user_details_serializer_construct():
+    from tg_react.api.accounts.serializers import UserDetailsSerializer  # NOQA
+
+    user = get_user()
+
+    return lambda: UserDetailsSerializer(user).fields
+
+
+@benchmark("serializers.user_details.data", number=2000)
+def user_details_serializer_data():
+    from tg_react.api.accounts.serializers import UserDetailsSerializer  # NOQA
+
+    user = get_user()
+
+    return lambda: UserDetailsSerializer(user).data
+
+
+@benchmark("api.me.get_anonymous", number=500)
+def me_anonymous():
+    client = get_client()
+
+    return lambda: client.get("/api/me")
+
+
+@benchmark("api.me.get", number=500)
+def me_authenticated():
+    client = get_client(logged_in=True)
+
+    return lambda: client.get("/api/me")
+
+
+@benchmark("api.me.patch", number=300)
+def me_patch():
+    client = get_client(logged_in=True)
+
+    return lambda: post_json(client, "/api/me", {"first_name": "Bench"}, "patch")
+
+
+@benchmark("api.login", number=10)
+def login():
+    client = get_client()
+    data = {"username": get_user().username, "password": "secret"}
+
+    return lambda: post_json(client, "/api/login", data)
+
+
+@benchmark("api.logout", number=300)
+def logout():
+    client = get_client()
+    user = get_user()
+
+    def run():
+        # Includes creating the session to log out from
+        client.force_login(user)
+        post_json(client, "/api/logout", {})
+
+    return run
+
+
+@benchmark("api.lang.get", number=500)
+def lang_get():
+    client = get_client()
+
+    return lambda: client.get("/api/lang")
+
+
+@benchmark("api.lang.put", number=500)
+def lang_put():
+    client = get_client()
+
+    return lambda: post_json(client, "/api/lang", {"language_code": "et"}, "put")
+
+
+@benchmark("api.signup", number=10)
+def signup():
+    client = get_client()
+    counter = itertools.count()
+
+    def run():
+        # Every signup logs the new user in, start from an anonymous session
+        client.cookies.clear()
+        index = next(counter)
+        post_json(
+            client,
+            "/api/signup",
+            {
+                "email": f"signup{index}@example.com",
+                "password": "secret",
+                "username": f"signup{index}",
+                "first_name": "New",
+            },
+        )
+
+    return run
+
+
+@benchmark("api.forgot_password", number=200)
+def forgot_password():
+    from django.core import mail  # NOQA
+
+    client = get_client()
+    data = {"email": get_user().email}
+
+    def run():
+        post_json(client, "/api/forgot_password", data)
+        mail.outbox.clear()
+
+    return run
+
+
+@benchmark("api.forgot_password.token", number=10)
+def forgot_password_token():
+    from tg_react.api.accounts.serializers import ForgotPasswordSerializer  # NOQA
+
+    client = get_client()
+    user = get_user()
+
+    def run():
+        # Tokens are single use, includes generating a fresh one for the current password
+        user.refresh_from_db(fields=["password"])
+        token = ForgotPasswordSerializer.make_uid_and_token_b64(user)
+
+        response = post_json(
+            client,
+            "/api/forgot_password/token",
+            {
+                "password": "secret",
+                "password_confirm": "secret",
+                "uid_and_token_b64": token,
+            },
+        )
+        assert response.status_code == 200, response.content
+
+    return run
+
+
+@benchmark("api.forgot_password.token_invalid", number=500)
+def forgot_password_token_invalid():
+    client = get_client()
+    data = {"password": "a", "password_confirm": "a", "uid_and_token_b64": "x"}
+
+    return lambda: post_json(client, "/api/forgot_password/token", data)
+
+
+def get_metadata(options):
+    return benchmarks.get_metadata(fast_hasher=options.fast_hasher, quick=options.quick)
+
+
+def run(options):
+    from django.test import override_settings  # NOQA
+
+    # auth.User needs an unique username
+    overrides = {"TGR_USER_SIGNUP_FIELDS": ["username", "first_name"]}
+    if options.fast_hasher:
+        overrides["PASSWORD_HASHERS"] = [
+            "django.contrib.auth.hashers.MD5PasswordHasher"
+        ]
+
+    results = {}
+    with override_settings(**overrides):
+        for name, number, setup in BENCHMARKS:
+            if options.filter and options.filter not in name:
+                continue
+
+            if options.quick:
+                number = max(1, number // 10)
+
+            repeat = 3 if options.quick else 5
+            usec = measure(setup(), number=number, repeat=repeat)
+            results[name] = {"usec": usec, "number": number, "repeat": repeat}
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--save",
+        default="latest",
+        help="Results name (stored in .benchmarks/) or path, default: latest",
+    )
+    parser.add_argument("--filter", help="Only run benchmarks containing this text")
+    parser.add_argument(
+        "--quick", action="store_true", help="Fewer iterations, for smoke runs"
+    )
+    parser.add_argument(
+        "--fast-hasher",
+        action="store_true",
+        help="Use MD5 so hashing does not dominate login/signup/restore",
+    )
+    options = parser.parse_args()
+
+    setup_django()
+
+    # Some cases expect 400 responses, do not log each of them
+    logging.getLogger("django.request").setLevel(logging.ERROR)
+
+    from django.db import connection  # NOQA
+    from django.test.utils import setup_test_environment  # NOQA
+
+    # locmem e-mail backend and an in-memory SQLite database
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+    results = run(options)
+
+    report(
+        "tg_react benchmark suite", [(name, r["usec"]) for name, r in results.items()]
+    )
+
+    path = save_results(
+        options.save, {"meta": get_metadata(options), "results": results}
+    )
+    print(f"Saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Per-request cost of authenticating ``GET /api/me`` with a session versus a signed access token.
+
+Requests go through the demo project's full middleware stack with Django's test client against a
+throwaway SQLite test database, the session store is the demo's database backend. Also times the
+authentication step alone, ``SessionAuthentication`` (session read plus user query) against
+``SignedTokenAuthentication`` (HMAC check plus the cached user snapshot).
+"""
+import logging
+
+from benchmarks import measure, report, setup_django
+
+
+def main():
+    setup_django()
+
+    logging.getLogger("django.request").setLevel(logging.ERROR)
+
+    from django.contrib.auth import get_user_model  # NOQA
+    from django.contrib.auth.middleware import AuthenticationMiddleware  # NOQA
+    from django.contrib.sessions.middleware import SessionMiddleware  # NOQA
+    from django.db import connection  # NOQA
+    from django.test import Client, RequestFactory, override_settings  # NOQA
+    from django.test.utils import setup_test_environment  # NOQA
+    from rest_framework.authentication import SessionAuthentication  # NOQA
+    from rest_framework.request import Request  # NOQA
+
+    from tg_react.tokens import SignedTokenAuthentication, make_access_token  # NOQA
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+    with override_settings(TGR_AUTH_MODE="both"):
+        user = get_user_model().objects.create_user(
+            username="bench", email="bench@example.com", password="secret"
+        )
+        access = make_access_token(user)
+
+        session_client = Client()
+        session_client.force_login(user)
+        token_client = Client(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+        for client in (session_client, token_client):
+            assert client.get("/api/me").status_code == 200
+
+        cookies = {
+            name: morsel.value for name, morsel in session_client.cookies.items()
+        }
+        token_request = RequestFactory().get(
+            "/api/me", HTTP_AUTHORIZATION=f"Bearer {access}"
+        )
+
+        def authenticate_session():
+            # A fresh request so the session and user are loaded every time
+            request = RequestFactory().get("/api/me")
+            request.COOKIES = cookies
+            SessionMiddleware(lambda r: None).process_request(request)
+            AuthenticationMiddleware(lambda r: None).process_request(request)
+
+            return SessionAuthentication().authenticate(Request(request))
+
+        token_authentication = SignedTokenAuthentication()
+
+        results = [
+            (
+                "authenticate session",
+                measure(authenticate_session, number=2000),
+            ),
+            (
+                "authenticate token",
+                measure(
+                    lambda: token_authentication.authenticate(Request(token_request)),
+                    number=20000,
+                ),
+            ),
+            (
+                "GET /api/me session",
+                measure(lambda: session_client.get("/api/me"), number=500),
+            ),
+            (
+                "GET /api/me token",
+                measure(lambda: token_client.get("/api/me"), number=500),
+            ),
+        ]
+
+    report("Authentication cost", results)
+
+
+if __name__ == "__main__":
+    main()
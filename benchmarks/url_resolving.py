@@ -0,0 +1,146 @@
+"""
+URL resolving with many viewsets registered on ``SuffixlessRouter``, regex versus ``path()``
+routes, and the API root view with and without the cached listing.
+
+Resolves the detail route of the last registered viewset (the worst case of the linear scan) and
+a miss, in fresh resolvers built from in-memory urlconfs. Django 4.1 compiles both kinds to
+regexes, newer versions can compare ``path()`` routes without converters as plain strings.
+"""
+import types
+
+from benchmarks import measure, report, setup_django
+
+
+VIEWSETS = 500
+
+
+def main():
+    setup_django()
+
+    from django.test import RequestFactory  # NOQA
+    from django.test.utils import setup_test_environment  # NOQA
+    from django.urls import get_resolver, include, path, re_path, set_urlconf  # NOQA
+    from rest_framework import viewsets  # NOQA
+    from rest_framework.response import Response  # NOQA
+    from rest_framework.routers import APIRootView as UncachedAPIRootView  # NOQA
+
+    from tg_react.api.accounts import urls as accounts_urls  # NOQA
+    from tg_react.routers import SuffixlessRouter  # NOQA
+
+    setup_test_environment()
+
+    class ItemViewSet(viewsets.ViewSet):
+        def list(self, request):
+            return Response([])  # pragma: no cover
+
+        def retrieve(self, request, pk=None):
+            return Response({})  # pragma: no cover
+
+    class UncachedRouter(SuffixlessRouter):
+        APIRootView = UncachedAPIRootView
+
+        def get_api_root_view(self, api_urls=None):
+            api_root_dict = {
+                prefix: self.routes[0].name.format(basename=basename)
+                for prefix, _viewset, basename in self.registry
+            }
+            return self.APIRootView.as_view(api_root_dict=api_root_dict)
+
+    def make_urlconf(name, router):
+        for index in range(VIEWSETS):
+            router.register(f"items{index}", ItemViewSet, basename=f"item{index}")
+
+        urlconf = types.ModuleType(name)
+        urlconf.urlpatterns = [path("api/", include(router.urls))]
+        return urlconf
+
+    urlconfs = {
+        "regex": make_urlconf("bench_regex", UncachedRouter()),
+        "path": make_urlconf("bench_path", SuffixlessRouter(use_path=True)),
+    }
+
+    last = f"/api/items{VIEWSETS - 1}/1/"
+    results = []
+    for label, urlconf in urlconfs.items():
+        resolver = get_resolver(urlconf)
+        resolver.resolve(last)
+
+        results.append(
+            (
+                f"resolve last detail, {label}",
+                measure(lambda: resolver.resolve(last), number=2000),
+            )
+        )
+
+        def miss():
+            try:
+                resolver.resolve("/api/missing/")
+            except Exception:  # pylint: disable=broad-except
+                pass
+
+        results.append((f"resolve miss, {label}", measure(miss, number=200)))
+
+    report(f"SuffixlessRouter with {VIEWSETS} viewsets", results)
+
+    factory = RequestFactory()
+    results = []
+    for label, urlconf in (
+        ("APIRootView", urlconfs["regex"]),
+        ("CachedAPIRootView", urlconfs["path"]),
+    ):
+        resolver = get_resolver(urlconf)
+        view = resolver.resolve("/api/").func
+
+        def get_root():
+            request = factory.get("/api/")
+            request.urlconf = urlconf
+            request.resolver_match = resolver.resolve("/api/")
+            return view(request)
+
+        set_urlconf(urlconf)
+        try:
+            assert get_root().status_code == 200
+            results.append(
+                (f"GET api root, {label}", measure(get_root, number=20, repeat=3))
+            )
+        finally:
+            set_urlconf(None)
+
+    report("API root", results)
+
+    # The accounts urls as they were registered before, anchored re_path regexes
+    regex_accounts = types.ModuleType("bench_regex_accounts")
+    regex_accounts.urlpatterns = [
+        re_path(
+            r"api/",
+            include(
+                [
+                    re_path(
+                        r"^%s$" % pattern.pattern, pattern.callback, name=pattern.name
+                    )
+                    for pattern in accounts_urls.urlpatterns
+                ]
+            ),
+        )
+    ]
+    path_accounts = types.ModuleType("bench_path_accounts")
+    path_accounts.urlpatterns = [path("api/", include(accounts_urls.urlpatterns))]
+
+    results = []
+    for label, urlconf in (("re_path", regex_accounts), ("path", path_accounts)):
+        resolver = get_resolver(urlconf)
+        resolver.resolve("/api/forgot_password/token")
+        results.append(
+            (
+                f"resolve forgot_password/token, {label}",
+                measure(
+                    lambda: resolver.resolve("/api/forgot_password/token"), number=20000
+                ),
+            )
+        )
+
+    report("tg_react.api.accounts.urls", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Compare UserDetailsSerializer.data with and without TGR_USER_DETAILS_COMPILED_REPRESENTATION.
+"""
+from benchmarks import measure, report, setup_django
+
+
+def main():
+    setup_django()
+
+    from django.contrib.auth import get_user_model  # NOQA
+    from django.test import override_settings  # NOQA
+    from django.utils import timezone  # NOQA
+
+    from tg_react.api.accounts.serializers import UserDetailsSerializer  # NOQA
+
+    user = get_user_model()(
+        pk=1,
+        username="foo",
+        first_name="Foo",
+        last_name="Bar",
+        email="Foo@Bar.baz",
+        date_joined=timezone.now(),
+        last_login=timezone.now(),
+    )
+
+    def serialize():
+        return UserDetailsSerializer(user).data
+
+    results = []
+    for compiled in (False, True):
+        with override_settings(
+            TGR_USER_DETAILS_COMPILED_REPRESENTATION=compiled,
+            TGR_EMAIL_CASE_SENSITIVE=False,
+        ):
+            label = "compiled plan" if compiled else "DRF fields"
+            results.append((label, measure(serialize, number=2000)))
+
+    report("UserDetailsSerializer(user).data", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""
+ASGI config for example project.
+It exposes the ASGI callable as a module-level variable named ``application``.
+For more information on this file, see
+https://docs.djangoproject.com/en/stable/howto/deployment/asgi/
+"""
+
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "example.settings")
+
+from django.core.asgi import get_asgi_application
+
+application = get_asgi_application()
@@ -31,6 +31,7 @@ SITE_URL = "http://127.0.0.1:8000"
 # Application definition
 INSTALLED_APPS = [
     "example",
+    "tg_react",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -15,9 +15,19 @@ def test_language_view(request):
     return HttpResponse(f"current_language: {translation.get_language()}")
 
 
+async def test_language_async_view(request):
+    return HttpResponse(f"current_language: {translation.get_language()}")
+
+
 urlpatterns = [
     re_path(r"^admin/", admin.site.urls),
     re_path(r"^test/", test_view, name="test_view"),
     re_path(r"^test-language/", test_language_view, name="test_language_view"),
+    re_path(
+        r"^test-language-async/",
+        test_language_async_view,
+        name="test_language_async_view",
+    ),
     re_path(r"api/", include("tg_react.api.accounts.urls")),
+    re_path(r"api/", include("tg_react.api.translations.urls")),
 ]
@@ -1,8 +1,29 @@
 import os
 import sys
 
+import pytest
+
+from django.contrib.auth.models import User
+from model_bakery import baker
+from rest_framework.test import APIClient
+
 
 BASE_DIR = os.path.dirname(__file__)
 
 sys.path.append(os.path.join(BASE_DIR, ".."))
 sys.path.append(os.path.join(BASE_DIR, "..", "demo"))
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    """User with the password "test", needs the django_db mark"""
+    user = baker.make(User, is_staff=False, email="foo@bar.baz", username="foo")
+    user.set_password("test")
+    user.save()
+
+    return user
@@ -8,8 +8,8 @@ from django.core.exceptions import ImproperlyConfigured
 from django.urls import reverse
 from model_bakery import baker
 from rest_framework.fields import CharField
-from rest_framework.test import APIClient
 
+from tg_react.api.accounts.serializers import ForgotPasswordSerializer
 from tg_react.settings import (
     get_user_extra_fields,
     configure,
@@ -17,20 +17,6 @@ from tg_react.settings import (
 )
 
 
-@pytest.fixture(scope="function")
-def api_client():
-    return APIClient()
-
-
-@pytest.fixture(scope="function")
-def user():
-    user = baker.make(User, is_staff=False)
-    user.set_password("test")
-    user.save()
-
-    return user
-
-
 @pytest.fixture(scope="function")
 def user_with_email():
     user = baker.make(User, is_staff=False, email="foO@BAr.baz")
@@ -215,9 +201,11 @@ def test_accounts_login_error(api_client, user):
 @pytest.mark.django_db
 def test_post_login_handler(api_client, user, settings):
     settings.TGR_POST_LOGIN_HANDLER = "example.handlers.post_login"
-    configure()
 
     with patch("example.handlers.post_login") as mock:
+        # handlers are resolved when the settings are configured
+        configure()
+
         response = api_client.post(
             reverse("api-user-login"),
             data={"username": user.username, "password": "test"},
@@ -245,10 +233,33 @@ def test_accounts_logout(user_api_client, api_client, user):
 @pytest.mark.django_db
 def test_post_logout_handler(user_api_client, user, settings):
     settings.TGR_POST_LOGOUT_HANDLER = "example.handlers.post_logout"
-    configure()
 
     with patch("example.handlers.post_logout") as mock:
+        # handlers are resolved when the settings are configured
+        configure()
+
         response = user_api_client.post(reverse("api-user-logout"), data={})
         assert response.status_code == 200
 
         mock.assert_called_once_with(user=user, request=ANY, old_session=ANY)
+
+
+@pytest.mark.django_db
+def test_restore_password(api_client, user):
+    uid_and_token_b64 = ForgotPasswordSerializer.make_uid_and_token_b64(user)
+    data = {
+        "password": "new",
+        "password_confirm": "new",
+        "uid_and_token_b64": uid_and_token_b64,
+    }
+
+    response = api_client.post(reverse("api-forgot-password-token"), data=data)
+    assert response.status_code == 200
+
+    user.refresh_from_db()
+    assert user.check_password("new")
+
+    # token is single use
+    response = api_client.post(reverse("api-forgot-password-token"), data=data)
+    assert response.status_code == 400
+    assert list(response.json()["errors"]) == ["uid_and_token_b64"]
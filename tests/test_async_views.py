@@ -0,0 +1,187 @@
+import json
+
+import django
+import pytest
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+from model_bakery import baker
+
+from tg_react.api.accounts.serializers import ForgotPasswordSerializer
+from tg_react.compat import require_async_orm
+
+
+pytestmark = [
+    pytest.mark.skipif(django.VERSION < (4, 1), reason="async ORM needs Django 4.1+"),
+    pytest.mark.urls("tests.urls_async"),
+    pytest.mark.django_db,
+]
+
+
+calls = []
+
+
+async def record_login(**kwargs):
+    calls.append(kwargs)
+
+
+def request(async_client, method, name, data=None):
+    async def send():
+        if data is None:
+            return await getattr(async_client, method)(reverse(name))
+
+        return await getattr(async_client, method)(
+            reverse(name), json.dumps(data), content_type="application/json"
+        )
+
+    return async_to_sync(send)()
+
+
+def test_require_async_orm(monkeypatch):
+    require_async_orm("async views")
+
+    monkeypatch.setattr(django, "VERSION", (4, 0, 10, "final", 0))
+    with pytest.raises(ImproperlyConfigured, match="async views needs Django 4.1"):
+        require_async_orm("async views")
+
+
+def test_async_user_details(async_client, user):
+    response = request(async_client, "get", "api-user-details")
+    assert response.status_code == 401
+    assert response.json() == {"authenticated": False}
+
+    async_client.force_login(user)
+
+    response = request(async_client, "get", "api-user-details")
+    assert response.status_code == 200
+    assert response.json()["email"] == user.email
+    assert "csrftoken" in response.cookies
+
+
+def test_async_user_details_update(async_client, user):
+    baker.make(User, email="taken@bar.baz")
+    async_client.force_login(user)
+
+    response = request(
+        async_client, "patch", "api-user-details", {"email": "taken@bar.baz"}
+    )
+    assert response.status_code == 400
+    assert response.json() == {
+        "errors": {"email": ["User with this e-mail address already exists."]}
+    }
+
+    response = request(async_client, "patch", "api-user-details", {"first_name": "Foo"})
+    assert response.status_code == 200
+
+    user.refresh_from_db()
+    assert user.first_name == "Foo"
+
+
+def test_async_login_logout(async_client, user, settings):
+    settings.TGR_POST_LOGIN_HANDLER = "tests.test_async_views.record_login"
+    calls.clear()
+
+    response = request(
+        async_client,
+        "post",
+        "api-user-login",
+        {"username": user.username, "password": "wrong"},
+    )
+    assert response.status_code == 400
+    assert response.json() == {
+        "errors": {"non_field_errors": ["Unable to login with provided credentials."]}
+    }
+
+    response = request(
+        async_client,
+        "post",
+        "api-user-login",
+        {"username": user.username, "password": "test"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"success": True}
+    assert [call["user"] for call in calls] == [user]
+
+    response = request(async_client, "get", "api-user-details")
+    assert response.status_code == 200
+
+    response = request(async_client, "post", "api-user-logout", {})
+    assert response.status_code == 200
+
+    response = request(async_client, "post", "api-user-logout", {})
+    assert response.status_code == 403
+
+
+def test_async_signup(settings, async_client):
+    settings.TGR_USER_SIGNUP_FIELDS = ["first_name"]
+
+    response = request(
+        async_client,
+        "post",
+        "api-signup",
+        {"email": "new@bar.baz", "password": "test", "first_name": "New"},
+    )
+    assert response.status_code == 200
+
+    response = request(async_client, "get", "api-user-details")
+    assert response.json()["email"] == "new@bar.baz"
+
+
+def test_async_signup_existing_email(async_client, user):
+    response = request(
+        async_client,
+        "post",
+        "api-signup",
+        {"email": user.email, "password": "test", "name": "Foo"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["errors"]["email"] == [
+        "User with this e-mail address already exists."
+    ]
+
+
+def test_async_forgot_and_restore_password(async_client, user):
+    response = request(
+        async_client, "post", "api-forgot-password", {"email": "nobody@bar.baz"}
+    )
+    assert response.status_code == 400
+
+    response = request(
+        async_client, "post", "api-forgot-password", {"email": user.email}
+    )
+    assert response.status_code == 200
+    assert len(mail.outbox) == 1
+
+    uid_and_token_b64 = ForgotPasswordSerializer.make_uid_and_token_b64(user)
+    response = request(
+        async_client,
+        "post",
+        "api-forgot-password-token",
+        {
+            "password": "new",
+            "password_confirm": "new",
+            "uid_and_token_b64": uid_and_token_b64,
+        },
+    )
+    assert response.status_code == 200
+
+    user.refresh_from_db()
+    assert user.check_password("new")
+
+    # token is single use
+    response = request(
+        async_client,
+        "post",
+        "api-forgot-password-token",
+        {
+            "password": "new",
+            "password_confirm": "new",
+            "uid_and_token_b64": uid_and_token_b64,
+        },
+    )
+    assert response.status_code == 400
+    assert list(response.json()["errors"]) == ["uid_and_token_b64"]
@@ -0,0 +1,155 @@
+import argparse
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.compare import compare, main
+from benchmarks.loadtest import (
+    HTTPConnection,
+    Recorder,
+    parse_mix,
+    percentile,
+    summarize,
+    update_cookies,
+)
+
+
+def results(**usecs):
+    return {
+        "meta": {},
+        "results": {
+            name.replace("_", "."): {"usec": usec} for name, usec in usecs.items()
+        },
+    }
+
+
+def test_compare():
+    rows, regressions = compare(
+        results(api_me=100.0, api_login=200.0, api_lang=50.0),
+        results(api_me=105.0, api_login=300.0, middleware_locale=10.0),
+        threshold=10,
+    )
+
+    assert regressions == ["api.login"]
+    assert rows == [
+        ("api.lang", 50.0, None, None),
+        ("api.login", 200.0, 300.0, 50.0),
+        ("api.me", 100.0, 105.0, 5.0),
+        ("middleware.locale", None, 10.0, None),
+    ]
+
+
+def test_compare_command(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    current = tmp_path / "current.json"
+    baseline.write_text(json.dumps(results(api_me=100.0)))
+
+    current.write_text(json.dumps(results(api_me=104.0)))
+    assert main([str(baseline), str(current), "--threshold", "5"]) == 0
+    assert "No regressions" in capsys.readouterr().out
+
+    current.write_text(json.dumps(results(api_me=120.0)))
+    assert main([str(baseline), str(current), "--threshold", "5"]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
+
+
+def test_percentile():
+    values = list(range(1, 101))
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([7], 99) == 7
+    assert percentile([], 50) is None
+
+
+def test_parse_mix():
+    assert parse_mix("me=70, login=30") == {"me": 70.0, "login": 30.0}
+
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("me=70,logout=30")
+
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("me=0")
+
+
+def test_summarize():
+    recorder = Recorder(start=10.0)
+    recorder.record("me", 9.0, 5.0, 200)
+    for index in range(1, 11):
+        recorder.record("me", 10.0, index / 1000, 200)
+    recorder.record("login", 11.0, 0.1, 500)
+    recorder.record("login", 11.0, 0.2, "error")
+
+    summary = summarize(recorder, duration=2.0)
+
+    assert list(summary) == ["login", "me", "all"]
+    assert summary["me"]["requests"] == 10
+    assert summary["me"]["rps"] == 5.0
+    assert summary["me"]["p50_ms"] == pytest.approx(5.0)
+    assert summary["me"]["usec"] == pytest.approx(5000.0)
+    assert summary["me"]["p99_ms"] == pytest.approx(10.0)
+    assert summary["me"]["errors"] == 0
+    assert summary["login"]["errors"] == 2
+    assert summary["login"]["statuses"] == {"500": 1, "error": 1}
+    assert summary["all"]["requests"] == 12
+    assert summary["all"]["max_ms"] == pytest.approx(200.0)
+
+
+def test_update_cookies():
+    cookies = {"sessionid": "old", "csrftoken": "token"}
+
+    update_cookies(
+        cookies,
+        [
+            ("set-cookie", "sessionid=new; HttpOnly; Path=/"),
+            (
+                "set-cookie",
+                'csrftoken=""; expires=Thu, 01 Jan 1970 00:00:00 GMT; Max-Age=0',
+            ),
+            ("content-type", "application/json"),
+        ],
+    )
+
+    assert cookies == {"sessionid": "new"}
+
+
+def test_http_connection_keep_alive():
+    responses = [
+        b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nSet-Cookie: a=b\r\n\r\nok",
+        b"HTTP/1.1 201 Created\r\nTransfer-Encoding: chunked\r\n\r\n"
+        b"3\r\nfoo\r\n3\r\nbar\r\n0\r\n\r\n",
+    ]
+    connections = []
+
+    async def handle(reader, writer):
+        connections.append(writer)
+        for response in responses:
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(response)
+            await writer.drain()
+        writer.close()
+
+    async def send():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        connection = HTTPConnection("127.0.0.1", port)
+        try:
+            first = await connection.request("GET", "/api/me")
+            second = await connection.request("POST", "/api/login")
+        finally:
+            await connection.close()
+            server.close()
+            await server.wait_closed()
+
+        return first, second
+
+    first, second = asyncio.run(send())
+
+    assert first == (200, [("content-length", "2"), ("set-cookie", "a=b")], b"ok")
+    assert second[0] == 201
+    assert second[2] == b"foobar"
+    assert len(connections) == 1
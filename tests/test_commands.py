@@ -0,0 +1,62 @@
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.management import call_command
+from model_bakery import baker
+
+
+@pytest.fixture
+def users():
+    return [
+        baker.make(User, email=f"user{i}@example.com", is_active=True) for i in range(5)
+    ]
+
+
+def send_password_resets(*args):
+    out = StringIO()
+    call_command("tgr_send_password_resets", *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+def test_send_password_resets_chunks(users):
+    baker.make(User, email="inactive@example.com", is_active=False)
+
+    with patch(
+        "tg_react.management.commands.tgr_send_password_resets.get_connection",
+        wraps=get_connection,
+    ) as mock:
+        output = send_password_resets("--chunk-size", "2", "--concurrency", "2")
+
+    # 5 users in chunks of 2, one connection per chunk
+    assert mock.call_count == 3
+    assert sorted(m.to[0] for m in mail.outbox) == sorted(u.email for u in users)
+    assert "/reset_password/" in mail.outbox[0].body
+    assert "Done, sent 5 e-mails" in output
+
+
+@pytest.mark.django_db
+def test_send_password_resets_resume(users, tmp_path):
+    state_file = tmp_path / "state"
+    state_file.write_text(str(users[2].pk))
+
+    output = send_password_resets("--state-file", str(state_file))
+
+    assert f"Resuming after user {users[2].pk}" in output
+    assert sorted(m.to[0] for m in mail.outbox) == [users[3].email, users[4].email]
+    assert state_file.read_text() == str(users[4].pk)
+
+
+@pytest.mark.django_db
+def test_send_password_resets_filters(users):
+    send_password_resets("--email", users[1].email, "--email", users[3].email)
+    assert sorted(m.to[0] for m in mail.outbox) == [users[1].email, users[3].email]
+
+    mail.outbox = []
+    send_password_resets("--dry-run")
+    assert mail.outbox == []
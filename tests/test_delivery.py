@@ -0,0 +1,155 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from tg_react.delivery import (
+    CallableEmailDelivery,
+    InlineEmailDelivery,
+    ThreadPoolEmailDelivery,
+    get_email_delivery,
+)
+
+
+queued_messages = []
+
+
+def enqueue(message):
+    queued_messages.append(message)
+
+
+def forgot_password(email):
+    return APIClient().post(reverse("api-forgot-password"), data={"email": email})
+
+
+@pytest.mark.django_db
+def test_forgot_password_inline(user):
+    response = forgot_password(user.email)
+
+    assert response.status_code == 200
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == [user.email]
+    assert "/reset_password/" in mail.outbox[0].body
+
+    assert isinstance(get_email_delivery(), InlineEmailDelivery)
+    assert get_email_delivery().stats()["sent"] >= 1
+
+
+@pytest.mark.django_db
+def test_forgot_password_callable(settings, user):
+    settings.TGR_EMAIL_DELIVERY = [
+        "tg_react.delivery.CallableEmailDelivery",
+        {"handler": "tests.test_delivery.enqueue"},
+    ]
+    queued_messages.clear()
+
+    assert forgot_password(user.email).status_code == 200
+
+    assert isinstance(get_email_delivery(), CallableEmailDelivery)
+    assert len(queued_messages) == 1
+    assert mail.outbox == []
+
+
+@pytest.mark.django_db
+def test_forgot_password_thread_pool(settings, user):
+    settings.TGR_EMAIL_DELIVERY = [
+        "tg_react.delivery.ThreadPoolEmailDelivery",
+        {"max_workers": 1},
+    ]
+
+    delivery = get_email_delivery()
+    assert isinstance(delivery, ThreadPoolEmailDelivery)
+
+    assert forgot_password(user.email).status_code == 200
+
+    delivery.shutdown(wait=True)
+    assert len(mail.outbox) == 1
+    assert delivery.stats() == {"sent": 1, "failed": 0, "retried": 0, "queued": 0}
+
+
+def test_delivery_instance_follows_settings(settings):
+    settings.TGR_EMAIL_DELIVERY = "tg_react.delivery.InlineEmailDelivery"
+    delivery = get_email_delivery()
+    assert get_email_delivery() is delivery
+
+    settings.TGR_EMAIL_DELIVERY = ["tg_react.delivery.ThreadPoolEmailDelivery", {}]
+    assert get_email_delivery() is not delivery
+
+    get_email_delivery().shutdown()
+
+
+def test_thread_pool_retries():
+    delivery = ThreadPoolEmailDelivery(retries=2, backoff=0)
+
+    with patch.object(EmailMessage, "send", side_effect=[OSError, OSError, 1]):
+        delivery.deliver(EmailMessage("subject", "body", to=["foo@bar.baz"]))
+        delivery.shutdown()
+
+    assert delivery.stats() == {"sent": 1, "failed": 0, "retried": 2, "queued": 0}
+
+    delivery = ThreadPoolEmailDelivery(retries=1, backoff=0)
+
+    with patch.object(EmailMessage, "send", side_effect=OSError):
+        delivery.deliver(EmailMessage("subject", "body", to=["foo@bar.baz"]))
+        delivery.shutdown()
+
+    assert delivery.stats() == {"sent": 0, "failed": 1, "retried": 1, "queued": 0}
+
+
+def test_thread_pool_queue_is_bounded():
+    delivery = ThreadPoolEmailDelivery(max_workers=1, max_queue=1, backoff=0)
+    release = threading.Event()
+
+    main_thread = threading.current_thread()
+
+    def slow_send(*args, **kwargs):
+        if threading.current_thread() is not main_thread:
+            release.wait(timeout=5)
+
+    with patch.object(EmailMessage, "send", side_effect=slow_send):
+        delivery.deliver(EmailMessage("subject", "body", to=["foo@bar.baz"]))
+
+        # queue is full, the second message is sent inline
+        delivery.deliver(EmailMessage("subject", "body", to=["foo@bar.baz"]))
+        assert delivery.stats() == {"sent": 1, "failed": 0, "retried": 0, "queued": 1}
+
+        release.set()
+        delivery.shutdown()
+
+    assert delivery.stats() == {"sent": 2, "failed": 0, "retried": 0, "queued": 0}
+
+
+def test_thread_pool_full_queue_does_not_back_off():
+    delivery = ThreadPoolEmailDelivery(
+        max_workers=1, max_queue=1, retries=3, backoff=10
+    )
+    release = threading.Event()
+
+    main_thread = threading.current_thread()
+
+    def send(*args, **kwargs):
+        if threading.current_thread() is main_thread:
+            raise OSError("SMTP down")
+
+        release.wait(timeout=5)
+
+    with patch.object(EmailMessage, "send", side_effect=send), patch(
+        "tg_react.delivery.time.sleep"
+    ) as sleep:
+        # Fills the queue
+        delivery.deliver(EmailMessage("subject", "body", to=["foo@bar.baz"]))
+
+        # Sent inline with a single attempt, the failure is counted and not raised
+        delivery.deliver(EmailMessage("subject", "body", to=["foo@bar.baz"]))
+        assert not sleep.called
+        assert delivery.stats() == {"sent": 0, "failed": 1, "retried": 0, "queued": 1}
+
+        release.set()
+        delivery.shutdown()
+
+    assert delivery.stats() == {"sent": 1, "failed": 1, "retried": 0, "queued": 0}
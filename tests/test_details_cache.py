@@ -0,0 +1,219 @@
+import json
+
+import django
+import pytest
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from model_bakery import baker
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from tg_react.api.accounts.serializers import UserDetailsSerializer
+from tg_react.api.accounts.details_cache import invalidate_user_details
+
+
+class GroupCountField(serializers.Field):
+    """Queries the database while serializing"""
+
+    def to_representation(self, value):
+        return value.groups.count()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def details_cache(settings):
+    settings.TGR_USER_DETAILS_CACHE = True
+
+
+@pytest.fixture
+def user():
+    return baker.make(User, is_staff=False, email="foo@bar.baz", first_name="Foo")
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_login(user)
+
+    return client
+
+
+@pytest.fixture
+def serialized(monkeypatch):
+    calls = []
+    to_representation = UserDetailsSerializer.to_representation
+
+    def counting(self, instance):
+        calls.append(instance.pk)
+        return to_representation(self, instance)
+
+    monkeypatch.setattr(UserDetailsSerializer, "to_representation", counting)
+
+    return calls
+
+
+@pytest.mark.django_db
+def test_disabled_by_default(client, serialized):
+    response = client.get(reverse("api-user-details"))
+
+    assert response.status_code == 200
+    assert "ETag" not in response
+
+    client.get(reverse("api-user-details"))
+    assert len(serialized) == 2
+
+
+@pytest.mark.django_db
+def test_cached_payload_and_etag(details_cache, client, serialized):
+    response = client.get(reverse("api-user-details"))
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "Foo"
+
+    etag = response["ETag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+
+    response = client.get(reverse("api-user-details"))
+    assert response.json()["first_name"] == "Foo"
+    assert response["ETag"] == etag
+    assert len(serialized) == 1
+
+    response = client.get(reverse("api-user-details"), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response["ETag"] == etag
+
+    response = client.get(
+        reverse("api-user-details"), HTTP_IF_NONE_MATCH=f'"other", W/{etag}'
+    )
+    assert response.status_code == 304
+
+    response = client.get(reverse("api-user-details"), HTTP_IF_NONE_MATCH='"other"')
+    assert response.status_code == 200
+    assert len(serialized) == 1
+
+
+@pytest.mark.django_db
+def test_invalidated_on_save(details_cache, client, user, serialized):
+    etag = client.get(reverse("api-user-details"))["ETag"]
+
+    user.first_name = "Bar"
+    user.save()
+
+    response = client.get(reverse("api-user-details"), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "Bar"
+    assert response["ETag"] != etag
+    assert len(serialized) == 2
+
+
+@pytest.mark.django_db
+def test_invalidated_on_update(details_cache, client, user):
+    etag = client.get(reverse("api-user-details"))["ETag"]
+
+    response = client.patch(reverse("api-user-details"), data={"first_name": "Bar"})
+    assert response.status_code == 200
+
+    response = client.get(reverse("api-user-details"), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "Bar"
+
+    # Bypasses post_save
+    User.objects.filter(pk=user.pk).update(first_name="Baz")
+    invalidate_user_details(user.pk)
+
+    assert client.get(reverse("api-user-details")).json()["first_name"] == "Baz"
+
+
+@pytest.mark.django_db
+def test_follows_excluded_fields(details_cache, settings, client):
+    assert "first_name" in client.get(reverse("api-user-details")).json()
+
+    settings.TGR_EXCLUDED_USER_FIELDS = ["first_name"]
+
+    assert "first_name" not in client.get(reverse("api-user-details")).json()
+
+
+@pytest.mark.django_db
+def test_anonymous_not_cached(details_cache):
+    response = APIClient().get(reverse("api-user-details"))
+
+    assert response.status_code == 401
+    assert "ETag" not in response
+
+
+@pytest.mark.django_db
+def test_cached_payload_uses_serializer_context(settings, client):
+    settings.TGR_USER_EXTRA_FIELDS = {
+        "profile": [
+            "tests.test_representation.RequestHostField",
+            {"source": "username", "read_only": True},
+        ],
+    }
+    uncached = client.get(reverse("api-user-details")).json()
+    assert uncached["profile"].startswith("testserver/")
+
+    settings.TGR_USER_DETAILS_CACHE = True
+    assert client.get(reverse("api-user-details")).json() == uncached
+    assert client.get(reverse("api-user-details")).json() == uncached
+
+
+@pytest.mark.skipif(django.VERSION < (4, 1), reason="async ORM needs Django 4.1+")
+@pytest.mark.urls("tests.urls_async")
+@pytest.mark.django_db
+def test_async_user_details(details_cache, async_client, user, serialized):
+    async_client.force_login(user)
+
+    def get(**headers):
+        async def send():
+            return await async_client.get(reverse("api-user-details"), **headers)
+
+        return async_to_sync(send)()
+
+    etag = get()["ETag"]
+    response = get(**{"if-none-match": etag})
+    assert response.status_code == 304
+    assert len(serialized) == 1
+
+    async def update():
+        return await async_client.patch(
+            reverse("api-user-details"),
+            json.dumps({"first_name": "Bar"}),
+            content_type="application/json",
+        )
+
+    assert async_to_sync(update)().status_code == 200
+
+    response = get(**{"if-none-match": etag})
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "Bar"
+
+
+@pytest.mark.skipif(django.VERSION < (4, 1), reason="async ORM needs Django 4.1+")
+@pytest.mark.urls("tests.urls_async")
+@pytest.mark.django_db
+@pytest.mark.parametrize("cached", [False, True])
+def test_async_user_details_field_queries(settings, async_client, user, cached):
+    settings.TGR_USER_DETAILS_CACHE = cached
+    settings.TGR_USER_EXTRA_FIELDS = {
+        "group_count": [
+            "tests.test_details_cache.GroupCountField",
+            {"source": "*", "read_only": True},
+        ],
+    }
+    async_client.force_login(user)
+
+    async def send():
+        return await async_client.get(reverse("api-user-details"))
+
+    response = async_to_sync(send)()
+    assert response.status_code == 200
+    assert response.json()["group_count"] == 0
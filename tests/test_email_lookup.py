@@ -0,0 +1,165 @@
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from tg_react.api.accounts.serializers import (
+    ForgotPasswordSerializer,
+    SignupSerializer,
+)
+from tg_react.email_lookup import (
+    EMAIL_LOWER_INDEX_NAME,
+    add_email_lower_index,
+    email_lower_index,
+    filter_by_email,
+)
+from tg_react.settings import configure
+
+
+@pytest.fixture
+def case_insensitive(settings):
+    settings.TGR_EMAIL_CASE_SENSITIVE = False
+    settings.TGR_USER_SIGNUP_FIELDS = []
+
+
+@pytest.fixture
+def normalized(settings, case_insensitive):
+    # auth.User has no normalized e-mail column, last_name stands in for it
+    settings.TGR_EMAIL_LOOKUP = "normalized"
+    settings.TGR_NORMALIZED_EMAIL_FIELD = "last_name"
+
+
+def test_invalid_lookup(settings):
+    settings.TGR_EMAIL_LOOKUP = "iexact"
+
+    with pytest.raises(ImproperlyConfigured):
+        configure()
+
+
+@pytest.mark.django_db
+def test_exact_lookup_misses_mixed_case(case_insensitive):
+    baker.make(User, email="Foo@Bar.baz")
+
+    serializer = SignupSerializer(data={"email": "FOO@bar.baz", "password": "x"})
+    assert serializer.is_valid()
+
+
+@pytest.mark.django_db
+def test_lower_lookup(settings, case_insensitive):
+    settings.TGR_EMAIL_LOOKUP = "lower"
+    user = baker.make(User, email="Foo@Bar.baz")
+
+    serializer = SignupSerializer(data={"email": "FOO@bar.baz", "password": "x"})
+    assert not serializer.is_valid()
+    assert "email" in serializer.errors
+
+    serializer = ForgotPasswordSerializer(data={"email": "foo@BAR.baz"})
+    assert serializer.is_valid()
+    assert serializer.user == user
+
+    with CaptureQueriesContext(connection) as queries:
+        assert filter_by_email(User.objects.all(), "foo@bar.baz").exists()
+
+    assert 'LOWER("auth_user"."email")' in queries[0]["sql"]
+
+
+@pytest.mark.django_db
+def test_lookups_ignored_when_case_sensitive(settings):
+    settings.TGR_EMAIL_LOOKUP = "lower"
+
+    with CaptureQueriesContext(connection) as queries:
+        filter_by_email(User.objects.all(), "Foo@bar.baz").exists()
+
+    assert "LOWER" not in queries[0]["sql"]
+
+
+@pytest.mark.django_db
+def test_normalized_lookup(normalized):
+    user = baker.make(User, email="Foo@Bar.baz")
+    assert user.last_name == "foo@bar.baz"
+
+    serializer = ForgotPasswordSerializer(data={"email": "FOO@bar.baz"})
+    assert serializer.is_valid()
+    assert serializer.user == user
+
+    with CaptureQueriesContext(connection) as queries:
+        assert filter_by_email(User.objects.all(), "foo@bar.baz").exists()
+
+    assert '"auth_user"."last_name" = ' in queries[0]["sql"]
+
+
+def backfill(*args):
+    out = StringIO()
+    call_command("tgr_backfill_normalized_emails", *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("has_alias", [True, False])
+def test_backfill_normalized_emails(normalized, monkeypatch, has_alias):
+    if not has_alias:
+        # QuerySet.alias is new in Django 3.2
+        monkeypatch.delattr(QuerySet, "alias")
+
+    users = [
+        baker.make(User, email=f"User{i}@Example.com", last_name="") for i in range(5)
+    ]
+    # Created before the lookup was enabled
+    User.objects.update(last_name="")
+    User.objects.filter(pk=users[0].pk).update(last_name="user0@example.com")
+
+    output = backfill("--dry-run")
+    assert "Done, 4 users would be updated" in output
+    assert User.objects.filter(last_name="").count() == 4
+
+    output = backfill("--chunk-size", "3", "--start-after", str(users[0].pk))
+    assert "3 updated" in output
+    assert "Done, 4 users updated" in output
+
+    assert sorted(User.objects.values_list("last_name", flat=True)) == [
+        f"user{i}@example.com" for i in range(5)
+    ]
+
+    assert "Done, 0 users updated" in backfill()
+
+
+@pytest.mark.django_db
+def test_backfill_requires_field(settings):
+    with pytest.raises(CommandError):
+        backfill()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_add_email_lower_index():
+    operation = add_email_lower_index()
+
+    def indexes():
+        with connection.cursor() as cursor:
+            return connection.introspection.get_constraints(cursor, "auth_user")
+
+    with connection.schema_editor() as schema_editor:
+        operation.code(apps, schema_editor)
+
+    assert EMAIL_LOWER_INDEX_NAME in indexes()
+
+    with connection.schema_editor() as schema_editor:
+        operation.reverse_code(apps, schema_editor)
+
+    assert EMAIL_LOWER_INDEX_NAME not in indexes()
+
+
+def test_email_lower_index_needs_django_32():
+    assert email_lower_index().expressions
+
+    with patch("django.VERSION", (3, 1, 0, "final", 0)):
+        with pytest.raises(ImproperlyConfigured):
+            email_lower_index()
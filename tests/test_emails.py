@@ -0,0 +1,68 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.template.loader import get_template
+from django.utils import translation
+from django.utils.autoreload import file_changed
+
+from tg_react.api.accounts import emails
+from tg_react.api.accounts.emails import (
+    build_password_reset_message,
+    clear_email_template_cache,
+    get_email_template,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_email_template_cache()
+    yield
+    clear_email_template_cache()
+
+
+def test_templates_compiled_once():
+    with patch.object(emails, "get_template", wraps=get_template) as mock:
+        first = get_email_template("emails/password_reset.txt")
+        second = get_email_template("emails/password_reset.txt")
+
+    assert first is second
+    assert mock.call_count == 1
+
+
+@pytest.mark.parametrize("precompile,cached", [(None, 0), (True, 2)])
+def test_precompile_is_opt_in(settings, precompile, cached):
+    if precompile is not None:
+        settings.TGR_PRECOMPILE_EMAIL_TEMPLATES = precompile
+
+    apps.get_app_config("tg_react").ready()
+
+    assert len(emails._template_cache) == cached  # pylint: disable=protected-access
+
+
+def test_cache_shared_between_languages():
+    user = User(email="foo@bar.baz")
+
+    with translation.override("en"):
+        en_message = build_password_reset_message(user, "abc")
+
+    with translation.override("et"):
+        et_message = build_password_reset_message(user, "abc")
+
+    assert en_message.subject == "Password restore"
+    assert et_message.subject == "Parooli taastamine"
+    assert "/reset_password/abc" in et_message.body
+    assert len(emails._template_cache) == 2  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize("debug,cleared", [(True, True), (False, False)])
+def test_cache_cleared_on_template_change(settings, debug, cleared):
+    settings.DEBUG = debug
+    get_email_template("emails/password_reset.txt")
+
+    file_changed.send(sender=None, file_path=Path("emails/password_reset.txt"))
+
+    assert (emails._template_cache == {}) is cleared  # pylint: disable=protected-access
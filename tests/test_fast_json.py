@@ -0,0 +1,101 @@
+import datetime
+import decimal
+import io
+import uuid
+
+import pytest
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.functional import lazy
+from model_bakery import baker
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from tg_react.api.accounts.serializers import UserDetailsSerializer
+from tg_react.api.fast_json import ORJSONParser, ORJSONRenderer
+
+
+PAYLOAD = {
+    "aware": datetime.datetime(
+        2022, 3, 4, 5, 6, 7, 123456, tzinfo=datetime.timezone.utc
+    ),
+    "naive": datetime.datetime(2022, 3, 4, 5, 6, 7),
+    "date": datetime.date(2022, 3, 4),
+    "time": datetime.time(5, 6, 7, 123456),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "decimal": decimal.Decimal("1.50"),
+    "lazy": lazy(lambda: "lazy", str)(),
+    "separators": "a\u2028b\u2029c",
+    "unicode": "õäöü",
+    "nested": [{"big": 2**70}, None, True, 1.5],
+}
+
+
+def test_renderer_matches_drf():
+    for data in (PAYLOAD, {"nested": [1, "2"]}, []):
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    assert ORJSONRenderer().render(None) == b""
+
+
+def test_renderer_indent_falls_back():
+    data = {"a": [1, 2]}
+
+    assert ORJSONRenderer().render(
+        data, "application/json; indent=4"
+    ) == JSONRenderer().render(data, "application/json; indent=4")
+
+
+@pytest.mark.django_db
+def test_renderer_user_details():
+    user = baker.make(User, last_login=timezone.now())
+    data = UserDetailsSerializer(user).data
+
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_parser_matches_drf():
+    content = JSONRenderer().render({"a": [1, 2.5, None], "b": "õ "})
+
+    assert ORJSONParser().parse(io.BytesIO(content)) == JSONParser().parse(
+        io.BytesIO(content)
+    )
+
+    parsed = ORJSONParser().parse(
+        io.BytesIO('{"a": "õ"}'.encode("latin-1")),
+        parser_context={"encoding": "latin-1"},
+    )
+    assert parsed == {"a": "õ"}
+
+
+def test_parser_errors_match_drf():
+    for content in (b"{", b"[NaN]"):
+        with pytest.raises(ParseError) as expected:
+            JSONParser().parse(io.BytesIO(content))
+
+        with pytest.raises(ParseError) as error:
+            ORJSONParser().parse(io.BytesIO(content))
+
+        assert str(error.value) == str(expected.value)
+
+
+@pytest.mark.django_db
+def test_accounts_views_use_orjson(settings):
+    client = APIClient()
+    client.force_login(baker.make(User))
+
+    response = client.patch(
+        reverse("api-user-details"), {"first_name": "Foo"}, format="json"
+    )
+    assert response.status_code == 200
+    assert type(response.accepted_renderer) is ORJSONRenderer
+    assert response.json()["first_name"] == "Foo"
+
+    settings.TGR_USE_ORJSON = False
+
+    response = client.get(reverse("api-user-details"))
+    assert type(response.accepted_renderer) is JSONRenderer
@@ -0,0 +1,112 @@
+from unittest.mock import patch
+
+import pytest
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import user_login_failed
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+
+from tg_react import hashing
+
+
+@pytest.fixture
+def hashing_pool(settings):
+    settings.TGR_PASSWORD_HASHING_PROCESSES = 1
+    yield hashing.get_hashing_executor()
+    hashing.shutdown_hashing_executor()
+
+
+def test_pool_disabled_by_default():
+    assert hashing.get_hashing_executor() is None
+
+    password = async_to_sync(hashing.amake_password)("secret")
+    assert check_password("secret", password)
+
+
+@pytest.mark.parametrize("processes", ["4", 0, -1])
+def test_invalid_pool_size(settings, processes):
+    settings.TGR_PASSWORD_HASHING_PROCESSES = processes
+
+    with pytest.raises(ImproperlyConfigured):
+        hashing.get_hashing_executor()
+
+
+def test_pool_follows_settings(settings, hashing_pool):
+    assert hashing_pool is not None
+    assert hashing.get_hashing_executor() is hashing_pool
+
+    settings.TGR_PASSWORD_HASHING_PROCESSES = 2
+    assert hashing.get_hashing_executor() is not hashing_pool
+
+
+def test_pool_hashing(hashing_pool):
+    password = async_to_sync(hashing.amake_password)("secret")
+
+    assert password.startswith("pbkdf2_sha256$")
+    assert check_password("secret", password)
+
+
+@pytest.mark.django_db
+def test_pool_authenticate(hashing_pool, user):
+    failures = []
+
+    def on_failure(credentials, **kwargs):
+        failures.append(credentials)
+
+    user_login_failed.connect(on_failure)
+    try:
+        result = async_to_sync(hashing.aauthenticate)(username="foo", password="test")
+        assert result == user
+        assert result.backend == hashing.MODEL_BACKEND
+
+        assert (
+            async_to_sync(hashing.aauthenticate)(username="foo", password="wrong")
+            is None
+        )
+        assert (
+            async_to_sync(hashing.aauthenticate)(username="nobody", password="test")
+            is None
+        )
+
+        user.is_active = False
+        user.save()
+        assert (
+            async_to_sync(hashing.aauthenticate)(username="foo", password="test")
+            is None
+        )
+
+    finally:
+        user_login_failed.disconnect(on_failure)
+
+    assert len(failures) == 3
+    assert all(item["password"] != "test" for item in failures)
+
+
+@pytest.mark.django_db
+def test_pool_authenticate_uses_natural_key(hashing_pool, user):
+    def case_insensitive(manager, username):
+        return manager.get(username__iexact=username)
+
+    manager_class = type(User._default_manager)
+    with patch.object(manager_class, "get_by_natural_key", case_insensitive):
+        result = async_to_sync(hashing.aauthenticate)(username="FOO", password="test")
+
+    assert result == user
+
+
+@pytest.mark.django_db
+def test_check_password_upgrades_hash(settings, user):
+    settings.PASSWORD_HASHERS = [
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.MD5PasswordHasher",
+    ]
+    user.password = make_password("test", hasher="md5")
+    user.save()
+
+    assert async_to_sync(hashing.acheck_password)(user, "test")
+
+    user.refresh_from_db()
+    assert user.password.startswith("pbkdf2_sha256$")
+    assert user.check_password("test")
@@ -0,0 +1,147 @@
+import threading
+from unittest.mock import ANY
+
+import pytest
+
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from tg_react.hooks import (
+    HOOK_MODE_BACKGROUND,
+    HOOK_MODE_INLINE,
+    HOOK_MODE_ON_COMMIT,
+    get_hook_executor,
+    resolve_hooks,
+)
+from tg_react.settings import get_config
+
+
+calls = []
+background_done = threading.Event()
+
+
+def record_first(**kwargs):
+    calls.append(("first", kwargs))
+
+
+def record_second(**kwargs):
+    calls.append(("second", kwargs))
+
+
+async def record_async(**kwargs):
+    calls.append(("async", kwargs))
+
+
+def record_background(**kwargs):
+    calls.append(("background", kwargs))
+    background_done.set()
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+    background_done.clear()
+
+
+def login(user):
+    return APIClient().post(
+        reverse("api-user-login"),
+        data={"username": user.username, "password": "test"},
+    )
+
+
+def test_resolve_hooks():
+    assert resolve_hooks(None, "TGR_POST_LOGIN_HANDLER") == ()
+
+    (hook,) = resolve_hooks("tests.test_hooks.record_first", "TGR_POST_LOGIN_HANDLER")
+    assert hook.handler is record_first
+    assert hook.mode == HOOK_MODE_INLINE
+    assert hook.is_async is False
+
+    (hook,) = resolve_hooks(
+        [["tests.test_hooks.record_async", {"mode": "on_commit"}]],
+        "TGR_POST_LOGIN_HANDLER",
+    )
+    assert hook.mode == HOOK_MODE_ON_COMMIT
+    assert hook.is_async is True
+
+
+@pytest.mark.parametrize(
+    "value", [1, [1], [["tests.test_hooks.record_first", {"mode": "later"}]]]
+)
+def test_resolve_hooks_invalid(value):
+    with pytest.raises(ImproperlyConfigured):
+        resolve_hooks(value, "TGR_POST_LOGIN_HANDLER")
+
+
+def test_handlers_resolved_once(settings):
+    settings.TGR_POST_LOGIN_HANDLER = "tests.test_hooks.record_first"
+
+    assert get_config().post_login_hooks is get_config().post_login_hooks
+
+
+def test_hook_executor_follows_settings(settings):
+    executor = get_hook_executor()
+    assert get_hook_executor() is executor
+
+    settings.TGR_HOOK_EXECUTOR_WORKERS = 2
+    assert get_hook_executor() is not executor
+    assert get_hook_executor()._max_workers == 2
+
+
+def test_hook_executor_invalid_workers(settings):
+    settings.TGR_HOOK_EXECUTOR_WORKERS = 0
+
+    with pytest.raises(ImproperlyConfigured):
+        get_hook_executor()
+
+
+@pytest.mark.django_db
+def test_multiple_login_handlers(settings, user):
+    settings.TGR_POST_LOGIN_HANDLER = [
+        "tests.test_hooks.record_first",
+        "tests.test_hooks.record_second",
+        "tests.test_hooks.record_async",
+    ]
+
+    assert login(user).status_code == 200
+
+    assert calls == [
+        ("first", {"user": user, "request": ANY, "old_session": ANY}),
+        ("second", {"user": user, "request": ANY, "old_session": ANY}),
+        ("async", {"user": user, "request": ANY, "old_session": ANY}),
+    ]
+
+
+@pytest.mark.django_db
+def test_on_commit_handler(settings, user, django_capture_on_commit_callbacks):
+    settings.TGR_POST_LOGIN_HANDLER = [
+        ["tests.test_hooks.record_first", {"mode": HOOK_MODE_ON_COMMIT}],
+    ]
+
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        assert login(user).status_code == 200
+
+    assert calls == []
+    assert len(callbacks) == 1
+
+    callbacks[0]()
+    assert [name for name, _ in calls] == ["first"]
+
+
+@pytest.mark.django_db
+def test_background_handler(settings, user):
+    settings.TGR_POST_LOGOUT_HANDLER = [
+        ["tests.test_hooks.record_background", {"mode": HOOK_MODE_BACKGROUND}],
+    ]
+
+    client = APIClient()
+    client.force_login(user)
+
+    assert client.post(reverse("api-user-logout")).status_code == 200
+    assert background_done.wait(timeout=5)
+
+    assert calls == [
+        ("background", {"user": user, "request": ANY, "old_session": ANY}),
+    ]
@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+import sys
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds, generous so slow CI machines pass, a regression importing something heavy at module
+# level still shows up. Locally tg_react takes ~20ms (mostly django itself) and the accounts urls
+# ~110ms (mostly DRF).
+IMPORT_BUDGET = 0.5
+URLS_IMPORT_BUDGET = 1.5
+
+# Not needed to start a process, imported when the urls are loaded
+LAZY_MODULES = [
+    "rest_framework.serializers",
+    "tg_react.api.accounts.emails",
+    "tg_react.api.accounts.details_cache",
+    "tg_react.api.accounts.serializers",
+    "tg_react.api.accounts.views",
+    "tg_react.tokens",
+]
+
+SCRIPT = """
+import json, sys, time
+
+start = time.perf_counter()
+import tg_react
+imported = time.perf_counter()
+
+import django
+django.setup()
+set_up = time.perf_counter()
+
+loaded = [name for name in %r if name in sys.modules]
+
+import tg_react.api.accounts.urls
+done = time.perf_counter()
+
+print(json.dumps({
+    "import": imported - start,
+    "urls": done - set_up,
+    "loaded_by_setup": loaded,
+}))
+""" % (
+    LAZY_MODULES,
+)
+
+
+def measure():
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE="dummy_settings",
+        PYTHONPATH=os.pathsep.join([BASE_DIR, os.path.join(BASE_DIR, "demo")]),
+    )
+    output = subprocess.check_output(
+        [sys.executable, "-c", SCRIPT], cwd=BASE_DIR, env=env
+    )
+
+    return json.loads(output)
+
+
+def test_import_time_budget():
+    # Fresh interpreter, the modules are already imported in the test process
+    result = measure()
+
+    assert result["import"] < IMPORT_BUDGET, result
+    assert result["urls"] < URLS_IMPORT_BUDGET, result
+
+
+def test_setup_does_not_import_views():
+    assert measure()["loaded_by_setup"] == []
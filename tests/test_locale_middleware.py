@@ -1,5 +1,14 @@
+from unittest.mock import patch
+
 import pytest
 
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.utils import translation
+
+from tg_react.middleware import LocaleMiddleware
+
+from tg_react.language import get_language_table, negotiate_language
+
 # Accept-Language
 
 
@@ -21,3 +30,114 @@ def test_locale_middleware(client, language_code, expected):
     response = client.get("/test-language/", **extras)
 
     assert response.content.decode() == f"current_language: {expected}"
+
+
+@pytest.mark.parametrize(
+    "cookie,accept_language",
+    [
+        (None, ""),
+        (None, "et"),
+        (None, "en-US,en;q=0.9"),
+        (None, "en_US"),
+        (None, "ru-RU,ru;q=0.9,en;q=0.8"),
+        (None, "de-DE,de;q=0.9,et;q=0.5"),
+        (None, "de,*;q=0.5,ru;q=0.1"),
+        (None, "!!,xx"),
+        ("et", "ru"),
+        ("en-us", "ru"),
+        ("xx", "ru"),
+        ("", "et"),
+    ],
+)
+def test_negotiate_language_matches_django(rf, settings, cookie, accept_language):
+    request = rf.get("/", HTTP_ACCEPT_LANGUAGE=accept_language)
+    if cookie is not None:
+        request.COOKIES[settings.LANGUAGE_COOKIE_NAME] = cookie
+
+    assert negotiate_language(cookie, accept_language) == (
+        translation.get_language_from_request(request)
+    )
+
+
+def test_language_table():
+    table = get_language_table()
+
+    assert table["en"] == "en"
+    assert table["et"] == "et"
+    # en_US catalog shipped with tg_react falls back to en
+    assert table["en-us"] == "en"
+
+
+def test_negotiate_language_cache(client, settings):
+    settings.LANGUAGES = (("en", "English"), ("et", "Estonian"))
+    assert negotiate_language.cache_info().currsize == 0
+
+    for _ in range(3):
+        response = client.get("/test-language/", HTTP_ACCEPT_LANGUAGE="et,en;q=0.5")
+        assert response.content.decode() == "current_language: et"
+
+    info = negotiate_language.cache_info()
+    assert (info.hits, info.misses) == (2, 1)
+
+    # cache is dropped when languages change
+    settings.LANGUAGES = (("en", "English"),)
+    response = client.get("/test-language/", HTTP_ACCEPT_LANGUAGE="et,en;q=0.5")
+    assert response.content.decode() == "current_language: en"
+
+
+def async_get(async_client, path, **extra):
+    async def get():
+        return await async_client.get(path, **extra)
+
+    return async_to_sync(get)()
+
+
+@pytest.mark.parametrize(
+    "language_code,expected",
+    [
+        (None, "en"),
+        ("et", "et"),
+        ("ru-RU,ru;q=0.9", "ru"),
+    ],
+)
+def test_locale_middleware_async(async_client, language_code, expected):
+    extras = {}
+    if language_code:
+        # AsyncClient passes extra kwargs as raw ASGI headers
+        extras["ACCEPT_LANGUAGE"] = language_code
+
+    with patch("tg_react.middleware.sync_to_async") as mock:
+        response = async_get(async_client, "/test-language-async/", **extras)
+
+    # anonymous requests do not need a thread to resolve the language
+    mock.assert_not_called()
+
+    assert response.content.decode() == f"current_language: {expected}"
+    assert response["Content-Language"] == expected
+    assert "Accept-Language" in response["Vary"]
+
+
+def test_locale_middleware_capabilities():
+    async def get_response(request):
+        pass  # pragma: no cover
+
+    assert LocaleMiddleware.sync_capable and LocaleMiddleware.async_capable
+
+    assert iscoroutinefunction(LocaleMiddleware(get_response))
+    assert not iscoroutinefunction(LocaleMiddleware(lambda request: None))
+
+
+@pytest.mark.django_db
+def test_locale_middleware_async_authenticated(async_client, django_user_model):
+    user = django_user_model.objects.create_user(username="foo", password="test")
+    async_client.force_login(user)
+
+    with patch("tg_react.middleware.sync_to_async", wraps=sync_to_async) as mock:
+        response = async_get(
+            async_client, "/test-language-async/", ACCEPT_LANGUAGE="et"
+        )
+
+    # loading the user from the session needs the database
+    mock.assert_called_once()
+
+    assert response.content.decode() == "current_language: et"
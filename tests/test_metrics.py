@@ -0,0 +1,156 @@
+import socket
+
+import pytest
+
+from django.http import Http404
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from tg_react.metrics import (
+    BaseMetricsSink,
+    NoopMetricsSink,
+    PrometheusMetricsSink,
+    get_metrics_sink,
+    increment,
+    prometheus_metrics_view,
+    timed,
+)
+
+
+class FailingMetricsSink(BaseMetricsSink):
+    def timing(self, name, seconds):
+        raise OSError("sink is down")
+
+    def increment(self, name, value=1):
+        raise OSError("sink is down")
+
+
+@pytest.fixture
+def prometheus(settings):
+    settings.TGR_METRICS_SINK = [
+        "tg_react.metrics.PrometheusMetricsSink",
+        {"buckets": [0.1, 1]},
+    ]
+    return get_metrics_sink()
+
+
+def test_noop_by_default():
+    sink = get_metrics_sink()
+
+    assert isinstance(sink, NoopMetricsSink)
+    assert get_metrics_sink() is sink
+
+    with pytest.raises(Http404):
+        prometheus_metrics_view(RequestFactory().get("/metrics"))
+
+
+def test_prometheus_render():
+    sink = PrometheusMetricsSink(buckets=[0.1, 1])
+
+    sink.timing("login.authenticate", 0.05)
+    sink.timing("login.authenticate", 0.5)
+    sink.timing("login.authenticate", 5)
+    sink.increment("login.success")
+    sink.increment("login.success", 2)
+
+    assert sink.render() == (
+        "# TYPE tg_react_login_authenticate_seconds histogram\n"
+        'tg_react_login_authenticate_seconds_bucket{le="0.1"} 1\n'
+        'tg_react_login_authenticate_seconds_bucket{le="1"} 2\n'
+        'tg_react_login_authenticate_seconds_bucket{le="+Inf"} 3\n'
+        "tg_react_login_authenticate_seconds_sum 5.55\n"
+        "tg_react_login_authenticate_seconds_count 3\n"
+        "# TYPE tg_react_login_success_total counter\n"
+        "tg_react_login_success_total 3\n"
+    )
+
+
+def test_timed_reports_on_error(prometheus):
+    with pytest.raises(ValueError):
+        with timed("signup.create_user"):
+            raise ValueError()
+
+    assert "tg_react_signup_create_user_seconds_count 1" in prometheus.render()
+
+
+def test_failing_sink_is_logged(settings, caplog):
+    settings.TGR_METRICS_SINK = "tests.test_metrics.FailingMetricsSink"
+
+    with timed("signup.create_user"):
+        pass
+
+    increment("login.success")
+
+    # The error raised by the block is not replaced by the sink error
+    with pytest.raises(ValueError):
+        with timed("signup.create_user"):
+            raise ValueError()
+
+    assert [record.exc_info[0] for record in caplog.records] == [OSError] * 3
+
+
+@pytest.mark.django_db
+def test_failing_sink_does_not_break_views(settings, user):
+    settings.TGR_METRICS_SINK = "tests.test_metrics.FailingMetricsSink"
+
+    response = APIClient().post(
+        reverse("api-user-login"),
+        data={"username": user.username, "password": "test"},
+    )
+    assert response.status_code == 200
+
+
+def test_statsd(settings):
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    server.settimeout(5)
+
+    try:
+        settings.TGR_METRICS_SINK = [
+            "tg_react.metrics.StatsdMetricsSink",
+            {"port": server.getsockname()[1], "prefix": "app"},
+        ]
+        sink = get_metrics_sink()
+
+        sink.increment("login.failure")
+        assert server.recv(1024) == b"app.login.failure:1|c"
+
+        sink.timing("login.authenticate", 0.25)
+        assert server.recv(1024) == b"app.login.authenticate:250.000|ms"
+
+    finally:
+        server.close()
+
+
+@pytest.mark.django_db
+def test_account_views_instrumented(prometheus, user):
+    client = APIClient()
+
+    response = client.post(
+        reverse("api-user-login"), data={"username": user.username, "password": "x"}
+    )
+    assert response.status_code == 400
+
+    response = client.post(
+        reverse("api-user-login"),
+        data={"username": user.username, "password": "test"},
+    )
+    assert response.status_code == 200
+
+    response = client.post(reverse("api-forgot-password"), data={"email": user.email})
+    assert response.status_code == 200
+
+    response = prometheus_metrics_view(RequestFactory().get("/metrics"))
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+
+    output = response.content.decode()
+    for line in (
+        "tg_react_login_authenticate_seconds_count 2",
+        "tg_react_login_failure_total 1",
+        "tg_react_login_success_total 1",
+        "tg_react_login_hooks_seconds_count 1",
+        "tg_react_forgot_password_render_seconds_count 1",
+        "tg_react_forgot_password_send_seconds_count 1",
+    ):
+        assert line in output
@@ -0,0 +1,191 @@
+import logging
+
+import pytest
+
+from django.contrib.auth.models import User
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.urls import reverse
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from tg_react.api.accounts.serializers import ForgotPasswordSerializer
+from tg_react.middleware import QueryBudgetMiddleware
+from tg_react.querycount import (
+    DEFAULT_QUERY_BUDGETS,
+    QueryBudgetExceeded,
+    assert_query_budget,
+    get_query_budgets,
+    normalize_sql,
+)
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_login(user)
+
+    return client
+
+
+@pytest.fixture
+def budget_middleware(settings):
+    settings.DEBUG = True
+    settings.MIDDLEWARE = [
+        "tg_react.middleware.QueryBudgetMiddleware",
+        *settings.MIDDLEWARE,
+    ]
+
+
+def test_normalize_sql():
+    assert (
+        normalize_sql(
+            """SELECT "a"."id" FROM "a" WHERE "a"."id" = 12 AND "a"."name" = 'it''s' LIMIT 21"""
+        )
+        == """SELECT "a"."id" FROM "a" WHERE "a"."id" = ? AND "a"."name" = ? LIMIT ?"""
+    )
+
+
+@pytest.mark.django_db
+def test_assert_query_budget(user):
+    with assert_query_budget(2, max_repeats=1) as recorder:
+        User.objects.get(pk=user.pk)
+        User.objects.filter(email=user.email).exists()
+
+    assert len(recorder) == 2
+
+    with pytest.raises(QueryBudgetExceeded, match="ran 2 queries, budget is 1"):
+        with assert_query_budget(1):
+            User.objects.get(pk=user.pk)
+            User.objects.filter(email=user.email).exists()
+
+
+@pytest.mark.django_db
+def test_assert_query_budget_n_plus_one():
+    users = baker.make(User, _quantity=3)
+
+    with pytest.raises(QueryBudgetExceeded, match="repeated a query 3 times"):
+        with assert_query_budget(None, max_repeats=1):
+            for item in users:
+                User.objects.get(pk=item.pk)
+
+
+@pytest.mark.django_db
+def test_savepoints_not_counted(user):
+    with assert_query_budget(1) as recorder:
+        with connection.cursor() as cursor:
+            cursor.execute("SAVEPOINT test_savepoint")
+            User.objects.get(pk=user.pk)
+            cursor.execute("RELEASE SAVEPOINT test_savepoint")
+
+    assert len(recorder) == 1
+
+
+# The current query counts of the accounts endpoints, without any extra fields
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "method, url_name, data, expected",
+    [
+        ("get", "api-user-details", None, 2),
+        ("patch", "api-user-details", {"first_name": "Foo"}, 3),
+        ("get", "api-user-language", None, 2),
+        ("put", "api-user-language", {"language_code": "et"}, 2),
+        ("post", "api-user-logout", {}, 4),
+        ("post", "api-forgot-password", {"email": "foo@bar.baz"}, 3),
+    ],
+)
+def test_account_endpoint_queries(client, method, url_name, data, expected):
+    with assert_query_budget(expected, max_repeats=1) as recorder:
+        response = getattr(client, method)(reverse(url_name), data=data)
+
+    assert response.status_code == 200
+    assert len(recorder) == expected
+    assert expected <= DEFAULT_QUERY_BUDGETS[url_name]
+
+
+@pytest.mark.django_db
+def test_login_queries(user):
+    data = {"username": user.username, "password": "test"}
+
+    with assert_query_budget(5, max_repeats=1) as recorder:
+        response = APIClient().post(reverse("api-user-login"), data=data)
+
+    assert response.status_code == 200
+    assert len(recorder) == DEFAULT_QUERY_BUDGETS["api-user-login"]
+
+
+@pytest.mark.django_db
+def test_signup_queries(settings):
+    settings.TGR_USER_SIGNUP_FIELDS = ["username"]
+    data = {"email": "new@example.com", "password": "test", "username": "new"}
+
+    with assert_query_budget(6, max_repeats=1) as recorder:
+        response = APIClient().post(reverse("api-signup"), data=data)
+
+    assert response.status_code == 200
+    assert len(recorder) == DEFAULT_QUERY_BUDGETS["api-signup"]
+
+
+@pytest.mark.django_db
+def test_restore_password_queries(user):
+    data = {
+        "password": "new",
+        "password_confirm": "new",
+        "uid_and_token_b64": ForgotPasswordSerializer.make_uid_and_token_b64(user),
+    }
+
+    with assert_query_budget(2, max_repeats=1) as recorder:
+        response = APIClient().post(reverse("api-forgot-password-token"), data=data)
+
+    assert response.status_code == 200
+    assert len(recorder) == DEFAULT_QUERY_BUDGETS["api-forgot-password-token"]
+
+
+def test_query_budgets_setting(settings):
+    settings.TGR_QUERY_BUDGETS = {"api-user-details": 1, "custom-view": 10}
+
+    budgets = get_query_budgets()
+
+    assert budgets["api-user-details"] == 1
+    assert budgets["custom-view"] == 10
+    assert budgets["api-signup"] == DEFAULT_QUERY_BUDGETS["api-signup"]
+
+
+def test_middleware_needs_debug(settings):
+    settings.DEBUG = False
+
+    with pytest.raises(MiddlewareNotUsed):
+        QueryBudgetMiddleware(lambda request: HttpResponse())
+
+
+@pytest.mark.django_db
+def test_middleware_warns(budget_middleware, settings, client, caplog):
+    response = client.get(reverse("api-user-details"))
+    assert response["X-TGR-Query-Count"] == "2"
+    assert not caplog.records
+
+    settings.TGR_QUERY_BUDGETS = {"api-user-details": 1}
+
+    with caplog.at_level(logging.WARNING, logger="tg_react.middleware"):
+        response = client.get(reverse("api-user-details"))
+
+    assert response.status_code == 200
+    assert "ran 2 queries, budget is 1" in caplog.text
+    assert "Queries:\n1. SELECT" in caplog.text
+
+
+@pytest.mark.django_db
+def test_middleware_raises(budget_middleware, settings, client):
+    settings.TGR_QUERY_BUDGETS = {"api-user-details": 1}
+    settings.TGR_QUERY_BUDGET_ACTION = "raise"
+
+    with pytest.raises(QueryBudgetExceeded):
+        client.get(reverse("api-user-details"))
+
+
+@pytest.mark.django_db
+def test_middleware_ignores_other_views(budget_middleware, client):
+    response = client.get("/")
+
+    assert "X-TGR-Query-Count" not in response
@@ -0,0 +1,122 @@
+import pytest
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework import fields
+from rest_framework.test import APIRequestFactory
+
+from tg_react.api.accounts.serializers import UserDetailsSerializer
+
+
+def full_name_upper(user):
+    return user.get_full_name().upper()
+
+
+class RequestHostField(fields.CharField):
+    """Output depends on the serializer context, like FileField urls"""
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+        host = request.get_host() if request else ""
+        return f"{host}/{value}"
+
+
+@pytest.fixture
+def user():
+    return baker.make(
+        User,
+        first_name="Foo",
+        last_name="Bar",
+        email="Foo@Bar.baz",
+        last_login=timezone.now(),
+    )
+
+
+def drf_and_compiled(settings, instance):
+    settings.TGR_USER_DETAILS_COMPILED_REPRESENTATION = False
+    expected = UserDetailsSerializer(instance).data
+
+    settings.TGR_USER_DETAILS_COMPILED_REPRESENTATION = True
+    return expected, UserDetailsSerializer(instance).data
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {},
+        {"TGR_EMAIL_CASE_SENSITIVE": False},
+        {"TGR_EXCLUDED_USER_FIELDS": ["is_active", "is_staff", "username"]},
+        {
+            "TGR_USER_EXTRA_FIELDS": {
+                "user_pk": [
+                    "rest_framework.fields.CharField",
+                    {"source": "pk", "read_only": True},
+                ],
+                "full_name": [
+                    "rest_framework.fields.CharField",
+                    {"source": "get_full_name", "read_only": True},
+                ],
+                "missing": [
+                    "rest_framework.fields.CharField",
+                    {"source": "does_not_exist", "required": False},
+                ],
+            }
+        },
+    ],
+)
+def test_compiled_representation_matches_drf(settings, user, overrides):
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+    expected, compiled = drf_and_compiled(settings, user)
+
+    assert compiled == expected
+    assert list(compiled) == list(expected)
+
+
+@pytest.mark.django_db
+def test_compiled_representation_null_values(settings, user):
+    user.last_login = None
+
+    expected, compiled = drf_and_compiled(settings, user)
+
+    assert compiled["last_login"] is None
+    assert compiled == expected
+
+
+def test_compiled_representation_plan_cached(settings):
+    settings.TGR_USER_DETAILS_COMPILED_REPRESENTATION = True
+
+    plan = UserDetailsSerializer.get_representation_plan()
+    assert UserDetailsSerializer.get_representation_plan() is plan
+
+    # fast path entries for plain model fields
+    assert all(getter is not None for _, getter, _ in plan)
+
+    settings.TGR_EXCLUDED_USER_FIELDS = ["username"]
+    assert UserDetailsSerializer.get_representation_plan() is not plan
+
+
+@pytest.mark.django_db
+def test_compiled_representation_uses_serializer_context(settings, user):
+    settings.TGR_USER_EXTRA_FIELDS = {
+        "profile": [
+            "tests.test_representation.RequestHostField",
+            {"source": "username", "read_only": True},
+        ],
+    }
+    # Compile the plan without a request first
+    settings.TGR_USER_DETAILS_COMPILED_REPRESENTATION = True
+    UserDetailsSerializer.get_representation_plan()
+
+    context = {"request": APIRequestFactory().get("/", HTTP_HOST="testserver")}
+
+    settings.TGR_USER_DETAILS_COMPILED_REPRESENTATION = False
+    expected = UserDetailsSerializer(user, context=context).data
+    settings.TGR_USER_DETAILS_COMPILED_REPRESENTATION = True
+    compiled = UserDetailsSerializer(user, context=context).data
+
+    assert compiled["profile"] == f"testserver/{user.username}"
+    assert compiled == expected
@@ -0,0 +1,95 @@
+import pytest
+
+from django.core import mail
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from tg_react.api.accounts.serializers import (
+    ForgotPasswordSerializer,
+    RecoveryPasswordSerializer,
+    get_password_reset_timeout,
+)
+
+
+@pytest.fixture
+def signed(settings):
+    settings.TGR_SIGNED_PASSWORD_RESET_TOKENS = True
+
+
+def recover(uid_and_token_b64):
+    serializer = RecoveryPasswordSerializer(
+        data={
+            "password": "new",
+            "password_confirm": "new",
+            "uid_and_token_b64": uid_and_token_b64,
+        }
+    )
+    serializer.is_valid()
+    return serializer
+
+
+@pytest.mark.django_db
+def test_signed_token_flow(signed, user):
+    response = APIClient().post(
+        reverse("api-forgot-password"), data={"email": user.email}
+    )
+    assert response.status_code == 200
+
+    token = ForgotPasswordSerializer.make_uid_and_token_b64(user)
+    assert token.count(":") == 2
+    assert token.split(":")[0] in mail.outbox[0].body
+
+    serializer = recover(token)
+    assert not serializer.errors
+    assert serializer.user == user
+
+
+@pytest.mark.django_db
+def test_signed_token_rejected_without_queries(
+    signed, settings, user, django_assert_num_queries
+):
+    token = ForgotPasswordSerializer.make_uid_and_token_b64(user)
+    payload, timestamp, signature = token.split(":")
+
+    for forged in (
+        f"{payload}:{timestamp}:{signature[::-1]}",
+        f"{payload}:{timestamp}",
+        "garbage:garbage:garbage",
+    ):
+        with django_assert_num_queries(0):
+            serializer = recover(forged)
+
+        assert serializer.errors["uid_and_token_b64"] == ["Broken data."]
+
+    settings.PASSWORD_RESET_TIMEOUT = -1
+
+    with django_assert_num_queries(0):
+        serializer = recover(token)
+
+    assert "has expired" in serializer.errors["uid_and_token_b64"][0]
+
+
+def test_password_reset_timeout(settings):
+    settings.PASSWORD_RESET_TIMEOUT = 3600
+    assert get_password_reset_timeout() == 3600
+
+    # Django < 3.1 only has PASSWORD_RESET_TIMEOUT_DAYS
+    del settings.PASSWORD_RESET_TIMEOUT
+    settings.PASSWORD_RESET_TIMEOUT_DAYS = 2
+    assert get_password_reset_timeout() == 2 * 24 * 3600
+
+
+@pytest.mark.django_db
+def test_legacy_tokens_during_migration(settings, user, django_assert_num_queries):
+    legacy_token = ForgotPasswordSerializer.make_uid_and_token_b64(user)
+    assert ":" not in legacy_token
+
+    settings.TGR_SIGNED_PASSWORD_RESET_TOKENS = True
+    assert not recover(legacy_token).errors
+
+    settings.TGR_ACCEPT_LEGACY_PASSWORD_RESET_TOKENS = False
+
+    with django_assert_num_queries(0):
+        serializer = recover(legacy_token)
+
+    assert serializer.errors["uid_and_token_b64"] == ["Broken data."]
@@ -0,0 +1,106 @@
+from unittest.mock import patch
+
+import pytest
+
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import resolve, reverse
+from django.urls.resolvers import RoutePattern
+from rest_framework import viewsets
+
+from tg_react import routers
+from tg_react.routers import SuffixlessRouter
+from tests.urls_router import ItemViewSet, path_router, regex_router
+
+
+pytestmark = pytest.mark.urls("tests.urls_router")
+
+
+@pytest.fixture(autouse=True)
+def clear_api_root_cache():
+    for router in (regex_router, path_router):
+        router.urls[-1].callback.view_initkwargs["root_cache"].clear()
+
+
+def test_path_router_uses_path_patterns():
+    patterns = path_router.urls
+
+    assert all(isinstance(pattern.pattern, RoutePattern) for pattern in patterns)
+    assert [str(pattern.pattern) for pattern in patterns] == [
+        "items/",
+        "items/<str:pk>/",
+        "items/<str:pk>/publish/",
+        "tags/<slug:slug>/",
+        "",
+    ]
+
+
+@pytest.mark.parametrize(
+    "name, kwargs",
+    [
+        ("item-list", {}),
+        ("item-detail", {"pk": "1"}),
+        ("item-publish", {"pk": "1"}),
+        ("tag-detail", {"slug": "foo-bar"}),
+        ("api-root", {}),
+    ],
+)
+def test_path_router_matches_regex_router(name, kwargs):
+    regex_url = reverse(f"regex:{name}", kwargs=kwargs)
+    path_url = reverse(f"path:{name}", kwargs=kwargs)
+
+    assert path_url == "/path" + regex_url[len("/regex") :]
+
+    match = resolve(path_url)
+    assert match.url_name == name
+    assert match.kwargs == kwargs
+
+
+def test_path_router_suffixless():
+    router = SuffixlessRouter(use_path=True, trailing_slash=False)
+    router.register("", ItemViewSet, basename="item")
+
+    assert [str(pattern.pattern) for pattern in router.urls] == [
+        "",
+        "<str:pk>",
+        "<str:pk>/publish",
+        "",
+    ]
+
+
+def test_path_router_requires_converter_for_regex_lookups():
+    class RegexViewSet(viewsets.ViewSet):
+        lookup_value_regex = "[0-9]+"
+
+        def retrieve(self, request, pk=None):
+            pass  # pragma: no cover
+
+    router = SuffixlessRouter(use_path=True)
+    router.register("numbers", RegexViewSet, basename="number")
+
+    with pytest.raises(ImproperlyConfigured):
+        router.urls
+
+
+@pytest.mark.parametrize("prefix", ["regex", "path"])
+def test_api_root_resolved_once(client, settings, prefix):
+    settings.ALLOWED_HOSTS = ["testserver", "example.com"]
+
+    with patch("tg_react.routers.reverse", wraps=reverse) as mock:
+        first = client.get(f"/{prefix}/")
+        second = client.get(f"/{prefix}/", HTTP_HOST="example.com")
+
+    # tags has no list route, it is left out like in DRF's APIRootView
+    assert first.json() == {"items": f"http://testserver/{prefix}/items/"}
+    assert second.json() == {"items": f"http://example.com/{prefix}/items/"}
+    assert mock.call_count == 2
+
+
+def test_api_root_cache_size(client, monkeypatch):
+    monkeypatch.setattr(routers, "API_ROOT_CACHE_SIZE", 0)
+
+    with patch("tg_react.routers.reverse", wraps=reverse) as mock:
+        client.get("/path/")
+        response = client.get("/path/")
+
+    assert response.json() == {"items": "http://testserver/path/items/"}
+    assert mock.call_count == 4
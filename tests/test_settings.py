@@ -0,0 +1,72 @@
+from unittest.mock import patch
+
+import pytest
+
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from rest_framework.fields import CharField
+
+from tg_react.checks import check_settings
+from tg_react.settings import configure, get_config
+
+
+def test_config_is_cached():
+    assert get_config() is get_config()
+
+
+def test_config_resolves_extra_fields_once(settings):
+    settings.TGR_USER_EXTRA_FIELDS = {
+        "yolo": ["rest_framework.fields.CharField", {"read_only": True}],
+    }
+
+    with patch("tg_react.settings.import_string", wraps=import_string) as mock:
+        config = get_config()
+        get_config()
+        get_config()
+
+    paths = [call.args[0] for call in mock.call_args_list]
+    assert paths.count("rest_framework.fields.CharField") == 1
+
+    assert dict(config.user_extra_fields) == {"yolo": (CharField, {"read_only": True})}
+
+
+def test_config_rebuilt_on_setting_changed(settings):
+    settings.TGR_EMAIL_CASE_SENSITIVE = True
+    config = get_config()
+    assert config.email_case_sensitive is True
+
+    settings.TGR_EMAIL_CASE_SENSITIVE = False
+    assert get_config() is not config
+    assert get_config().email_case_sensitive is False
+
+
+def test_config_is_frozen():
+    with pytest.raises(AttributeError):
+        get_config().email_case_sensitive = False
+
+
+def test_config_validation(settings):
+    settings.TGR_USER_SIGNUP_FIELDS = "name"
+
+    with pytest.raises(ImproperlyConfigured):
+        configure()
+
+
+def test_settings_check_passes():
+    assert check_settings() == []
+
+
+def test_settings_check_reports_invalid_settings(settings):
+    settings.TGR_AUTH_MODE = "cookie"
+
+    errors = checks.run_checks()
+
+    assert [error.id for error in errors] == ["tg_react.E001"]
+    assert "TGR_AUTH_MODE" in errors[0].msg
+
+
+def test_settings_check_reports_import_errors(settings):
+    settings.TGR_USER_EXTRA_FIELDS = {"yolo": ["rest_framework.fields.NoSuchField", {}]}
+
+    assert [error.id for error in check_settings()] == ["tg_react.E002"]
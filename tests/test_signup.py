@@ -0,0 +1,168 @@
+from unittest.mock import patch
+
+import pytest
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection
+from django.db.models import UniqueConstraint
+from django.db.models.functions import Lower
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+from rest_framework import serializers
+
+from tg_react.api.accounts.serializers import SignupSerializer
+from tg_react.api.accounts.views import SignUpView
+from tg_react.email_lookup import email_is_unique
+
+
+@pytest.fixture
+def signup_fields(settings):
+    settings.TGR_USER_SIGNUP_FIELDS = ["first_name", "last_name", "is_staff"]
+
+
+def test_signup_serializer_fields(signup_fields):
+    serializer = SignupSerializer(data={})
+
+    assert isinstance(serializer, SignupSerializer)
+    assert list(serializer.fields) == ["email", "password", "first_name", "last_name"]
+    assert serializer.fields["first_name"].required
+
+
+def test_signup_serializer_class_cached(signup_fields):
+    first = SignupSerializer(data={})
+    second = SignupSerializer(data={})
+
+    assert type(first) is type(second)
+    assert type(first) is not SignupSerializer
+
+
+def test_signup_serializer_class_follows_settings(settings):
+    settings.TGR_USER_SIGNUP_FIELDS = ["first_name"]
+    assert list(SignupSerializer(data={}).fields) == ["email", "password", "first_name"]
+
+    settings.TGR_USER_SIGNUP_FIELDS = ["last_name"]
+    assert list(SignupSerializer(data={}).fields) == ["email", "password", "last_name"]
+
+
+def test_signup_serializer_leaves_global_state_alone(signup_fields):
+    mapping = dict(serializers.ModelSerializer.serializer_field_mapping)
+
+    SignupSerializer(data={}).is_valid()
+
+    assert serializers.ModelSerializer.serializer_field_mapping == mapping
+    assert list(SignupSerializer._declared_fields) == ["email", "password"]
+
+
+@pytest.mark.django_db
+def test_signup_serializer_validation(signup_fields):
+    serializer = SignupSerializer(
+        data={"email": "foo@bar.baz", "password": "secret", "first_name": "Foo"}
+    )
+
+    assert not serializer.is_valid()
+    assert list(serializer.errors) == ["last_name"]
+
+
+@pytest.mark.django_db
+def test_signup_view(settings, api_client, django_assert_num_queries):
+    settings.TGR_USER_SIGNUP_FIELDS = ["first_name"]
+    data = {"email": "foo@bar.baz", "password": "secret", "first_name": "Foo"}
+
+    encode = PBKDF2PasswordHasher.encode
+    calls = []
+
+    def counting_encode(self, *args, **kwargs):
+        calls.append(args)
+        return encode(self, *args, **kwargs)
+
+    with patch.object(PBKDF2PasswordHasher, "encode", counting_encode), patch.object(
+        PBKDF2PasswordHasher, "verify"
+    ) as verify:
+        # e-mail pre-check, user insert, session key check, session insert, last_login
+        # update and session update, plus the savepoints of the test transaction
+        with django_assert_num_queries(12):
+            response = api_client.post(reverse("api-signup"), data=data)
+
+    assert response.status_code == 200
+    assert response.json() == {"success": True}
+
+    # The password is hashed once and not verified again to log the user in
+    assert len(calls) == 1
+    assert not verify.called
+
+    user = User.objects.get(email="foo@bar.baz")
+    assert user.check_password("secret")
+    assert api_client.get(reverse("api-user-details")).json()["email"] == user.email
+
+
+@pytest.mark.django_db
+def test_signup_view_relies_on_unique_constraint(settings, api_client):
+    # username is unique on auth.User, it stands in for an unique e-mail column
+    settings.TGR_EMAIL_CASE_SENSITIVE = False
+    settings.TGR_EMAIL_LOOKUP = "normalized"
+    settings.TGR_NORMALIZED_EMAIL_FIELD = "username"
+    settings.TGR_USER_SIGNUP_FIELDS = []
+    assert email_is_unique()
+
+    baker.make(User, email="foo@bar.baz", username="foo@bar.baz")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.post(
+            reverse("api-signup"), data={"email": "foo@bar.baz", "password": "secret"}
+        )
+
+    assert response.status_code == 400
+    assert response.json()["errors"]["email"] == [
+        "User with this e-mail address already exists."
+    ]
+    # No pre-check, the insert itself failed
+    assert queries[0]["sql"].startswith("SAVEPOINT")
+    assert queries[1]["sql"].startswith('INSERT INTO "auth_user"')
+    assert User.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_signup_save_user_integrity_errors(settings):
+    baker.make(User, email="foo@bar.baz", username="taken")
+
+    # The e-mail is in use but not unique in the database, the username clashed
+    with pytest.raises(IntegrityError):
+        SignUpView.save_user(User(email="foo@bar.baz", username="taken"))
+
+    # username stands in for an unique e-mail column
+    settings.TGR_EMAIL_CASE_SENSITIVE = False
+    settings.TGR_EMAIL_LOOKUP = "normalized"
+    settings.TGR_NORMALIZED_EMAIL_FIELD = "username"
+    baker.make(User, email="other@bar.baz", username="other@bar.baz")
+
+    assert not SignUpView.save_user(
+        User(email="other@bar.baz", username="other@bar.baz")
+    )
+
+
+def test_email_is_unique(settings):
+    assert not email_is_unique()
+
+    settings.TGR_EMAIL_CASE_SENSITIVE = False
+    settings.TGR_EMAIL_LOOKUP = "lower"
+    assert not email_is_unique()
+
+    with patch.object(
+        User._meta,
+        "constraints",
+        [UniqueConstraint(Lower("email"), name="email_lower_unique")],
+    ):
+        assert email_is_unique()
+
+
+def test_email_is_unique_with_field_constraint():
+    constraint = UniqueConstraint(fields=["email"], name="email_unique")
+
+    with patch.object(User._meta, "constraints", [constraint]):
+        assert email_is_unique()
+
+        # Constraints have no expressions before Django 4.0
+        del constraint.expressions
+        assert email_is_unique()
@@ -0,0 +1,238 @@
+import threading
+from unittest.mock import patch
+
+import django
+import pytest
+
+from asgiref.sync import async_to_sync
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+from rest_framework.permissions import AllowAny
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+
+from tg_react.settings import configure
+from tg_react.throttling import (
+    ConcurrencyLimitMixin,
+    IPTokenBucketThrottle,
+    get_concurrency_semaphore,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def login(api_client, username, password="test", **extra):
+    return api_client.post(
+        reverse("api-user-login"),
+        data={"username": username, "password": password},
+        **extra,
+    )
+
+
+def test_invalid_rates(settings):
+    settings.TGR_THROTTLE_RATES = {"ip": "many"}
+
+    with pytest.raises(ImproperlyConfigured):
+        configure()
+
+    settings.TGR_THROTTLE_RATES = {}
+    settings.TGR_AUTH_CONCURRENCY_LIMIT = 0
+
+    with pytest.raises(ImproperlyConfigured):
+        configure()
+
+
+def test_token_bucket_refills(settings):
+    settings.TGR_THROTTLE_RATES = {"ip": "2/min"}
+
+    now = [1000.0]
+    request = type("Request", (), {"META": {"REMOTE_ADDR": "10.0.0.1"}})()
+
+    def allow():
+        throttle = IPTokenBucketThrottle()
+        with patch.object(IPTokenBucketThrottle, "timer", lambda self: now[0]):
+            return throttle.allow_request(request, None), throttle.wait()
+
+    assert allow() == (True, None)
+    assert allow() == (True, None)
+
+    allowed, wait = allow()
+    assert not allowed
+    assert wait == pytest.approx(30)
+
+    # One token is back after half a minute
+    now[0] += 30
+    assert allow() == (True, None)
+    assert allow()[0] is False
+
+
+@pytest.mark.django_db
+def test_disabled_by_default(api_client, user):
+    with patch("django.contrib.auth.hashers.PBKDF2PasswordHasher.verify") as verify:
+        verify.return_value = False
+
+        for _ in range(10):
+            assert login(api_client, user.username, "wrong").status_code == 400
+
+        assert verify.call_count == 10
+
+
+@pytest.mark.django_db
+def test_username_throttle(settings, api_client, user):
+    settings.TGR_THROTTLE_RATES = {"username": "3/min"}
+
+    with patch("django.contrib.auth.hashers.PBKDF2PasswordHasher.verify") as verify:
+        verify.return_value = False
+
+        for i in range(3):
+            response = login(
+                api_client, user.username, "wrong", REMOTE_ADDR=f"10.0.0.{i}"
+            )
+            assert response.status_code == 400
+
+        # Neither changing the client address nor the username case helps, the password is
+        # not checked anymore
+        response = login(
+            api_client, user.username.upper(), "wrong", REMOTE_ADDR="10.0.1.1"
+        )
+        assert response.status_code == 429
+        assert int(response["Retry-After"]) > 0
+        assert verify.call_count == 3
+
+    # Other usernames are not affected
+    assert login(api_client, "someone-else").status_code == 400
+
+
+@pytest.mark.django_db
+def test_ip_throttle(settings, api_client):
+    settings.TGR_THROTTLE_RATES = {"ip": "2/min"}
+
+    url = reverse("api-forgot-password-token")
+    data = {"password": "a", "password_confirm": "a", "uid_and_token_b64": "x"}
+
+    assert api_client.post(url, data=data).status_code == 400
+    assert api_client.post(url, data=data).status_code == 400
+    assert api_client.post(url, data=data).status_code == 429
+    assert api_client.post(url, data=data, REMOTE_ADDR="10.0.0.2").status_code == 400
+
+
+@pytest.mark.django_db
+def test_concurrency_limit(settings, api_client, user):
+    settings.TGR_AUTH_CONCURRENCY_LIMIT = 1
+    settings.TGR_AUTH_CONCURRENCY_RETRY_AFTER = 5
+
+    semaphore = get_concurrency_semaphore()
+
+    # Another request in progress in this worker
+    assert semaphore.acquire(blocking=False)
+    try:
+        with patch("django.contrib.auth.hashers.PBKDF2PasswordHasher.verify") as verify:
+            response = login(api_client, user.username)
+
+        assert response.status_code == 503
+        assert response["Retry-After"] == "5"
+        assert not verify.called
+
+    finally:
+        semaphore.release()
+
+    # The slot is released again after each request
+    assert login(api_client, user.username).status_code == 200
+    assert login(api_client, user.username, "wrong").status_code == 400
+    assert semaphore.acquire(blocking=False)
+    semaphore.release()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrency_limit_is_shared(settings, user):
+    settings.TGR_AUTH_CONCURRENCY_LIMIT = 1
+
+    entered = threading.Event()
+    proceed = threading.Event()
+
+    from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+    original_verify = PBKDF2PasswordHasher.verify
+
+    def slow_verify(self, password, encoded):
+        entered.set()
+        proceed.wait(5)
+        return original_verify(self, password, encoded)
+
+    responses = []
+
+    def slow_login():
+        responses.append(login(APIClient(), user.username))
+
+    with patch.object(PBKDF2PasswordHasher, "verify", slow_verify):
+        thread = threading.Thread(target=slow_login)
+        thread.start()
+        assert entered.wait(5)
+
+        signup = APIClient().post(
+            reverse("api-signup"),
+            data={"email": "new@example.com", "password": "test", "name": "New"},
+        )
+        assert signup.status_code == 503
+
+        proceed.set()
+        thread.join(5)
+
+    assert responses[0].status_code == 200
+
+
+class FailingView(ConcurrencyLimitMixin, APIView):
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+
+    def post(self, request):
+        raise RuntimeError("boom")
+
+
+def assert_slots_free(limit):
+    semaphore = get_concurrency_semaphore()
+    for _slot in range(limit):
+        assert semaphore.acquire(blocking=False)
+
+    for _slot in range(limit):
+        semaphore.release()
+
+
+def test_concurrency_slot_released_on_uncaught_exception(settings):
+    settings.TGR_AUTH_CONCURRENCY_LIMIT = 2
+    view = FailingView.as_view()
+
+    # Errors DRF re-raises must not use up the slots, these would be 503s otherwise
+    for _attempt in range(3):
+        with pytest.raises(RuntimeError):
+            view(APIRequestFactory().post("/"))
+
+    assert_slots_free(2)
+
+
+@pytest.mark.skipif(django.VERSION < (4, 1), reason="async ORM needs Django 4.1+")
+def test_async_concurrency_slot_released_on_uncaught_exception(settings):
+    from tg_react.api.accounts.async_views import AsyncAPIView  # NOQA
+
+    class AsyncFailingView(ConcurrencyLimitMixin, AsyncAPIView):
+        authentication_classes = ()
+        permission_classes = (AllowAny,)
+
+        async def post(self, request):
+            raise RuntimeError("boom")
+
+    settings.TGR_AUTH_CONCURRENCY_LIMIT = 2
+    view = async_to_sync(AsyncFailingView.as_view())
+
+    for _attempt in range(3):
+        with pytest.raises(RuntimeError):
+            view(APIRequestFactory().post("/"))
+
+    assert_slots_free(2)
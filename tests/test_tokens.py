@@ -0,0 +1,221 @@
+import json
+import time
+from unittest.mock import patch
+
+import django
+import pytest
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from tg_react.tokens import (
+    SignedTokenAuthentication,
+    clear_user_snapshots,
+    make_access_token,
+    make_refresh_token,
+)
+
+
+@pytest.fixture(autouse=True)
+def user_snapshots():
+    clear_user_snapshots()
+    yield
+    clear_user_snapshots()
+
+
+@pytest.fixture
+def token_mode(settings):
+    settings.TGR_AUTH_MODE = "token"
+
+
+def login(client, user):
+    return client.post(
+        reverse("api-user-login"),
+        data={"username": user.username, "password": "test"},
+    )
+
+
+def bearer(token):
+    return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+
+@pytest.mark.django_db
+def test_session_mode_by_default(user):
+    client = APIClient()
+
+    response = login(client, user)
+    assert response.json() == {"success": True}
+
+    response = APIClient().get(
+        reverse("api-user-details"), **bearer(make_access_token(user))
+    )
+    assert response.status_code == 401
+
+    response = client.post(
+        reverse("api-token-refresh"), data={"refresh": make_refresh_token(user)}
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_token_login(token_mode, settings, user, django_assert_num_queries):
+    client = APIClient()
+
+    response = login(client, user)
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["success"]
+    assert data["expires_in"] == 300
+    assert "sessionid" not in response.cookies
+
+    user.refresh_from_db()
+    assert user.last_login is not None
+
+    # First request loads the user snapshot, later ones need no queries
+    client = APIClient()
+    response = client.get(reverse("api-user-details"), **bearer(data["access"]))
+    assert response.status_code == 200
+    assert response.json()["email"] == user.email
+
+    with django_assert_num_queries(0):
+        response = client.get(reverse("api-user-details"), **bearer(data["access"]))
+
+    assert response.status_code == 200
+
+    response = client.post(reverse("api-user-logout"), **bearer(data["access"]))
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_both_mode_signup(settings):
+    settings.TGR_AUTH_MODE = "both"
+    settings.TGR_USER_SIGNUP_FIELDS = ["username"]
+
+    client = APIClient()
+    response = client.post(
+        reverse("api-signup"),
+        data={"email": "new@example.com", "password": "test", "username": "new"},
+    )
+    assert response.status_code == 200
+    assert set(response.json()) == {"success", "access", "refresh", "expires_in"}
+
+    access = response.json()["access"]
+
+    response = client.get(reverse("api-user-details"))
+    assert response.json()["username"] == "new"
+
+    response = APIClient().get(reverse("api-user-details"), **bearer(access))
+    assert response.json()["username"] == "new"
+
+
+@pytest.mark.django_db
+def test_invalid_tokens(token_mode, user):
+    client = APIClient()
+    access = make_access_token(user)
+
+    for header in (
+        "Bearer",
+        f"Bearer {access} extra",
+        f"Bearer {access[:-1]}",
+        f"Bearer {make_refresh_token(user)}",
+    ):
+        response = client.get(reverse("api-user-details"), HTTP_AUTHORIZATION=header)
+        assert response.status_code == 401
+        assert response["WWW-Authenticate"] == "Bearer"
+
+    with patch("django.core.signing.time.time", return_value=time.time() + 301):
+        response = client.get(reverse("api-user-details"), **bearer(access))
+
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_password_change_invalidates_tokens(token_mode, user):
+    client = APIClient()
+    access = make_access_token(user)
+    refresh = make_refresh_token(user)
+
+    assert client.get(reverse("api-user-details"), **bearer(access)).status_code == 200
+
+    user.set_password("new")
+    user.save()
+
+    assert client.get(reverse("api-user-details"), **bearer(access)).status_code == 401
+
+    response = client.post(reverse("api-token-refresh"), data={"refresh": refresh})
+    assert response.status_code == 400
+    assert "refresh" in response.json()["errors"]
+
+
+@pytest.mark.django_db
+def test_refresh(token_mode, user, django_assert_num_queries):
+    client = APIClient()
+
+    with django_assert_num_queries(1):
+        response = client.post(
+            reverse("api-token-refresh"), data={"refresh": make_refresh_token(user)}
+        )
+
+    assert response.status_code == 200
+    access = response.json()["access"]
+
+    # The refresh stored the user snapshot
+    with django_assert_num_queries(0):
+        response = client.get(reverse("api-user-details"), **bearer(access))
+
+    assert response.status_code == 200
+
+    response = client.post(
+        reverse("api-token-refresh"), data={"refresh": make_access_token(user)}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_inactive_user_rejected(token_mode, user):
+    access = make_access_token(user)
+
+    User.objects.filter(pk=user.pk).update(is_active=False)
+
+    response = APIClient().get(reverse("api-user-details"), **bearer(access))
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_snapshot_is_a_copy(token_mode, user):
+    request = RequestFactory().get(
+        "/", HTTP_AUTHORIZATION=f"Bearer {make_access_token(user)}"
+    )
+    authentication = SignedTokenAuthentication()
+
+    first, _ = authentication.authenticate(request)
+    first.first_name = "Changed"
+
+    second, _ = authentication.authenticate(request)
+    assert second == user
+    assert second.first_name != "Changed"
+
+
+@pytest.mark.skipif(django.VERSION < (4, 1), reason="async ORM needs Django 4.1+")
+@pytest.mark.urls("tests.urls_async")
+@pytest.mark.django_db
+def test_async_token_login(token_mode, async_client, user):
+    async def send():
+        response = await async_client.post(
+            reverse("api-user-login"),
+            json.dumps({"username": user.username, "password": "test"}),
+            content_type="application/json",
+        )
+        access = response.json()["access"]
+
+        return await async_client.get(
+            reverse("api-user-details"), authorization=f"Bearer {access}"
+        )
+
+    response = async_to_sync(send)()
+    assert response.status_code == 200
+    assert response.json()["email"] == user.email
@@ -0,0 +1,138 @@
+import json
+import os
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from tg_react.api.translations import catalog as catalog_module
+from tg_react.api.translations.catalog import get_catalog
+
+
+@pytest.fixture
+def tg_react_only(settings):
+    settings.TGR_TRANSLATION_PACKAGES = ["tg_react"]
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    calls = []
+    build_catalog = catalog_module.build_catalog
+
+    def counting(language):
+        calls.append(language)
+        return build_catalog(language)
+
+    monkeypatch.setattr(catalog_module, "build_catalog", counting)
+
+    return calls
+
+
+def test_catalog_content(tg_react_only):
+    catalog = get_catalog("et")
+    data = json.loads(catalog.content)
+
+    assert data["catalog"]["Your account has been disabled."] == (
+        "Sinu konto on blokeeritud."
+    )
+    assert data["plural"] == "(n != 1)"
+    assert "%(app)s administration" not in data["catalog"]
+    assert b": " not in catalog.content
+
+
+def test_catalog_built_once_per_language(tg_react_only, settings, builds):
+    first = get_catalog("et")
+    assert get_catalog("et") is first
+    assert get_catalog("ru") is not first
+    assert builds == ["et", "ru"]
+
+    settings.TGR_TRANSLATION_PACKAGES = None
+
+    assert len(get_catalog("et").content) > len(first.content)
+    assert builds == ["et", "ru", "et"]
+
+
+def test_catalog_view(client, tg_react_only):
+    catalog = get_catalog("et")
+    url = reverse(
+        "api-translation-catalog-hashed",
+        kwargs={"language": "et", "content_hash": catalog.content_hash},
+    )
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.content == catalog.content
+    assert response["Content-Type"] == "application/json"
+    assert response["ETag"] == f'"{catalog.content_hash}"'
+    assert response["Cache-Control"] == "public, max-age=31536000, immutable"
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = client.get(reverse("api-translation-catalog", args=["et"]))
+    assert response.content == catalog.content
+    assert response["Cache-Control"] == "no-cache"
+
+    response = client.get(
+        reverse("api-translation-catalog", args=["et"]),
+        HTTP_IF_NONE_MATCH=f'"{catalog.content_hash}"',
+    )
+    assert response.status_code == 304
+
+
+def test_catalog_view_redirects_outdated_hash(client, tg_react_only):
+    catalog = get_catalog("et")
+
+    response = client.get(
+        reverse(
+            "api-translation-catalog-hashed",
+            kwargs={"language": "et", "content_hash": "0123abcd"},
+        )
+    )
+    assert response.status_code == 302
+    assert response["Location"].endswith(f"/et.{catalog.content_hash}.json")
+
+    assert client.get("/api/translations/xx.json").status_code == 404
+    assert client.get("/api/translations/et.not-hex.json").status_code == 404
+    assert client.post("/api/translations/et.json").status_code == 405
+
+
+def test_index_view(client, tg_react_only):
+    response = client.get(reverse("api-translations"))
+    assert response.status_code == 200
+    assert response["Cache-Control"] == "no-cache"
+
+    languages = response.json()["languages"]
+    assert list(languages) == ["en", "et", "ru"]
+    assert languages["et"]["hash"] == get_catalog("et").content_hash
+    assert client.get(languages["et"]["url"]).content == get_catalog("et").content
+
+    response = client.get(
+        reverse("api-translations"), HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert response.status_code == 304
+
+
+def test_render_translations_command(tmp_path, tg_react_only):
+    out = StringIO()
+    call_command(
+        "tgr_render_translations",
+        "--output-dir",
+        str(tmp_path),
+        "--language",
+        "et",
+        stdout=out,
+    )
+
+    catalog = get_catalog("et")
+    hashed_name = f"et.{catalog.content_hash}.json"
+
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [hashed_name, "et.json", "manifest.json"]
+    )
+    assert (tmp_path / hashed_name).read_bytes() == catalog.content
+    assert json.loads((tmp_path / "manifest.json").read_text()) == {"et": hashed_name}
+    assert hashed_name in out.getvalue()
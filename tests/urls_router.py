@@ -0,0 +1,41 @@
+from django.urls import include, path
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from tg_react.routers import SuffixlessRouter
+
+
+class ItemViewSet(viewsets.ViewSet):
+    def list(self, request):
+        return Response([])
+
+    def retrieve(self, request, pk=None):
+        return Response({"pk": pk})
+
+    @action(detail=True, methods=["post"])
+    def publish(self, request, pk=None):
+        return Response({"published": pk})
+
+
+class TagViewSet(viewsets.ViewSet):
+    lookup_field = "slug"
+    lookup_value_converter = "slug"
+
+    def retrieve(self, request, slug=None):
+        return Response({"slug": slug})
+
+
+regex_router = SuffixlessRouter()
+regex_router.register("items", ItemViewSet, basename="item")
+regex_router.register("tags", TagViewSet, basename="tag")
+
+path_router = SuffixlessRouter(use_path=True)
+path_router.register("items", ItemViewSet, basename="item")
+path_router.register("tags", TagViewSet, basename="tag")
+
+
+urlpatterns = [
+    path("regex/", include((regex_router.urls, "regex"))),
+    path("path/", include((path_router.urls, "path"))),
+]
@@ -0,0 +1,141 @@
+"""
+Serializers used by the async account views. Validation that needs the database runs in the
+``avalidate`` coroutine (called by ``ais_valid``) using the async ORM instead of in the regular
+synchronous validators.
+"""
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext as _
+from rest_framework import serializers
+from rest_framework.serializers import as_serializer_error
+
+from tg_react.api.accounts.serializers import (
+    AuthenticationSerializer,
+    ForgotPasswordSerializer,
+    RecoveryPasswordSerializer,
+    SignupSerializer,
+    UserDetailsSerializer,
+    normalize_email,
+)
+from tg_react import metrics
+from tg_react.email_lookup import email_is_unique, filter_by_email
+from tg_react.hashing import aauthenticate
+
+
+class AsyncValidationMixin:
+    async def avalidate(self, attrs):
+        """Database backed validation, runs after the regular validation succeeded"""
+        return attrs
+
+    async def ais_valid(self, raise_exception=False):
+        if not self.is_valid(raise_exception=raise_exception):
+            return False
+
+        try:
+            self._validated_data = await self.avalidate(self._validated_data)
+        except serializers.ValidationError as exc:
+            self._validated_data = {}
+            self._errors = as_serializer_error(exc)
+
+            if raise_exception:
+                raise serializers.ValidationError(self.errors)
+
+            return False
+
+        return True
+
+
+def field_error(field_name, message):
+    return serializers.ValidationError({field_name: [message]})
+
+
+class AsyncUserDetailsSerializer(AsyncValidationMixin, UserDetailsSerializer):
+    def validate_email(self, data):
+        return normalize_email(data)
+
+    async def avalidate(self, attrs):
+        email = attrs.get("email")
+
+        if email is not None and email != normalize_email(self.instance.email):
+            if await filter_by_email(get_user_model().objects.all(), email).aexists():
+                raise field_error(
+                    "email", _("User with this e-mail address already exists.")
+                )
+
+        return attrs
+
+
+class AsyncAuthenticationSerializer(AsyncValidationMixin, AuthenticationSerializer):
+    def validate(self, attrs):
+        return self.get_credentials(attrs)
+
+    async def avalidate(self, attrs):
+        with metrics.timed("login.authenticate"):
+            user = await aauthenticate(**attrs)
+
+        return self.validate_user(user, attrs)
+
+
+class AsyncSignupSerializer(AsyncValidationMixin, SignupSerializer):
+    def validate_email(self, data):
+        return normalize_email(data)
+
+    async def avalidate(self, attrs):
+        if email_is_unique():
+            return attrs
+
+        if await filter_by_email(
+            get_user_model().objects.all(), attrs["email"]
+        ).aexists():
+            raise field_error(
+                "email", _("User with this e-mail address already exists.")
+            )
+
+        return attrs
+
+
+class AsyncForgotPasswordSerializer(AsyncValidationMixin, ForgotPasswordSerializer):
+    def validate_email(self, email):
+        return normalize_email(email)
+
+    def validate(self, attrs):
+        return attrs
+
+    async def avalidate(self, attrs):
+        self.user = await (
+            filter_by_email(get_user_model().objects.all(), attrs["email"])
+            .order_by("pk")
+            .afirst()
+        )
+        if self.user is None:
+            raise field_error(
+                "email",
+                _("We do not have user with given e-mail address in our system."),
+            )
+
+        return {"uid_and_token_b64": self.make_uid_and_token_b64(self.user)}
+
+
+class AsyncRecoveryPasswordSerializer(AsyncValidationMixin, RecoveryPasswordSerializer):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.uid_and_token = None
+
+    def validate_uid_and_token_b64(self, uid_and_token_b64):
+        self.uid_and_token = self.decode_uid_and_token_b64(uid_and_token_b64)
+
+    async def avalidate(self, attrs):
+        uid, token = self.uid_and_token
+        user_model = get_user_model()
+
+        try:
+            self.user = await user_model.objects.aget(pk=uid)
+        except user_model.DoesNotExist:
+            raise field_error("uid_and_token_b64", _("User not found."))
+
+        try:
+            self.validate_token(self.user, token)
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError({"uid_and_token_b64": exc.detail})
+
+        return attrs
@@ -0,0 +1,30 @@
+from django.urls import path
+
+from .async_views import (
+    AsyncAuthenticationView,
+    AsyncForgotPassword,
+    AsyncLogoutView,
+    AsyncRestorePassword,
+    AsyncSignUpView,
+    AsyncUserDetails,
+)
+from .views import SetLanguageView, TokenRefreshView
+
+
+# Same routes and names as tg_react.api.accounts.urls, backed by the async views
+urlpatterns = [
+    path("me", AsyncUserDetails.as_view(), name="api-user-details"),
+    path("login", AsyncAuthenticationView.as_view(), name="api-user-login"),
+    path("lang", SetLanguageView.as_view(), name="api-user-language"),
+    path("token/refresh", TokenRefreshView.as_view(), name="api-token-refresh"),
+    path("logout", AsyncLogoutView.as_view(), name="api-user-logout"),
+    # signup
+    path("signup", AsyncSignUpView.as_view(), name="api-signup"),
+    # password recovery
+    path("forgot_password", AsyncForgotPassword.as_view(), name="api-forgot-password"),
+    path(
+        "forgot_password/token",
+        AsyncRestorePassword.as_view(),
+        name="api-forgot-password-token",
+    ),
+]
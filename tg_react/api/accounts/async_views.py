@@ -0,0 +1,347 @@
+"""
+Async variants of the account views, for ASGI deployments. Use them by including
+``tg_react.api.accounts.async_urls`` instead of ``tg_react.api.accounts.urls``.
+
+Database access goes through the async ORM and django.contrib.auth's async functions
+(``aauthenticate``, ``alogin``, ``alogout`` on Django 5.0+, thread backed before that) and post
+login/logout hooks are awaited. Password hashing goes through ``tg_react.hashing`` which can
+move it to a process pool. Loading the session user and the remaining sync only operations
+(``save``, serializing the response data) still run through ``sync_to_async``. Requires Django
+4.1+, importing the views on older versions raises ImproperlyConfigured.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.middleware.csrf import get_token
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from tg_react import metrics
+from tg_react.api.fast_json import ORJSONMixin
+from tg_react.compat import (
+    alogin,
+    alogout,
+    iscoroutinefunction,
+    markcoroutinefunction,
+    require_async_orm,
+)
+from tg_react.hashing import aset_password
+from tg_react.hooks import arun_hooks
+from tg_react.middleware import user_needs_loading
+from tg_react.settings import get_config
+from tg_react.throttling import ConcurrencyLimitMixin
+from tg_react.tokens import TokenAuthenticationMixin, issue_tokens
+
+from .details_cache import (
+    aget_user_details,
+    ainvalidate_user_details,
+    details_response,
+)
+from .async_serializers import (
+    AsyncAuthenticationSerializer,
+    AsyncForgotPasswordSerializer,
+    AsyncRecoveryPasswordSerializer,
+    AsyncSignupSerializer,
+    AsyncUserDetailsSerializer,
+)
+from .views import (
+    AuthenticationView,
+    ForgotPassword,
+    LogoutView,
+    RestorePassword,
+    SignUpView,
+    UserDetails,
+    get_signup_backend,
+)
+
+
+# The serializers use the async ORM (aexists, ...)
+require_async_orm("tg_react.api.accounts.async_views")
+
+
+async def ado_login(request, user, backend=None):
+    if hasattr(request, "session"):
+        old_session = request.session.session_key
+
+    else:
+        old_session = None
+
+    await alogin(request, user, backend=backend)
+
+    with metrics.timed("login.hooks"):
+        await arun_hooks(
+            get_config().post_login_hooks,
+            user=user,
+            request=request,
+            old_session=old_session,
+        )
+
+
+async def ado_token_login(request, user):
+    from django.contrib.auth.signals import user_logged_in  # NOQA
+
+    request.user = user
+    await sync_to_async(user_logged_in.send)(
+        sender=user.__class__, request=request, user=user
+    )
+
+    with metrics.timed("login.hooks"):
+        await arun_hooks(
+            get_config().post_login_hooks,
+            user=user,
+            request=request,
+            old_session=None,
+        )
+
+
+async def alogin_response(request, user, backend=None):
+    auth_mode = get_config().auth_mode
+
+    if auth_mode == "token":
+        await ado_token_login(request, user)
+    else:
+        await ado_login(request, user, backend=backend)
+
+    data = {"success": True}
+    if auth_mode != "session":
+        data.update(issue_tokens(user))
+
+    return Response(data)
+
+
+async def ado_logout(request):
+    if hasattr(request, "session"):
+        old_session = request.session.session_key
+
+    else:
+        old_session = None
+
+    old_user = request.user
+
+    await alogout(request)
+
+    with metrics.timed("logout.hooks"):
+        await arun_hooks(
+            get_config().post_logout_hooks,
+            user=old_user,
+            request=request,
+            old_session=old_session,
+        )
+
+
+class AsyncAPIView(ORJSONMixin, APIView):
+    """APIView with coroutine handlers
+
+    Authentication, permission and throttle checks run inline unless they may block, in which case
+    they run in a thread (see ``initial_may_block``).
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+
+        # csrf_exempt returns a sync wrapper on Django < 5.0
+        if not iscoroutinefunction(view):
+            markcoroutinefunction(view)
+
+        return view
+
+    def initial_may_block(self, request):
+        # Token bucket throttles without a configured rate do not touch the cache
+        if any(getattr(throttle, "rate", True) for throttle in self.get_throttles()):
+            return True
+
+        if any(
+            not isinstance(authenticator, SessionAuthentication)
+            for authenticator in request.authenticators
+        ):
+            return True
+
+        return user_needs_loading(request._request)  # pylint: disable=protected-access
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            if self.initial_may_block(request):
+                await sync_to_async(self.initial)(request, *args, **kwargs)
+            else:
+                self.initial(request, *args, **kwargs)
+
+            # Get the appropriate handler method
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:  # pylint: disable=broad-except
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncUserDetails(TokenAuthenticationMixin, AsyncAPIView):
+    serializer_class = AsyncUserDetailsSerializer
+    authentication_classes = UserDetails.authentication_classes
+    permission_classes = UserDetails.permission_classes
+
+    def get_serializer_context(self):
+        return {"request": self.request, "view": self}
+
+    async def get(self, request, *args, **kwargs):
+        # Same as ensure_csrf_cookie on the sync view
+        get_token(request._request)  # pylint: disable=protected-access
+
+        if not request.user.is_authenticated:
+            return Response(
+                {"authenticated": False}, status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        if get_config().user_details_cache:
+            etag, data = await aget_user_details(
+                request.user, self.serializer_class, self.get_serializer_context()
+            )
+            return details_response(request, etag, data)
+
+        serializer = self.serializer_class(
+            request.user, context=self.get_serializer_context()
+        )
+        # Fields may touch the database (e.g. related objects)
+        return Response(await sync_to_async(lambda: serializer.data)())
+
+    async def put(self, request, *args, **kwargs):
+        return await self.update(request, partial=False)
+
+    async def patch(self, request, *args, **kwargs):
+        return await self.update(request, partial=True)
+
+    async def update(self, request, partial):
+        serializer = self.serializer_class(
+            request.user,
+            data=request.data,
+            partial=partial,
+            context=self.get_serializer_context(),
+        )
+        if await serializer.ais_valid():
+            await sync_to_async(serializer.save)()
+            await ainvalidate_user_details(request.user.pk)
+            return Response(await sync_to_async(lambda: serializer.data)())
+
+        return Response(
+            {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+class AsyncAuthenticationView(ConcurrencyLimitMixin, AsyncAPIView):
+    throttle_classes = AuthenticationView.throttle_classes
+    permission_classes = AuthenticationView.permission_classes
+    authentication_classes = AuthenticationView.authentication_classes
+    serializer_class = AsyncAuthenticationSerializer
+
+    async def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        if await serializer.ais_valid():
+            return await alogin_response(request, serializer.user)
+
+        return Response(
+            {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+class AsyncLogoutView(TokenAuthenticationMixin, AsyncAPIView):
+    throttle_classes = LogoutView.throttle_classes
+    permission_classes = LogoutView.permission_classes
+    authentication_classes = LogoutView.authentication_classes
+
+    async def post(self, request):
+        await ado_logout(request)
+
+        return Response({"success": True})
+
+
+class AsyncSignUpView(ConcurrencyLimitMixin, AsyncAPIView):
+    serializer_class = AsyncSignupSerializer
+    throttle_classes = SignUpView.throttle_classes
+    permission_classes = SignUpView.permission_classes
+    authentication_classes = SignUpView.authentication_classes
+
+    async def post(self, request):
+        serializer = self.serializer_class(
+            data=request.data, context={"request": request}
+        )
+        if await serializer.ais_valid():
+            user, password = SignUpView.build_user(serializer.validated_data)
+            # Hashing is CPU bound, keep it off the event loop (see tg_react.hashing)
+            with metrics.timed("signup.hash_password"):
+                await aset_password(user, password)
+
+            if not await sync_to_async(SignUpView.save_user)(user):
+                return SignUpView.email_taken_response()
+
+            return await alogin_response(request, user, backend=get_signup_backend())
+
+        return Response(
+            {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+class AsyncForgotPassword(AsyncAPIView):
+    """
+    Initiate a password restore procedure.
+    """
+
+    serializer_class = AsyncForgotPasswordSerializer
+    authentication_classes = ForgotPassword.authentication_classes
+    permission_classes = ForgotPassword.permission_classes
+
+    send_email_notification = ForgotPassword.send_email_notification
+
+    async def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        if await serializer.ais_valid():
+            # Rendering and (with inline delivery) sending may block
+            await sync_to_async(self.send_email_notification)(
+                serializer.user, serializer.validated_data["uid_and_token_b64"]
+            )
+            return Response({"success": True})
+
+        return Response(
+            {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+class AsyncRestorePassword(ConcurrencyLimitMixin, AsyncAPIView):
+    """
+    Validate token and change a user password.
+    """
+
+    serializer_class = AsyncRecoveryPasswordSerializer
+    throttle_classes = RestorePassword.throttle_classes
+    authentication_classes = RestorePassword.authentication_classes
+    permission_classes = RestorePassword.permission_classes
+
+    async def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        if await serializer.ais_valid():
+            user = serializer.user
+            with metrics.timed("restore_password.hash_password"):
+                await aset_password(user, serializer.validated_data["password"])
+            await sync_to_async(user.save)()
+            return Response({"success": True})
+
+        return Response(
+            {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+        )
@@ -0,0 +1,160 @@
+"""
+Cache of the serialized ``/me`` payload, enabled with ``TGR_USER_DETAILS_CACHE``.
+
+Payloads are stored per user pk together with the user's version stamp. Saving the user
+(``post_save``) or updating it through the ``/me`` view replaces the stamp, so a payload that was
+serialized concurrently with an update is never served afterwards. Code changing the payload
+without ``Model.save`` (``QuerySet.update``, data kept outside the user model) must call
+:func:`invalidate_user_details` itself.
+
+Cached responses carry a strong ``ETag``, a matching ``If-None-Match`` is answered with 304
+before anything is serialized.
+
+Payloads are serialized with the view's serializer context like uncached responses. They are
+shared by all requests of the user, so output depending on more than the user (e.g. absolute
+urls built from the request host) is served as rendered for the request that filled the cache.
+"""
+import hashlib
+import json
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from tg_react.settings import get_config
+
+
+VERSION_KEY = "tgr_user_details_version_%s"
+PAYLOAD_KEY = "tgr_user_details_%s_%s"
+
+# serializer class -> (config, stamp of its field names)
+_field_stamps = {}
+
+
+def get_cache():
+    return caches[get_config().user_details_cache_alias]
+
+
+def get_field_stamp(serializer_class):
+    """Stamp of the serialized field names, so payloads cached before a settings change are not
+    served after it"""
+    config = get_config()
+
+    cached = _field_stamps.get(serializer_class)
+    if cached is None or cached[0] is not config:
+        fields = ",".join(serializer_class().fields)
+        stamp = hashlib.sha256(fields.encode()).hexdigest()[:12]
+        cached = _field_stamps[serializer_class] = (config, stamp)
+
+    return cached[1]
+
+
+def make_etag(data):
+    content = json.dumps(data, cls=JSONEncoder, sort_keys=True, separators=(",", ":"))
+
+    return '"%s"' % hashlib.sha256(content.encode()).hexdigest()
+
+
+def _keys(user, serializer_class):
+    return (
+        VERSION_KEY % user.pk,
+        PAYLOAD_KEY % (get_field_stamp(serializer_class), user.pk),
+    )
+
+
+def _lookup(values, version_key, payload_key):
+    version = values.get(version_key)
+    entry = values.get(payload_key)
+
+    # Entries are (version, etag, data), stale ones are ignored and eventually overwritten
+    if version is not None and entry is not None and entry[0] == version:
+        return version, entry[1:]
+
+    return version, None
+
+
+def get_user_details(user, serializer_class, context=None):
+    """Return (etag, data) for ``user``, serializing only on a cache miss"""
+    cache = get_cache()
+    timeout = get_config().user_details_cache_timeout
+    version_key, payload_key = _keys(user, serializer_class)
+
+    version, cached = _lookup(
+        cache.get_many([version_key, payload_key]), version_key, payload_key
+    )
+    if cached is not None:
+        return cached
+
+    if version is None:
+        cache.add(version_key, uuid.uuid4().hex, timeout)
+        version = cache.get(version_key)
+
+    data = dict(serializer_class(user, context=context).data)
+    etag = make_etag(data)
+    cache.set(payload_key, (version, etag, data), timeout)
+
+    return etag, data
+
+
+async def aget_user_details(user, serializer_class, context=None):
+    cache = get_cache()
+    timeout = get_config().user_details_cache_timeout
+    version_key, payload_key = _keys(user, serializer_class)
+
+    version, cached = _lookup(
+        await cache.aget_many([version_key, payload_key]), version_key, payload_key
+    )
+    if cached is not None:
+        return cached
+
+    if version is None:
+        await cache.aadd(version_key, uuid.uuid4().hex, timeout)
+        version = await cache.aget(version_key)
+
+    # Fields may query the database, which is not allowed on the event loop
+    data = await sync_to_async(
+        lambda: dict(serializer_class(user, context=context).data)
+    )()
+    etag = make_etag(data)
+    await cache.aset(payload_key, (version, etag, data), timeout)
+
+    return etag, data
+
+
+def invalidate_user_details(pk):
+    config = get_config()
+    if config.user_details_cache:
+        get_cache().set(
+            VERSION_KEY % pk, uuid.uuid4().hex, config.user_details_cache_timeout
+        )
+
+
+async def ainvalidate_user_details(pk):
+    config = get_config()
+    if config.user_details_cache:
+        await get_cache().aset(
+            VERSION_KEY % pk, uuid.uuid4().hex, config.user_details_cache_timeout
+        )
+
+
+def etag_matches(request, etag):
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+
+    # If-None-Match uses the weak comparison
+    etags = [
+        value[2:] if value.startswith("W/") else value for value in parse_etags(header)
+    ]
+    return "*" in etags or etag in etags
+
+
+def details_response(request, etag, data):
+    if etag_matches(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    return Response(data, headers={"ETag": etag})
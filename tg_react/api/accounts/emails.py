@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.core.signals import setting_changed
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.utils.autoreload import file_changed
+from django.utils.translation import gettext as _
+
+from tg_react.settings import get_config
+
+
+PASSWORD_RESET_TEMPLATES = ("emails/password_reset.txt", "emails/password_reset.html")
+
+# template name -> compiled template
+_template_cache = {}
+
+
+def get_email_template(name):
+    """Return the compiled template, it is loaded and compiled only once per process
+
+    Compiled Django templates do not depend on the active language (translations are resolved when
+    rendering) so a single entry per template name serves every language.
+    """
+    template = _template_cache.get(name)
+
+    if template is None:
+        template = _template_cache[name] = get_template(name)
+
+    return template
+
+
+def precompile_email_templates():
+    """Fill the template cache at startup, templates the project does not provide are skipped
+
+    Only called with ``TGR_PRECOMPILE_EMAIL_TEMPLATES = True``, otherwise the templates are
+    compiled by the first password reset e-mail.
+    """
+    for name in PASSWORD_RESET_TEMPLATES:
+        try:
+            get_email_template(name)
+        except TemplateDoesNotExist:
+            pass
+
+
+def clear_email_template_cache(**kwargs):
+    _template_cache.clear()
+
+
+def reset_on_templates_changed(*, setting, **kwargs):
+    if setting in {"TEMPLATES", "DEBUG"}:
+        clear_email_template_cache()
+
+
+def reset_on_file_changed(sender, file_path, **kwargs):
+    # Same trigger as Django's own template loader reset when running the autoreloader
+    if settings.DEBUG and file_path.suffix != ".py":
+        clear_email_template_cache()
+
+
+setting_changed.connect(reset_on_templates_changed)
+file_changed.connect(reset_on_file_changed)
+
+
+def build_password_reset_message(user, uid_and_token_b64, connection=None):
+    """Build the password reset email for user from the emails/password_reset.* templates"""
+    # make confirm reset url
+    path = get_config().password_recovery_url % uid_and_token_b64
+    confirm_reset_url = settings.SITE_URL + path
+
+    subject = _("Password restore")
+    context = {"user": user, "confirm_reset_url": confirm_reset_url}
+    text_content = get_email_template("emails/password_reset.txt").render(context)
+    html_content = get_email_template("emails/password_reset.html").render(context)
+
+    msg = EmailMultiAlternatives(
+        subject, text_content, to=[user.email], connection=connection
+    )
+    msg.attach_alternative(html_content, "text/html")
+
+    return msg
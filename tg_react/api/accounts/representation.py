@@ -0,0 +1,75 @@
+from operator import attrgetter
+
+from rest_framework import fields as drf_fields
+from rest_framework.relations import PKOnlyObject
+
+
+# Serializer fields whose to_representation is equivalent to a builtin for the values
+# stored in the matching model fields. Only exact types are used so subclasses that
+# override to_representation keep their behaviour.
+FAST_CONVERTERS = {
+    drf_fields.CharField: str,
+    drf_fields.EmailField: str,
+    drf_fields.IntegerField: int,
+    drf_fields.BooleanField: bool,
+}
+
+
+def compile_representation_plan(fields, model):
+    """Compile readable serializer fields into a flat list of (key, getter, converter) entries
+
+    Fields that map directly to a concrete model attribute get an attrgetter. Their converter is
+    a builtin equivalent to the field's ``to_representation``, or ``None`` to call the field of
+    the serializer being rendered (its output may depend on the serializer context, e.g. the
+    request for absolute file urls). Everything else (callable or nested sources, method fields,
+    relations) gets ``None`` as getter and is rendered through the regular DRF field at call time.
+    """
+    attnames = {f.attname for f in model._meta.concrete_fields}
+    attnames.add("pk")
+
+    plan = []
+    for field in fields:
+        if field.write_only:
+            continue
+
+        if field.source_attrs == [field.source] and field.source in attnames:
+            plan.append(
+                (
+                    field.field_name,
+                    attrgetter(field.source),
+                    FAST_CONVERTERS.get(type(field)),
+                )
+            )
+        else:
+            plan.append((field.field_name, None, None))
+
+    return tuple(plan)
+
+
+def render_representation(plan, serializer, instance):
+    """Produce the same dict as ``Serializer.to_representation`` using a compiled plan"""
+    ret = {}
+
+    for key, getter, convert in plan:
+        if getter is None:
+            field = serializer.fields[key]
+            try:
+                value = field.get_attribute(instance)
+            except drf_fields.SkipField:
+                continue
+
+            check_for_none = value.pk if isinstance(value, PKOnlyObject) else value
+            ret[key] = (
+                None if check_for_none is None else field.to_representation(value)
+            )
+
+        else:
+            value = getter(instance)
+            if value is None:
+                ret[key] = None
+            elif convert is None:
+                ret[key] = serializer.fields[key].to_representation(value)
+            else:
+                ret[key] = convert(value)
+
+    return ret
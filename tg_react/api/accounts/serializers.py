@@ -1,5 +1,6 @@
 import json
 import base64
+import functools
 
 from rest_framework import serializers
 from rest_framework.utils.field_mapping import ClassLookupDict
@@ -7,14 +8,52 @@ from rest_framework.utils.field_mapping import ClassLookupDict
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
+from django.core import signing
 from django.utils.translation import gettext as _
 
-from tg_react.settings import (
-    exclude_fields_from_user_details,
-    get_user_signup_fields,
-    get_email_case_sensitive,
-    get_user_extra_fields,
+from tg_react.api.accounts.representation import (
+    compile_representation_plan,
+    render_representation,
 )
+from tg_react import metrics
+from tg_react.email_lookup import email_is_unique, filter_by_email
+from tg_react.settings import get_config
+
+
+PASSWORD_RESET_SIGNING_SALT = "tg_react.api.accounts.password_reset"
+
+
+def get_password_reset_timeout():
+    """Seconds a signed password reset token stays valid"""
+    timeout = getattr(settings, "PASSWORD_RESET_TIMEOUT", None)
+    if timeout is None:
+        # PASSWORD_RESET_TIMEOUT is new in Django 3.1
+        timeout = settings.PASSWORD_RESET_TIMEOUT_DAYS * 24 * 3600
+
+    return timeout
+
+
+def normalize_email(email):
+    if not get_config().email_case_sensitive:
+        email = email.lower()
+
+    return email
+
+
+class UserModel:
+    """Meta.model resolved on access, importing the serializers does not need the app registry"""
+
+    def __get__(self, instance, owner):
+        return get_user_model()
+
+
+class UserDetailsFields:
+    """Meta.fields of UserDetailsSerializer: the user model fields not in TGR_EXCLUDED_USER_FIELDS"""
+
+    def __get__(self, instance, owner):
+        excluded = get_config().excluded_user_fields
+
+        return [f.name for f in get_user_model()._meta.fields if f.name not in excluded]
 
 
 class UserDetailsSerializer(serializers.ModelSerializer):
@@ -23,12 +62,8 @@ class UserDetailsSerializer(serializers.ModelSerializer):
     email = serializers.EmailField(validators=[])
 
     class Meta:
-        model = get_user_model()
-        fields = [
-            f.name
-            for f in get_user_model()._meta.fields
-            if f.name not in exclude_fields_from_user_details()
-        ]
+        model = UserModel()
+        fields = UserDetailsFields()
 
         extra_kwargs = {
             "password": {"write_only": True},
@@ -43,14 +78,29 @@ class UserDetailsSerializer(serializers.ModelSerializer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        for field in exclude_fields_from_user_details():
+        for field in get_config().excluded_user_fields:
             if field in self.fields:
                 del self.fields[field]
 
+    @classmethod
+    def get_representation_plan(cls):
+        """Representation plan for TGR_USER_DETAILS_COMPILED_REPRESENTATION, rebuilt when settings change"""
+        config = get_config()
+
+        cached = cls.__dict__.get("_representation_plan")
+        if cached is None or cached[0] is not config:
+            plan = compile_representation_plan(cls().fields.values(), cls.Meta.model)
+            cached = cls._representation_plan = (config, plan)
+
+        return cached[1]
+
     def to_representation(self, instance):
-        data = super().to_representation(instance)
+        if get_config().compiled_user_representation:
+            data = render_representation(self.get_representation_plan(), self, instance)
+        else:
+            data = super().to_representation(instance)
 
-        if not get_email_case_sensitive():
+        if not get_config().email_case_sensitive:
             email = data and data.get("email")
             if email:
                 data["email"] = email.lower()
@@ -58,15 +108,12 @@ class UserDetailsSerializer(serializers.ModelSerializer):
         return data
 
     def validate_email(self, data):
-        current_email = self.instance.email
-
-        if not get_email_case_sensitive():
-            data = data.lower()
-            current_email = current_email.lower()
+        data = normalize_email(data)
+        current_email = normalize_email(self.instance.email)
 
         if (
-            get_user_model().objects.filter(email=data).exists()
-            and current_email != data
+            current_email != data
+            and filter_by_email(get_user_model().objects.all(), data).exists()
         ):
             raise serializers.ValidationError(
                 _("User with this e-mail address already exists.")
@@ -77,8 +124,8 @@ class UserDetailsSerializer(serializers.ModelSerializer):
     def get_fields(self):
         static_fields = super().get_fields()
 
-        for name, cfg in get_user_extra_fields().items():
-            static_fields[name] = cfg[0](**cfg[1])
+        for name, (field_class, kwargs) in get_config().user_extra_fields.items():
+            static_fields[name] = field_class(**kwargs)
 
         return static_fields
 
@@ -93,38 +140,48 @@ class AuthenticationSerializer(serializers.Serializer):
 
         self.user = None
 
-    def validate(self, attrs):
+    def get_credentials(self, attrs):
         credentials = {"password": attrs.get("password", None)}
 
         username_field = get_user_model().USERNAME_FIELD
         credentials[username_field] = attrs.get(username_field, None)
 
-        if all(credentials.values()):
-            from django.contrib.auth import authenticate  # NOQA
+        if not all(credentials.values()):
+            raise serializers.ValidationError(
+                _("Please enter both email and password.")
+            )
 
-            if username_field == "email":
-                if not get_email_case_sensitive():
-                    credentials[username_field] = credentials[username_field].lower()
+        if username_field == "email":
+            credentials[username_field] = normalize_email(credentials[username_field])
 
-            user = authenticate(**credentials)
+        return credentials
 
-            if user:
-                if not user.is_active:
-                    raise serializers.ValidationError(
-                        _("Your account has been disabled.")
-                    )
+    def validate_user(self, user, credentials):
+        metrics.increment("login.success" if user else "login.failure")
 
-                self.user = user
-                # hide the password so it wont leak
-                credentials["password"] = "-rr-"
+        if user:
+            if not user.is_active:
+                raise serializers.ValidationError(_("Your account has been disabled."))
 
-                return credentials
+            self.user = user
+            # hide the password so it wont leak
+            credentials["password"] = "-rr-"
 
-            raise serializers.ValidationError(
-                _("Unable to login with provided credentials.")
-            )
+            return credentials
+
+        raise serializers.ValidationError(
+            _("Unable to login with provided credentials.")
+        )
+
+    def validate(self, attrs):
+        credentials = self.get_credentials(attrs)
 
-        raise serializers.ValidationError(_("Please enter both email and password."))
+        from django.contrib.auth import authenticate  # NOQA
+
+        with metrics.timed("login.authenticate"):
+            user = authenticate(**credentials)
+
+        return self.validate_user(user, credentials)
 
     def create(self, validated_data):
         return validated_data
@@ -153,53 +210,84 @@ def phonenumber_validation(data):
     return data
 
 
+# model fields that are never added to the signup serializer
+SIGNUP_EXCLUDED_MODEL_FIELDS = {
+    "id",
+    "email",
+    "password",
+    "is_staff",
+    "is_superuser",
+    "is_active",
+    "date_joined",
+    "last_login",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def build_signup_serializer_class(base_class, model, signup_fields):
+    """Create a subclass of base_class with a required field for each of the model's signup fields
+
+    The result is cached per (base class, user model, signup fields) so model introspection only
+    happens once per process instead of on every signup request.
+    """
+    # Using a copy of ModelSerializers model field to serializer field mapping to build
+    # missing fields for signup serializer, the shared mapping must not be modified
+    field_mapping = dict(serializers.ModelSerializer.serializer_field_mapping)
+
+    try:
+        from phonenumber_field.modelfields import PhoneNumberField  # NOQA
+
+        field_mapping[PhoneNumberField] = serializers.CharField
+    except ImportError:
+        pass
+
+    mapping = ClassLookupDict(field_mapping)
+
+    attrs = {"__module__": base_class.__module__, "_signup_fields_built": True}
+    for model_field in model._meta.fields:
+        if (
+            model_field.name in signup_fields
+            and model_field.name not in SIGNUP_EXCLUDED_MODEL_FIELDS
+        ):
+            field_kwargs = {"required": True}
+            if "phone" in model_field.name:
+                field_kwargs["validators"] = [phonenumber_validation]
+            attrs[model_field.name] = mapping[model_field](**field_kwargs)
+
+    return type(base_class)(base_class.__name__, (base_class,), attrs)
+
+
+def get_signup_serializer_class(base_class):
+    return build_signup_serializer_class(
+        base_class, get_user_model(), get_config().user_signup_fields
+    )
+
+
 class SignupSerializer(serializers.Serializer):
+    """Signup serializer, instantiating it creates an instance of the class built for the
+    current user model and TGR_USER_SIGNUP_FIELDS (see :func:`build_signup_serializer_class`).
+    """
+
     email = serializers.EmailField()
     password = serializers.CharField()
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        fields_we_do_not_want = [
-            "id",
-            "email",
-            "password",
-            "is_staff",
-            "is_superuser",
-            "is_active",
-            "date_joined",
-            "last_login",
-        ]
-        important_signup_fields = get_user_signup_fields()
-        model = get_user_model()
-        # Using ModelSerializers model field to serializer field mapper
-        # to build missing fields for signup serializer
-        original_mapping = serializers.ModelSerializer.serializer_field_mapping
+    def __new__(cls, *args, **kwargs):
+        serializer_class = cls
+        if not cls.__dict__.get("_signup_fields_built", False):
+            serializer_class = get_signup_serializer_class(cls)
 
-        try:
-            from phonenumber_field.modelfields import PhoneNumberField  # NOQA
-
-            original_mapping.update({PhoneNumberField: serializers.CharField})
-        except ImportError:
-            pass
-
-        mapping = ClassLookupDict(original_mapping)
-        for model_field in model._meta.fields:
-            if (
-                model_field.name in important_signup_fields
-                and model_field.name not in fields_we_do_not_want
-            ):
-                field_kwargs = {"required": True}
-                if "phone" in model_field.name:
-                    field_kwargs["validators"] = [phonenumber_validation]
-                self._declared_fields[model_field.name] = mapping[model_field](
-                    **field_kwargs
-                )
+        return super(SignupSerializer, serializer_class).__new__(
+            serializer_class, *args, **kwargs
+        )
 
     def validate_email(self, data):
-        if not get_email_case_sensitive():
-            data = data.lower()
+        data = normalize_email(data)
+
+        # With a unique constraint SignUpView handles duplicates through the IntegrityError
+        if email_is_unique():
+            return data
 
-        if get_user_model().objects.filter(email=data).exists():
+        if filter_by_email(get_user_model().objects.all(), data).exists():
             raise serializers.ValidationError(
                 _("User with this e-mail address already exists.")
             )
@@ -216,32 +304,40 @@ class ForgotPasswordSerializer(serializers.Serializer):
         self.user = None
 
     def validate_email(self, email):
-        user_model = get_user_model()
-
-        if not get_email_case_sensitive():
-            email = email.lower()
+        email = normalize_email(email)
 
-        try:
-            self.user = user_model.objects.get(email=email)
-        except user_model.DoesNotExist:
+        # Case-insensitive lookups may match more than one row
+        self.user = (
+            filter_by_email(get_user_model().objects.all(), email)
+            .order_by("pk")
+            .first()
+        )
+        if self.user is None:
             raise serializers.ValidationError(
                 _("We do not have user with given e-mail address in our system.")
             )
 
         return email
 
-    def validate(self, attrs):
-        # Serialize uid and token to json then encode to base64
-        uid_and_token = json.dumps(
-            {
-                "uid": self.user.pk,
-                "token": default_token_generator.make_token(self.user),
-            }
-        ).encode("utf-8")
-        return {
-            "uid_and_token_b64": base64.urlsafe_b64encode(uid_and_token).decode("ascii")
+    @staticmethod
+    def make_uid_and_token_b64(user):
+        uid_and_token = {
+            "uid": user.pk,
+            "token": default_token_generator.make_token(user),
         }
 
+        if get_config().signed_password_reset_tokens:
+            # payload:timestamp:signature, checked without touching the database
+            return signing.dumps(uid_and_token, salt=PASSWORD_RESET_SIGNING_SALT)
+
+        # Serialize uid and token to json then encode to base64
+        return base64.urlsafe_b64encode(
+            json.dumps(uid_and_token).encode("utf-8")
+        ).decode("ascii")
+
+    def validate(self, attrs):
+        return {"uid_and_token_b64": self.make_uid_and_token_b64(self.user)}
+
 
 class RecoveryPasswordSerializer(serializers.Serializer):
     password = serializers.CharField(required=True)
@@ -261,13 +357,41 @@ class RecoveryPasswordSerializer(serializers.Serializer):
 
         return {"password": attrs["password"]}
 
-    def validate_uid_and_token_b64(self, uid_and_token_b64):
+    @staticmethod
+    def decode_uid_and_token_b64(uid_and_token_b64):
+        """Return (uid, token) without querying the database
+
+        Signed tokens (TGR_SIGNED_PASSWORD_RESET_TOKENS) are rejected here when their
+        signature is invalid or they are older than PASSWORD_RESET_TIMEOUT. The plain base64
+        format is accepted as long as TGR_ACCEPT_LEGACY_PASSWORD_RESET_TOKENS is set.
+        """
+        config = get_config()
+
+        # ":" is not part of the urlsafe base64 alphabet used by the legacy format
+        if ":" in uid_and_token_b64:
+            try:
+                data = signing.loads(
+                    uid_and_token_b64,
+                    salt=PASSWORD_RESET_SIGNING_SALT,
+                    max_age=get_password_reset_timeout(),
+                )
+            except signing.SignatureExpired:
+                RecoveryPasswordSerializer.raise_expired()
+            except (signing.BadSignature, ValueError):
+                raise serializers.ValidationError(_("Broken data."))
+
+        elif config.accept_legacy_password_reset_tokens:
+            try:
+                # Deserialize data from json
+                json_data = base64.urlsafe_b64decode(uid_and_token_b64).decode("utf-8")
+                data = json.loads(json_data)
+            except Exception:
+                raise serializers.ValidationError(_("Broken data."))
+
+        else:
+            raise serializers.ValidationError(_("Broken data."))
 
-        try:
-            # Deserialize data from json
-            json_data = base64.urlsafe_b64decode(uid_and_token_b64).decode("utf-8")
-            data = json.loads(json_data)
-        except Exception:
+        if not isinstance(data, dict):
             raise serializers.ValidationError(_("Broken data."))
 
         uid = data.get("uid", None)
@@ -278,6 +402,11 @@ class RecoveryPasswordSerializer(serializers.Serializer):
         except AssertionError:
             raise serializers.ValidationError(_("Broken data."))
 
+        return uid, token
+
+    def validate_uid_and_token_b64(self, uid_and_token_b64):
+        uid, token = self.decode_uid_and_token_b64(uid_and_token_b64)
+
         user_model = get_user_model()
 
         try:
@@ -285,14 +414,24 @@ class RecoveryPasswordSerializer(serializers.Serializer):
         except user_model.DoesNotExist:
             raise serializers.ValidationError(_("User not found."))
 
-        # validate token
-        if not default_token_generator.check_token(self.user, token):
-            msg_0 = _(
-                "This password recovery link has expired or associated user does not exist."
-            )
-            msg_1 = _("Use password recovery form to get new e-mail with new link.")
+        self.validate_token(self.user, token)
+
+    @staticmethod
+    def raise_expired():
+        msg_0 = _(
+            "This password recovery link has expired or associated user does not exist."
+        )
+        msg_1 = _("Use password recovery form to get new e-mail with new link.")
+
+        raise serializers.ValidationError(f"{msg_0} {msg_1}")
+
+    @staticmethod
+    def validate_token(user, token):
+        with metrics.timed("restore_password.validate_token"):
+            is_valid = default_token_generator.check_token(user, token)
 
-            raise serializers.ValidationError(f"{msg_0} {msg_1}")
+        if not is_valid:
+            RecoveryPasswordSerializer.raise_expired()
 
 
 class LanguageCodeSerializer(serializers.Serializer):
@@ -1,4 +1,4 @@
-from django.urls import re_path
+from django.urls import path
 
 from .views import (
     UserDetails,
@@ -6,22 +6,24 @@ from .views import (
     LogoutView,
     SignUpView,
     SetLanguageView,
+    TokenRefreshView,
 )
 from .views import ForgotPassword
 from .views import RestorePassword
 
 
 urlpatterns = [
-    re_path(r"^me$", UserDetails.as_view(), name="api-user-details"),
-    re_path(r"^login$", AuthenticationView.as_view(), name="api-user-login"),
-    re_path(r"^lang$", SetLanguageView.as_view(), name="api-user-language"),
-    re_path(r"^logout$", LogoutView.as_view(), name="api-user-logout"),
+    path("me", UserDetails.as_view(), name="api-user-details"),
+    path("login", AuthenticationView.as_view(), name="api-user-login"),
+    path("lang", SetLanguageView.as_view(), name="api-user-language"),
+    path("token/refresh", TokenRefreshView.as_view(), name="api-token-refresh"),
+    path("logout", LogoutView.as_view(), name="api-user-logout"),
     # signup
-    re_path(r"^signup$", SignUpView.as_view(), name="api-signup"),
+    path("signup", SignUpView.as_view(), name="api-signup"),
     # password recovery
-    re_path(r"^forgot_password$", ForgotPassword.as_view(), name="api-forgot-password"),
-    re_path(
-        r"^forgot_password/token$",
+    path("forgot_password", ForgotPassword.as_view(), name="api-forgot-password"),
+    path(
+        "forgot_password/token",
         RestorePassword.as_view(),
         name="api-forgot-password-token",
     ),
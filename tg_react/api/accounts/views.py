@@ -1,19 +1,21 @@
 from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.utils.decorators import method_decorator
-from django.utils.module_loading import import_string
+from django.utils.translation import gettext as _
 from django.views.decorators.csrf import ensure_csrf_cookie
 from rest_framework import generics, status
 from rest_framework.authentication import SessionAuthentication
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import (
     AllowAny,
     IsAuthenticated,
     IsAuthenticatedOrReadOnly,
 )
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
 from django.contrib.auth import get_user_model
-from django.utils.translation import gettext as _, get_language_from_request
 
 from .serializers import (
     AuthenticationSerializer,
@@ -23,19 +25,29 @@ from .serializers import (
     RecoveryPasswordSerializer,
     LanguageCodeSerializer,
 )
-
-# for email notifications
-from django.template.loader import get_template
-
-from tg_react.settings import (
-    get_password_recovery_url,
-    get_post_login_handler,
-    get_post_logout_handler,
-    get_signup_skipped_fields,
+from .details_cache import details_response, get_user_details, invalidate_user_details
+from .emails import build_password_reset_message
+
+from tg_react import metrics
+from tg_react.api.fast_json import ORJSONMixin
+from tg_react.delivery import get_email_delivery
+from tg_react.email_lookup import email_conflicts
+from tg_react.hooks import run_hooks
+from tg_react.language import get_language_from_request
+from tg_react.settings import get_config
+from tg_react.throttling import (
+    ConcurrencyLimitMixin,
+    IPTokenBucketThrottle,
+    UsernameTokenBucketThrottle,
+)
+from tg_react.tokens import (
+    TokenAuthenticationMixin,
+    issue_tokens,
+    refresh_access_token,
 )
 
 
-def do_login(request, user):
+def do_login(request, user, backend=None):
     if hasattr(request, "session"):
         old_session = request.session.session_key
 
@@ -44,13 +56,48 @@ def do_login(request, user):
 
     from django.contrib.auth import login  # NOQA
 
-    login(request, user)
+    login(request, user, backend=backend)
+
+    with metrics.timed("login.hooks"):
+        run_hooks(
+            get_config().post_login_hooks,
+            user=user,
+            request=request,
+            old_session=old_session,
+        )
+
+
+def do_token_login(request, user):
+    """Log in without a session for TGR_AUTH_MODE = "token", the caller issues the tokens"""
+    from django.contrib.auth.signals import user_logged_in  # NOQA
+
+    request.user = user
+    user_logged_in.send(sender=user.__class__, request=request, user=user)
 
-    post_login = get_post_login_handler()
-    if post_login:
-        post_login = import_string(post_login)
+    with metrics.timed("login.hooks"):
+        run_hooks(
+            get_config().post_login_hooks,
+            user=user,
+            request=request,
+            old_session=None,
+        )
+
+
+def login_response(request, user, backend=None):
+    """Log the user in according to TGR_AUTH_MODE, the response includes tokens unless it is
+    session only"""
+    auth_mode = get_config().auth_mode
+
+    if auth_mode == "token":
+        do_token_login(request, user)
+    else:
+        do_login(request, user, backend=backend)
+
+    data = {"success": True}
+    if auth_mode != "session":
+        data.update(issue_tokens(user))
 
-        post_login(user=user, request=request, old_session=old_session)
+    return Response(data)
 
 
 def do_logout(request):
@@ -66,11 +113,13 @@ def do_logout(request):
 
     logout(request)
 
-    post_logout = get_post_logout_handler()
-    if post_logout:
-        post_logout = import_string(post_logout)
-
-        post_logout(user=old_user, request=request, old_session=old_session)
+    with metrics.timed("logout.hooks"):
+        run_hooks(
+            get_config().post_logout_hooks,
+            user=old_user,
+            request=request,
+            old_session=old_session,
+        )
 
 
 class UnsafeSessionAuthentication(SessionAuthentication):
@@ -78,7 +127,9 @@ class UnsafeSessionAuthentication(SessionAuthentication):
         pass
 
 
-class UserDetails(generics.RetrieveUpdateAPIView):
+class UserDetails(
+    TokenAuthenticationMixin, ORJSONMixin, generics.RetrieveUpdateAPIView
+):
     serializer_class = UserDetailsSerializer
     authentication_classes = (SessionAuthentication,)
     permission_classes = (IsAuthenticatedOrReadOnly,)
@@ -89,10 +140,22 @@ class UserDetails(generics.RetrieveUpdateAPIView):
     @method_decorator(ensure_csrf_cookie)
     def get(self, request, *args, **kwargs):
         user = self.get_object()
-        if user.is_authenticated:
-            return super().get(request, *args, **kwargs)
+        if not user.is_authenticated:
+            return Response(
+                {"authenticated": False}, status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        if get_config().user_details_cache:
+            etag, data = get_user_details(
+                user, self.get_serializer_class(), self.get_serializer_context()
+            )
+            return details_response(request, etag, data)
+
+        return super().get(request, *args, **kwargs)
 
-        return Response({"authenticated": False}, status=status.HTTP_401_UNAUTHORIZED)
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        invalidate_user_details(serializer.instance.pk)
 
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop("partial", False)
@@ -107,12 +170,12 @@ class UserDetails(generics.RetrieveUpdateAPIView):
         )
 
 
-class AuthenticationView(APIView):
+class AuthenticationView(ORJSONMixin, ConcurrencyLimitMixin, APIView):
     class UnsafeSessionAuthentication(SessionAuthentication):
         def enforce_csrf(self, request):
             pass
 
-    throttle_classes = ()
+    throttle_classes = (IPTokenBucketThrottle, UsernameTokenBucketThrottle)
     permission_classes = (AllowAny,)
     authentication_classes = (UnsafeSessionAuthentication,)
     serializer_class = AuthenticationSerializer
@@ -120,16 +183,14 @@ class AuthenticationView(APIView):
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
-            do_login(request, serializer.user)
-
-            return Response({"success": True})
+            return login_response(request, serializer.user)
 
         return Response(
             {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
         )
 
 
-class SetLanguageView(generics.RetrieveUpdateAPIView):
+class SetLanguageView(ORJSONMixin, generics.RetrieveUpdateAPIView):
 
     throttle_classes = ()
     permission_classes = (AllowAny,)
@@ -166,7 +227,7 @@ class SetLanguageView(generics.RetrieveUpdateAPIView):
         )
 
 
-class LogoutView(APIView):
+class LogoutView(TokenAuthenticationMixin, ORJSONMixin, APIView):
     throttle_classes = ()
     permission_classes = (IsAuthenticated,)
     authentication_classes = (SessionAuthentication,)
@@ -177,40 +238,80 @@ class LogoutView(APIView):
         return Response({"success": True})
 
 
-class SignUpView(APIView):
+def get_signup_backend():
+    """Authentication backend recorded for users logged in right after signup"""
+    backend = "django.contrib.auth.backends.ModelBackend"
+    if backend in settings.AUTHENTICATION_BACKENDS:
+        return backend
+
+    return settings.AUTHENTICATION_BACKENDS[0]
+
+
+class SignUpView(ORJSONMixin, ConcurrencyLimitMixin, APIView):
     serializer_class = SignupSerializer
+    throttle_classes = tuple(api_settings.DEFAULT_THROTTLE_CLASSES) + (
+        IPTokenBucketThrottle,
+        UsernameTokenBucketThrottle,
+    )
     permission_classes = (AllowAny,)
     authentication_classes = (UnsafeSessionAuthentication,)
 
+    @staticmethod
+    def build_user(validated_data):
+        """Return the unsaved user and the raw password"""
+        data = validated_data.copy()
+        password = data.pop("password", None)
+
+        for skipped_field in get_config().signup_skipped_fields:
+            data.pop(skipped_field, None)
+
+        return get_user_model()(**data), password
+
+    @staticmethod
+    def save_user(user):
+        """Insert the user, returns False when the e-mail address is already taken"""
+        try:
+            # Savepoint so the surrounding transaction (ATOMIC_REQUESTS) stays usable
+            with transaction.atomic(), metrics.timed("signup.create_user"):
+                user.save()
+
+        except IntegrityError:
+            if email_conflicts(user):
+                return False
+
+            raise
+
+        return True
+
+    @staticmethod
+    def email_taken_response():
+        return Response(
+            {"errors": {"email": [_("User with this e-mail address already exists.")]}},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
     def post(self, request):
         serializer = self.serializer_class(
             data=request.data, context={"request": request}
         )
         if serializer.is_valid():
-            data = serializer.validated_data.copy()
-            password = data.pop("password", None)
-
-            for skipped_field in get_signup_skipped_fields():
-                data.pop(skipped_field, None)
-
-            user = get_user_model()(**data)
-            user.set_password(password)
-            user.save()
-
-            from django.contrib.auth import authenticate  # NOQA
+            user, password = self.build_user(serializer.validated_data)
 
-            user = authenticate(email=data["email"], password=password)
+            with metrics.timed("signup.hash_password"):
+                user.set_password(password)
 
-            do_login(request, user)
+            if not self.save_user(user):
+                return self.email_taken_response()
 
-            return Response({"success": True})
+            # The password was just set, no need to hash it again in authenticate()
+            return login_response(request, user, backend=get_signup_backend())
 
         return Response(
             {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
         )
 
 
-class ForgotPassword(APIView):
+class ForgotPassword(ORJSONMixin, APIView):
     """
     Initiate a password restore procedure.
     """
@@ -225,21 +326,12 @@ class ForgotPassword(APIView):
     permission_classes = (AllowAny,)
 
     def send_email_notification(self, user, uid_and_token_b64):
-        # define email notification logic
-        from django.core.mail import EmailMultiAlternatives  # NOQA
-
-        # make confirm reset url
-        path = get_password_recovery_url() % uid_and_token_b64
-        confirm_reset_url = settings.SITE_URL + path
+        with metrics.timed("forgot_password.render"):
+            msg = build_password_reset_message(user, uid_and_token_b64)
 
-        subject = _("Password restore")
-        context = {"user": user, "confirm_reset_url": confirm_reset_url}
-        text_content = get_template("emails/password_reset.txt").render(context)
-        html_content = get_template("emails/password_reset.html").render(context)
-
-        msg = EmailMultiAlternatives(subject, text_content, to=[user.email])
-        msg.attach_alternative(html_content, "text/html")
-        msg.send()
+        # Depending on TGR_EMAIL_DELIVERY this may only queue the message
+        with metrics.timed("forgot_password.send"):
+            get_email_delivery().deliver(msg)
 
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
@@ -254,7 +346,7 @@ class ForgotPassword(APIView):
         )
 
 
-class RestorePassword(APIView):
+class RestorePassword(ORJSONMixin, ConcurrencyLimitMixin, APIView):
     """
     Validate token and change a user password.
     """
@@ -267,6 +359,9 @@ class RestorePassword(APIView):
     # }
 
     serializer_class = RecoveryPasswordSerializer
+    throttle_classes = tuple(api_settings.DEFAULT_THROTTLE_CLASSES) + (
+        IPTokenBucketThrottle,
+    )
     authentication_classes = (UnsafeSessionAuthentication,)
     permission_classes = (AllowAny,)
 
@@ -274,10 +369,45 @@ class RestorePassword(APIView):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
             user = serializer.user
-            user.set_password(serializer.validated_data["password"])
+
+            with metrics.timed("restore_password.hash_password"):
+                user.set_password(serializer.validated_data["password"])
+
             user.save()
             return Response({"success": True})
 
         return Response(
             {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
         )
+
+
+class TokenRefreshView(ORJSONMixin, APIView):
+    """
+    Exchange a refresh token for a new access token, see tg_react.tokens.
+    """
+
+    # Example request data
+    # {
+    #   "refresh" : "<refresh token>"
+    # }
+
+    throttle_classes = (IPTokenBucketThrottle,)
+    permission_classes = (AllowAny,)
+    authentication_classes = ()
+
+    def post(self, request):
+        if get_config().auth_mode == "session":
+            raise NotFound()
+
+        refresh = request.data.get("refresh")
+        access = refresh_access_token(refresh) if isinstance(refresh, str) else None
+
+        if access is None:
+            return Response(
+                {"errors": {"refresh": [_("Invalid or expired token.")]}},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(
+            {"access": access, "expires_in": get_config().access_token_lifetime}
+        )
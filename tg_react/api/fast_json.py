@@ -0,0 +1,107 @@
+"""
+orjson backed drop-in replacements for DRF's ``JSONRenderer`` and ``JSONParser``.
+
+Install with ``pip install tg-react[orjson]``. Without orjson both classes behave exactly like the
+DRF ones. Use them like any DRF renderer/parser, e.g. in ``renderer_classes`` of viewsets
+registered with ``SuffixlessRouter`` or in ``DEFAULT_RENDERER_CLASSES``. The accounts views use
+them through :class:`ORJSONMixin` unless ``TGR_USE_ORJSON = False``.
+
+Output matches ``JSONRenderer``: datetimes, dates, times, UUIDs, decimals and lazy strings go
+through DRF's ``JSONEncoder``, ``\\u2028`` and ``\\u2029`` are escaped. Data orjson can not handle
+(e.g. integers over 64 bits) and non default ``UNICODE_JSON``, ``COMPACT_JSON`` or indented
+output fall back to ``JSONRenderer``. Unlike with ``STRICT_JSON``, NaN and infinity render as
+``null`` instead of raising.
+"""
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from tg_react.settings import get_config
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same as JSONRenderer, keeps the output a strict javascript subset
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+
+        if orjson is None or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+
+        data = stream.read()
+
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # Raise with the same error message as JSONParser
+            return super().parse(io.BytesIO(data), media_type, parser_context)
+
+
+def use_orjson():
+    return orjson is not None and get_config().use_orjson
+
+
+class ORJSONMixin:
+    """Use ORJSONRenderer and ORJSONParser in place of the view's JSONRenderer and JSONParser
+
+    Subclasses of the DRF classes are left alone. Disabled with ``TGR_USE_ORJSON = False``.
+    """
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+
+        if use_orjson():
+            renderers = [
+                ORJSONRenderer() if type(renderer) is JSONRenderer else renderer
+                for renderer in renderers
+            ]
+
+        return renderers
+
+    def get_parsers(self):
+        parsers = super().get_parsers()
+
+        if use_orjson():
+            parsers = [
+                ORJSONParser() if type(parser) is JSONParser else parser
+                for parser in parsers
+            ]
+
+        return parsers
@@ -0,0 +1,120 @@
+"""
+Merged translation catalogs as compact JSON for the frontend.
+
+A catalog holds the messages of ``TGR_TRANSLATION_DOMAIN`` (default ``django``) for one language,
+merged from all installed apps and ``LOCALE_PATHS`` with the ``LANGUAGE_CODE`` catalog as
+fallback, in the same format as Django's ``JSONCatalog``:
+``{"catalog": {msgid: str or [plural forms]}, "plural": expression}``.
+
+``TGR_TRANSLATION_PACKAGES`` (app names) limits the catalog to the messages those apps define.
+Their translations still come from the merged catalog, so ``LOCALE_PATHS`` can override them
+(Django ignores per package locale directories for the ``django`` domain).
+
+Catalogs are built once per process and language. The JSON is rendered with sorted keys so the
+content hash is the same in every process.
+"""
+import gettext
+import hashlib
+import json
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.utils.translation import to_locale
+from django.utils.translation.trans_real import DjangoTranslation
+from django.views.i18n import JavaScriptCatalog
+
+from tg_react.language import LANGUAGE_SETTINGS, get_supported_variant
+from tg_react.settings import get_config
+
+
+Catalog = namedtuple("Catalog", ["language", "content", "content_hash"])
+
+# language -> (config, Catalog)
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog_language(language):
+    """Supported language variant for ``language``, or None"""
+    if not settings.USE_I18N:
+        return None
+
+    return get_supported_variant(language)
+
+
+def get_package_msgids(paths, domain, language):
+    """Message ids defined in the catalogs of ``language`` and the fallback language in ``paths``"""
+    msgids = set()
+
+    for localedir in paths:
+        for locale in {to_locale(language), to_locale(settings.LANGUAGE_CODE)}:
+            translation = gettext.translation(
+                domain, localedir=localedir, languages=[locale], fallback=True
+            )
+            for key in getattr(translation, "_catalog", {}):
+                msgids.add(key if isinstance(key, str) else key[0])
+
+    msgids.discard("")
+    return msgids
+
+
+def build_catalog(language):
+    config = get_config()
+
+    view = JavaScriptCatalog(domain=config.translation_domain)
+    view.translation = DjangoTranslation(language, domain=config.translation_domain)
+
+    catalog = view.get_catalog()
+
+    if config.translation_packages is not None:
+        msgids = get_package_msgids(
+            view.get_paths(config.translation_packages),
+            config.translation_domain,
+            language,
+        )
+        catalog = {msgid: value for msgid, value in catalog.items() if msgid in msgids}
+
+    content = json.dumps(
+        {"catalog": catalog, "plural": view.get_plural()},
+        ensure_ascii=False,
+        separators=(",", ":"),
+        sort_keys=True,
+    ).encode()
+
+    return Catalog(language, content, hashlib.sha256(content).hexdigest()[:16])
+
+
+def get_catalog(language):
+    """Return the Catalog of a supported language, built on first use"""
+    config = get_config()
+
+    cached = _catalogs.get(language)
+    if cached is None or cached[0] is not config:
+        with _catalogs_lock:
+            cached = _catalogs.get(language)
+            if cached is None or cached[0] is not config:
+                cached = _catalogs[language] = (config, build_catalog(language))
+
+    return cached[1]
+
+
+def get_catalog_languages():
+    """Supported variants of settings.LANGUAGES, without duplicates"""
+    languages = []
+    for code, _name in settings.LANGUAGES:
+        variant = get_catalog_language(code)
+        if variant is not None and variant not in languages:
+            languages.append(variant)
+
+    return languages
+
+
+def reset_catalogs(*, setting, **kwargs):
+    if setting in LANGUAGE_SETTINGS or setting == "INSTALLED_APPS":
+        with _catalogs_lock:
+            _catalogs.clear()
+
+
+setting_changed.connect(reset_catalogs)
@@ -0,0 +1,33 @@
+from django.urls import path, register_converter
+
+from .views import translation_catalog, translation_index
+
+
+class ContentHashConverter:
+    """Lowercase hex digest of a catalog, as written by tgr_render_translations"""
+
+    regex = "[0-9a-f]+"
+
+    def to_python(self, value):
+        return value
+
+    def to_url(self, value):
+        return value
+
+
+register_converter(ContentHashConverter, "tgr_content_hash")
+
+
+urlpatterns = [
+    path("translations", translation_index, name="api-translations"),
+    path(
+        "translations/<slug:language>.json",
+        translation_catalog,
+        name="api-translation-catalog",
+    ),
+    path(
+        "translations/<slug:language>.<tgr_content_hash:content_hash>.json",
+        translation_catalog,
+        name="api-translation-catalog-hashed",
+    ),
+]
@@ -0,0 +1,86 @@
+"""
+Translation catalog endpoints, include ``tg_react.api.translations.urls``.
+
+- ``translations/<language>.<hash>.json`` serves a catalog (see :mod:`.catalog`) with
+  ``Cache-Control: immutable``. Requests for an outdated hash are redirected to the current one.
+- ``translations/<language>.json`` serves the same content, revalidated with its ``ETag``.
+- ``translations`` lists the hashed URL of every language in ``settings.LANGUAGES``.
+"""
+import hashlib
+import json
+
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_safe
+
+from .catalog import get_catalog, get_catalog_language, get_catalog_languages
+
+
+# A year, as for other fingerprinted static files
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def catalog_url(catalog):
+    return reverse(
+        "api-translation-catalog-hashed",
+        kwargs={"language": catalog.language, "content_hash": catalog.content_hash},
+    )
+
+
+def conditional_json_response(request, content, etag):
+    response = HttpResponse(content, content_type="application/json")
+    response["ETag"] = etag
+
+    return get_conditional_response(request, etag=etag, response=response)
+
+
+@require_safe
+def translation_catalog(request, language, content_hash=None):
+    variant = get_catalog_language(language)
+    if variant is None:
+        raise Http404("Unsupported language")
+
+    catalog = get_catalog(variant)
+
+    if content_hash is not None and (
+        content_hash != catalog.content_hash or variant != language
+    ):
+        return HttpResponseRedirect(catalog_url(catalog))
+
+    response = conditional_json_response(
+        request, catalog.content, f'"{catalog.content_hash}"'
+    )
+
+    if content_hash is None:
+        patch_cache_control(response, no_cache=True)
+    else:
+        patch_cache_control(
+            response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True
+        )
+
+    return response
+
+
+@require_safe
+def translation_index(request):
+    catalogs = [get_catalog(language) for language in get_catalog_languages()]
+
+    content = json.dumps(
+        {
+            "languages": {
+                catalog.language: {
+                    "url": catalog_url(catalog),
+                    "hash": catalog.content_hash,
+                }
+                for catalog in catalogs
+            }
+        },
+        separators=(",", ":"),
+    ).encode()
+
+    etag = '"%s"' % hashlib.sha256(content).hexdigest()[:16]
+    response = conditional_json_response(request, content, etag)
+    patch_cache_control(response, no_cache=True)
+
+    return response
@@ -1,9 +1,47 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core import checks
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.utils.translation import gettext_lazy as _
 
-from .settings import *  # NOQA: configure
-
 
 class TgReactConfig(AppConfig):
     name = "tg_react"
     verbose_name = _("Tg react")
+
+    def ready(self):
+        # Settings are validated by the system check, the snapshot is built on first use
+        from .checks import check_settings  # NOQA
+
+        checks.register(check_settings)
+
+        from .email_lookup import sync_normalized_email  # NOQA
+
+        pre_save.connect(
+            sync_normalized_email,
+            sender=settings.AUTH_USER_MODEL,
+            dispatch_uid="tg_react_sync_normalized_email",
+        )
+
+        from .receivers import forget_user_snapshot, invalidate_user_details  # NOQA
+
+        post_save.connect(
+            invalidate_user_details,
+            sender=settings.AUTH_USER_MODEL,
+            dispatch_uid="tg_react_invalidate_user_details",
+        )
+
+        for signal in (post_save, post_delete):
+            signal.connect(
+                forget_user_snapshot,
+                sender=settings.AUTH_USER_MODEL,
+                dispatch_uid="tg_react_forget_user_snapshot",
+            )
+
+        # Opt-in, by default the templates are compiled on first send
+        from .settings import get_precompile_email_templates  # NOQA
+
+        if get_precompile_email_templates():
+            from .api.accounts.emails import precompile_email_templates  # NOQA
+
+            precompile_email_templates()
@@ -0,0 +1,30 @@
+"""
+System checks for the TGR_* settings.
+
+Settings are validated here instead of in ``TgReactConfig.ready`` so that starting a process
+does not import every dotted path in them. Commands running the checks (``runserver``,
+``migrate``, ``check --deploy``) report invalid settings, elsewhere they raise
+ImproperlyConfigured on first use of the settings snapshot.
+"""
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+
+from tg_react.settings import configure
+
+
+def check_settings(app_configs=None, **kwargs):
+    try:
+        configure()
+
+    except ImproperlyConfigured as e:
+        return [checks.Error(str(e), id="tg_react.E001")]
+
+    except ImportError as e:
+        return [
+            checks.Error(
+                "A dotted path in the TGR_* settings could not be imported: %s" % e,
+                id="tg_react.E002",
+            )
+        ]
+
+    return []
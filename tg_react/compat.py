@@ -0,0 +1,33 @@
+import asyncio
+
+import django
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+
+
+try:
+    from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+except ImportError:  # asgiref < 3.6
+    iscoroutinefunction = asyncio.iscoroutinefunction
+
+    def markcoroutinefunction(func):
+        func._is_coroutine = (  # pylint: disable=protected-access
+            asyncio.coroutines._is_coroutine  # pylint: disable=protected-access
+        )
+        return func
+
+
+try:
+    from django.contrib.auth import aauthenticate, alogin, alogout
+except ImportError:  # Django < 5.0
+    from django.contrib.auth import authenticate, login, logout
+
+    aauthenticate = sync_to_async(authenticate)
+    alogin = sync_to_async(login)
+    alogout = sync_to_async(logout)
+
+
+def require_async_orm(feature):
+    """Raise ImproperlyConfigured for ``feature`` on Django versions without the async ORM"""
+    if django.VERSION < (4, 1):
+        raise ImproperlyConfigured(f"{feature} needs Django 4.1 or newer")
@@ -0,0 +1,167 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.utils.module_loading import import_string
+
+from tg_react.settings import get_config
+
+
+logger = logging.getLogger(__name__)
+
+
+class BaseEmailDelivery:
+    """Delivers email messages built by tg_react views
+
+    Configure the delivery used by tg_react with ``TGR_EMAIL_DELIVERY``, either a module path of a
+    delivery class or ``[path, options]`` where options are passed to the constructor.
+    """
+
+    def __init__(self, **options):
+        self.options = options
+
+        self._lock = threading.Lock()
+        self._counters = {"sent": 0, "failed": 0, "retried": 0, "queued": 0}
+
+    def increment(self, counter, value=1):
+        with self._lock:
+            self._counters[counter] += value
+
+    def deliver(self, message):
+        """Deliver an ``EmailMessage``, may return before the message is actually sent"""
+        raise NotImplementedError
+
+    def stats(self):
+        """Counters for monitoring, ``queued`` is the number of messages currently waiting to be sent"""
+        with self._lock:
+            return dict(self._counters)
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class InlineEmailDelivery(BaseEmailDelivery):
+    """Send the message synchronously inside the request (the default)"""
+
+    def deliver(self, message):
+        try:
+            message.send()
+        except Exception:
+            self.increment("failed")
+            raise
+
+        self.increment("sent")
+
+
+class ThreadPoolEmailDelivery(BaseEmailDelivery):
+    """Send messages from a bounded thread pool, retrying failures with exponential backoff
+
+    Options:
+
+    - ``max_workers``: number of sending threads (default 2)
+    - ``max_queue``: maximum number of queued messages, when exceeded messages are sent
+      inline with a single attempt and no backoff so memory use stays bounded (default 100)
+    - ``retries``: how many times a failed send is retried (default 3)
+    - ``backoff``: delay in seconds before the first retry, doubled on every attempt (default 1)
+    """
+
+    def __init__(self, max_workers=2, max_queue=100, retries=3, backoff=1.0, **options):
+        super().__init__(**options)
+
+        self.retries = retries
+        self.backoff = backoff
+
+        self._slots = threading.BoundedSemaphore(max_queue)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tg_react_email"
+        )
+
+    def deliver(self, message):
+        acquired = self._slots.acquire(  # pylint: disable=consider-using-with
+            blocking=False
+        )
+        if not acquired:
+            logger.warning("Email delivery queue is full, sending inline")
+            # Backing off here would hold up the request while the pool is overloaded
+            self.send_with_retries(message, retries=0)
+            return
+
+        self.increment("queued")
+        self._executor.submit(self._send_queued, message)
+
+    def _send_queued(self, message):
+        try:
+            self.send_with_retries(message)
+        finally:
+            self.increment("queued", -1)
+            self._slots.release()
+
+    def send_with_retries(self, message, retries=None):
+        retries = self.retries if retries is None else retries
+
+        for attempt in range(retries + 1):
+            try:
+                message.send()
+            except Exception:  # pylint: disable=broad-except
+                if attempt == retries:
+                    self.increment("failed")
+                    logger.exception("Sending email to %s failed", message.to)
+                    return
+
+                self.increment("retried")
+                time.sleep(self.backoff * 2**attempt)
+
+            else:
+                self.increment("sent")
+                return
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+class CallableEmailDelivery(BaseEmailDelivery):
+    """Hand messages over to an external queue
+
+    The ``handler`` option is a module path of a callable that receives the message, for example
+    a function that enqueues a Celery task. Only enqueue failures are counted here.
+    """
+
+    def __init__(self, handler, **options):
+        super().__init__(**options)
+
+        self.handler = import_string(handler) if isinstance(handler, str) else handler
+
+    def deliver(self, message):
+        try:
+            self.handler(message)
+        except Exception:
+            self.increment("failed")
+            raise
+
+        self.increment("sent")
+
+
+_delivery = None
+_delivery_lock = threading.Lock()
+
+
+def get_email_delivery():
+    """Return the process wide delivery instance for the current TGR_EMAIL_DELIVERY setting"""
+    global _delivery  # pylint: disable=global-statement
+
+    delivery_class, options = get_config().email_delivery
+
+    current = _delivery
+    if current is not None and current[0] == (delivery_class, options):
+        return current[1]
+
+    with _delivery_lock:
+        if _delivery is not None and _delivery[0] != (delivery_class, options):
+            _delivery[1].shutdown(wait=False)
+            _delivery = None
+
+        if _delivery is None:
+            _delivery = ((delivery_class, options), delivery_class(**options))
+
+        return _delivery[1]
@@ -0,0 +1,145 @@
+"""
+Case-insensitive user lookups by e-mail that can use an index.
+
+With ``TGR_EMAIL_CASE_SENSITIVE = False`` e-mails are lower-cased before they are looked up.
+``TGR_EMAIL_LOOKUP`` decides how they are matched against the user table:
+
+- ``"exact"`` (default): ``email = <lower>``, rows stored in mixed case are not found.
+- ``"lower"``: ``LOWER(email) = <lower>``. Add the functional index with
+  :func:`email_lower_index` (custom user models) or :func:`add_email_lower_index` (any model),
+  functional indexes need Django 3.2 or newer.
+- ``"normalized"``: ``<TGR_NORMALIZED_EMAIL_FIELD> = <lower>``. The user model needs an indexed
+  field for it (``normalized_email`` by default). It is kept in sync on save, existing rows are
+  filled in by the ``tgr_backfill_normalized_emails`` management command.
+"""
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+from tg_react.settings import get_config
+
+
+EMAIL_LOOKUP_EXACT = "exact"
+EMAIL_LOOKUP_LOWER = "lower"
+EMAIL_LOOKUP_NORMALIZED = "normalized"
+
+EMAIL_LOWER_INDEX_NAME = "tgr_user_email_lower_idx"
+
+
+def filter_by_email(queryset, email):
+    """Filter a user queryset by an e-mail already passed through ``normalize_email``"""
+    config = get_config()
+
+    if config.email_case_sensitive or config.email_lookup == EMAIL_LOOKUP_EXACT:
+        return queryset.filter(email=email)
+
+    if config.email_lookup == EMAIL_LOOKUP_LOWER:
+        # QuerySet.alias is new in Django 3.2, annotate also selects the value
+        add_lower = getattr(queryset, "alias", queryset.annotate)
+        return add_lower(tgr_email_lower=Lower("email")).filter(
+            tgr_email_lower=email.lower()
+        )
+
+    return queryset.filter(**{config.normalized_email_field: email.lower()})
+
+
+def email_is_unique(model=None):
+    """True when the database rejects duplicate e-mails for the configured lookup
+
+    Signup then skips the pre-check query and relies on the IntegrityError instead.
+    """
+    config = get_config()
+    model = model or get_user_model()
+    meta = model._meta  # pylint: disable=protected-access
+
+    if config.email_case_sensitive or config.email_lookup == EMAIL_LOOKUP_EXACT:
+        field_name = "email"
+    elif config.email_lookup == EMAIL_LOOKUP_NORMALIZED:
+        field_name = config.normalized_email_field
+    else:
+        field_name = None
+
+    if field_name is not None:
+        if any(field.name == field_name and field.unique for field in meta.fields):
+            return True
+
+        fields, expressions = (field_name,), ()
+
+    else:
+        fields, expressions = (), (Lower("email"),)
+
+    return any(
+        isinstance(constraint, models.UniqueConstraint)
+        and constraint.condition is None
+        and tuple(constraint.fields) == fields
+        # Functional constraints are new in Django 4.0
+        and tuple(getattr(constraint, "expressions", ())) == expressions
+        for constraint in meta.constraints
+    )
+
+
+def email_conflicts(user):
+    """True when an IntegrityError raised saving ``user`` was caused by its e-mail being taken
+
+    Only when the database enforces unique e-mails (see :func:`email_is_unique`), the address is
+    in use and no other unique field of ``user`` clashes with an existing row.
+    """
+    model = type(user)
+    if not email_is_unique(model):
+        return False
+
+    # pylint: disable=protected-access
+    if not filter_by_email(model._default_manager.all(), user.email).exists():
+        return False
+
+    try:
+        user.validate_unique(exclude={"email", get_config().normalized_email_field})
+    except ValidationError:
+        # Another unique value is taken as well, the database may have rejected either one
+        return False
+
+    return True
+
+
+def sync_normalized_email(sender, instance, **kwargs):
+    """pre_save receiver filling the normalized e-mail field when that lookup is used
+
+    Note that saves with ``update_fields`` only store the field when it is listed.
+    """
+    config = get_config()
+    if config.email_lookup != EMAIL_LOOKUP_NORMALIZED:
+        return
+
+    email = getattr(instance, "email", None)
+    setattr(instance, config.normalized_email_field, email.lower() if email else email)
+
+
+def email_lower_index(name=EMAIL_LOWER_INDEX_NAME):
+    """``LOWER(email)`` index for the ``Meta.indexes`` of a custom user model, Django 3.2+"""
+    if django.VERSION < (3, 2):
+        raise ImproperlyConfigured("The LOWER(email) index needs Django 3.2 or newer")
+
+    return models.Index(Lower("email"), name=name)
+
+
+def add_email_lower_index(name=EMAIL_LOWER_INDEX_NAME, model=None):
+    """Migration operation adding the ``LOWER(email)`` index to a model of another app
+
+    Defaults to ``AUTH_USER_MODEL``, for models that can not get it through ``Meta.indexes``
+    (e.g. ``auth.User``). Use it in a migration of your own app that depends on the user model
+    app::
+
+        operations = [add_email_lower_index()]
+    """
+    model = model or settings.AUTH_USER_MODEL
+
+    def add_index(apps, schema_editor):
+        schema_editor.add_index(apps.get_model(model), email_lower_index(name))
+
+    def remove_index(apps, schema_editor):
+        schema_editor.remove_index(apps.get_model(model), email_lower_index(name))
+
+    return migrations.RunPython(add_index, remove_index, elidable=False)
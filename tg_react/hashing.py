@@ -0,0 +1,204 @@
+"""
+Password hashing for the async account views.
+
+Hashing is CPU bound and holds the GIL, so running it in a thread still stalls the event loop of
+an ASGI worker. Setting ``TGR_PASSWORD_HASHING_PROCESSES`` to a positive number moves hashing and
+verification into a ``ProcessPoolExecutor`` of that size, letting one async worker use several
+cores. Without it the work runs in a thread like before.
+
+Pool processes are started with the ``spawn`` method and call ``django.setup()``, so the settings
+must be importable through ``DJANGO_SETTINGS_MODULE``. Settings overridden at runtime (e.g. with
+``override_settings``) are not seen by the pool.
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model, user_login_failed
+from django.contrib.auth.hashers import (
+    get_hasher,
+    identify_hasher,
+    is_password_usable,
+    make_password,
+)
+
+from tg_react.compat import aauthenticate as default_aauthenticate
+from tg_react.settings import get_config
+
+
+logger = logging.getLogger(__name__)
+
+
+MODEL_BACKEND = "django.contrib.auth.backends.ModelBackend"
+
+
+def _setup_worker():
+    import django  # NOQA
+
+    django.setup()
+
+
+def _verify_password(password, encoded):
+    """Same as django.contrib.auth.hashers.check_password, but returns (is_correct, must_update)
+
+    Runs in the pool, updating the stored hash is left to the caller.
+    """
+    if password is None or not is_password_usable(encoded):
+        return False, False
+
+    preferred = get_hasher("default")
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False, False
+
+    hasher_changed = hasher.algorithm != preferred.algorithm
+    must_update = hasher_changed or preferred.must_update(encoded)
+    is_correct = hasher.verify(password, encoded)
+
+    if not is_correct and not hasher_changed and must_update:
+        hasher.harden_runtime(password, encoded)
+
+    return is_correct, must_update
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_hashing_executor():
+    """Process pool sized by TGR_PASSWORD_HASHING_PROCESSES, None when hashing is not offloaded"""
+    global _executor  # pylint: disable=global-statement
+
+    processes = get_config().password_hashing_processes
+    if processes is None:
+        if _executor is not None:
+            shutdown_hashing_executor()
+
+        return None
+
+    current = _executor
+    if current is None or current[0] != processes:
+        with _executor_lock:
+            if _executor is None or _executor[0] != processes:
+                # The pool size changed, drop the old pool once its pending calls finish
+                if _executor is not None:
+                    _executor[1].shutdown(wait=False)
+
+                _executor = (
+                    processes,
+                    ProcessPoolExecutor(
+                        max_workers=processes,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_setup_worker,
+                    ),
+                )
+
+            current = _executor
+
+    return current[1]
+
+
+def shutdown_hashing_executor():
+    global _executor  # pylint: disable=global-statement
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor[1].shutdown(wait=False)
+            _executor = None
+
+
+async def run_hasher(func, *args):
+    """Run ``func(*args)`` in the hashing pool, or in a thread when the pool is disabled"""
+    executor = get_hashing_executor()
+
+    if executor is not None:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, func, *args
+            )
+        except BrokenProcessPool:
+            # A pool process died, start a new pool on the next call
+            logger.exception("Password hashing pool is broken, restarting it")
+            shutdown_hashing_executor()
+
+    return await sync_to_async(func, thread_sensitive=False)(*args)
+
+
+async def amake_password(password):
+    return await run_hasher(make_password, password)
+
+
+async def aset_password(user, raw_password):
+    """Async ``user.set_password``, does not save the user"""
+    user.password = await amake_password(raw_password)
+    # Picked up by AbstractBaseUser.save to send password_changed
+    user._password = raw_password  # pylint: disable=protected-access
+
+
+async def acheck_password(user, raw_password):
+    """Async ``user.check_password``, saves the upgraded hash when the hasher settings changed"""
+    is_correct, must_update = await run_hasher(
+        _verify_password, raw_password, user.password
+    )
+
+    if is_correct and must_update:
+        await aset_password(user, raw_password)
+        user._password = None  # pylint: disable=protected-access
+        await sync_to_async(user.save)(update_fields=["password"])
+
+    return is_correct
+
+
+async def aauthenticate(request=None, **credentials):
+    """``django.contrib.auth.aauthenticate`` that verifies the password through :func:`run_hasher`
+
+    Only used when the hashing pool is enabled and ModelBackend is the only authentication
+    backend, otherwise this defers to the regular implementation.
+    """
+    if get_hashing_executor() is None or list(settings.AUTHENTICATION_BACKENDS) != [
+        MODEL_BACKEND
+    ]:
+        return await default_aauthenticate(request, **credentials)
+
+    user_model = get_user_model()
+    # Same as ModelBackend.authenticate
+    username = credentials.get("username")
+    if username is None:
+        username = credentials.get(user_model.USERNAME_FIELD)
+    password = credentials.get("password")
+
+    user = None
+    if username is not None and password is not None:
+        try:
+            # Managers may override get_by_natural_key, e.g. for case-insensitive usernames
+            user = await sync_to_async(
+                user_model._default_manager.get_by_natural_key  # pylint: disable=protected-access
+            )(username)
+        except user_model.DoesNotExist:
+            # Keep the response time the same as for existing users, like ModelBackend does
+            await amake_password(password)
+
+        else:
+            # Same order as ModelBackend, the password is checked for inactive users too
+            is_active = getattr(user, "is_active", None)
+            if not await acheck_password(user, password) or not (
+                is_active or is_active is None
+            ):
+                user = None
+
+    if user is None:
+        await sync_to_async(user_login_failed.send)(
+            sender=__name__,
+            credentials={**credentials, "password": "********************"},
+            request=request,
+        )
+        return None
+
+    user.backend = MODEL_BACKEND
+    return user
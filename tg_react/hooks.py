@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+
+# Run the handler in the request, before the response is returned
+HOOK_MODE_INLINE = "inline"
+# Run the handler once the current database transaction commits (immediately in autocommit mode)
+HOOK_MODE_ON_COMMIT = "on_commit"
+# Run the handler in a background thread, the response does not wait for it
+HOOK_MODE_BACKGROUND = "background"
+
+HOOK_MODES = (HOOK_MODE_INLINE, HOOK_MODE_ON_COMMIT, HOOK_MODE_BACKGROUND)
+
+
+class Hook:
+    """A resolved post login/logout handler together with the way it should be executed"""
+
+    __slots__ = ("handler", "mode", "is_async")
+
+    def __init__(self, handler, mode=HOOK_MODE_INLINE):
+        if mode not in HOOK_MODES:
+            raise ImproperlyConfigured(
+                f"Hook mode must be one of {', '.join(HOOK_MODES)}, got {mode!r}"
+            )
+
+        self.handler = handler
+        self.mode = mode
+        self.is_async = asyncio.iscoroutinefunction(handler)
+
+    def __repr__(self):
+        return f"<Hook {getattr(self.handler, '__qualname__', self.handler)!r} mode={self.mode}>"
+
+    def call(self, **kwargs):
+        if self.is_async:
+            return async_to_sync(self.handler)(**kwargs)
+
+        return self.handler(**kwargs)
+
+    async def acall(self, **kwargs):
+        if self.is_async:
+            return await self.handler(**kwargs)
+
+        return await sync_to_async(self.handler)(**kwargs)
+
+
+def resolve_hooks(value, setting_name):
+    """Resolve a TGR_POST_LOGIN_HANDLER / TGR_POST_LOGOUT_HANDLER style setting into a tuple of hooks
+
+    The setting can be a single module path or a list where every item is either a module path
+    or ``[path, {"mode": "inline|on_commit|background"}]``.
+    """
+    if value is None:
+        return ()
+
+    if isinstance(value, str):
+        value = [value]
+
+    if not isinstance(value, (list, tuple)):
+        raise ImproperlyConfigured(
+            f"settings.{setting_name} must be a module path or a list of handlers"
+        )
+
+    hooks = []
+    for item in value:
+        options = {}
+        if isinstance(item, (list, tuple)) and len(item) == 2:
+            item, options = item[0], item[1] or {}
+
+        if not isinstance(item, str) or not isinstance(options, dict):
+            raise ImproperlyConfigured(
+                f"settings.{setting_name} items must be a module path or list[path, options]"
+            )
+
+        hooks.append(Hook(import_string(item), **options))
+
+    return tuple(hooks)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_hook_executor():
+    """Thread pool used by hooks in background mode, sized by TGR_HOOK_EXECUTOR_WORKERS"""
+    global _executor  # pylint: disable=global-statement
+
+    # Imported here, tg_react.settings resolves the hooks with this module
+    from tg_react.settings import get_config  # NOQA
+
+    workers = get_config().hook_executor_workers
+
+    current = _executor
+    if current is None or current[0] != workers:
+        with _executor_lock:
+            if _executor is None or _executor[0] != workers:
+                # The pool size changed, drop the old pool once its queued hooks finish
+                if _executor is not None:
+                    _executor[1].shutdown(wait=False)
+
+                _executor = (
+                    workers,
+                    ThreadPoolExecutor(
+                        max_workers=workers, thread_name_prefix="tg_react_hooks"
+                    ),
+                )
+
+            current = _executor
+
+    return current[1]
+
+
+def _call_in_background(hook, kwargs):
+    close_old_connections()
+
+    try:
+        hook.call(**kwargs)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("Background hook %r failed", hook)
+    finally:
+        close_old_connections()
+
+
+def run_hooks(hooks, **kwargs):
+    """Execute hooks from synchronous code"""
+    for hook in hooks:
+        if hook.mode == HOOK_MODE_INLINE:
+            hook.call(**kwargs)
+
+        elif hook.mode == HOOK_MODE_ON_COMMIT:
+            transaction.on_commit(partial(hook.call, **kwargs))
+
+        else:
+            get_hook_executor().submit(_call_in_background, hook, kwargs)
+
+
+async def arun_hooks(hooks, **kwargs):
+    """Execute hooks from asynchronous code, coroutine handlers are awaited directly"""
+    for hook in hooks:
+        if hook.mode == HOOK_MODE_INLINE:
+            await hook.acall(**kwargs)
+
+        elif hook.mode == HOOK_MODE_ON_COMMIT:
+            await sync_to_async(transaction.on_commit)(partial(hook.call, **kwargs))
+
+        else:
+            get_hook_executor().submit(_call_in_background, hook, kwargs)
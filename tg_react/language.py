@@ -0,0 +1,119 @@
+import functools
+import os
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.utils import translation
+from django.utils.translation.trans_real import (
+    language_code_re,
+    parse_accept_lang_header,
+)
+
+
+# Number of distinct (cookie, Accept-Language) pairs remembered by negotiate_language
+LANGUAGE_CACHE_SIZE = 512
+
+# Settings that change the outcome of language negotiation
+LANGUAGE_SETTINGS = {"LANGUAGES", "LANGUAGE_CODE", "LOCALE_PATHS", "USE_I18N"}
+
+_language_table = None
+
+
+def _supported_variant(lang_code):
+    try:
+        return translation.get_supported_language_variant(lang_code)
+    except LookupError:
+        return None
+
+
+def build_language_table():
+    """Map language codes to the supported variant Django would pick for them
+
+    Contains every code in settings.LANGUAGES and every locale that has a catalog in tg_react
+    or LOCALE_PATHS, so e.g. ``en-us`` (from the ``en_US`` catalog) maps to ``en``.
+    """
+    candidates = {code for code, _name in settings.LANGUAGES}
+
+    locale_dirs = [os.path.join(os.path.dirname(__file__), "locale")]
+    locale_dirs.extend(str(path) for path in settings.LOCALE_PATHS)
+
+    for locale_dir in locale_dirs:
+        if os.path.isdir(locale_dir):
+            candidates.update(
+                translation.to_language(entry) for entry in os.listdir(locale_dir)
+            )
+
+    table = {}
+    for code in candidates:
+        variant = _supported_variant(code)
+        if variant is not None:
+            table[code] = variant
+
+    return table
+
+
+def get_language_table():
+    global _language_table  # pylint: disable=global-statement
+
+    if _language_table is None:
+        _language_table = build_language_table()
+
+    return _language_table
+
+
+def get_supported_variant(lang_code):
+    """Supported variant for lang_code, or None. Uses the precomputed table when possible"""
+    variant = get_language_table().get(lang_code)
+
+    if variant is None:
+        variant = _supported_variant(lang_code)
+
+    return variant
+
+
+@functools.lru_cache(maxsize=LANGUAGE_CACHE_SIZE)
+def negotiate_language(cookie_value, accept_language):
+    """Same result as ``translation.get_language_from_request`` for a request with the given
+    language cookie and Accept-Language header, cached since browsers send few distinct values.
+
+    Use ``negotiate_language.cache_info()`` for hit and miss counters.
+    """
+    if not settings.USE_I18N:
+        return settings.LANGUAGE_CODE
+
+    if cookie_value:
+        variant = get_supported_variant(cookie_value)
+        if variant is not None:
+            return variant
+
+    for accept_lang, _quality in parse_accept_lang_header(accept_language):
+        if accept_lang == "*":
+            break
+
+        if not language_code_re.search(accept_lang):
+            continue
+
+        variant = get_supported_variant(accept_lang)
+        if variant is not None:
+            return variant
+
+    return get_supported_variant(settings.LANGUAGE_CODE) or settings.LANGUAGE_CODE
+
+
+def get_language_from_request(request):
+    """Cached replacement for ``translation.get_language_from_request`` (without path checking)"""
+    return negotiate_language(
+        request.COOKIES.get(settings.LANGUAGE_COOKIE_NAME),
+        request.META.get("HTTP_ACCEPT_LANGUAGE", ""),
+    )
+
+
+def reset_language_cache(*, setting, **kwargs):
+    global _language_table  # pylint: disable=global-statement
+
+    if setting in LANGUAGE_SETTINGS:
+        _language_table = None
+        negotiate_language.cache_clear()
+
+
+setting_changed.connect(reset_language_cache)
@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+
+from tg_react.settings import get_config
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill in the normalized e-mail field (TGR_NORMALIZED_EMAIL_FIELD) of existing users. "
+        "Users are processed in primary key order, one transaction per chunk, so the command "
+        "can be interrupted and resumed with --start-after."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of users updated per transaction (default: 1000).",
+        )
+        parser.add_argument(
+            "--start-after",
+            type=int,
+            default=None,
+            help="Skip users with a primary key lower or equal to this value.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the users that would be updated.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be positive")
+
+        user_model = get_user_model()
+        field = get_config().normalized_email_field
+
+        try:
+            user_model._meta.get_field(field)  # pylint: disable=protected-access
+        except FieldDoesNotExist:
+            raise CommandError(
+                f"{user_model.__name__} has no field {field!r}, "
+                "add it or change settings.TGR_NORMALIZED_EMAIL_FIELD"
+            )
+
+        queryset = user_model.objects.exclude(email="").exclude(email=None)
+        if options["start_after"] is not None:
+            queryset = queryset.filter(pk__gt=options["start_after"])
+
+        # Rows that are already up to date are not rewritten. QuerySet.alias is new in
+        # Django 3.2, annotate also selects the value
+        add_lower = getattr(queryset, "alias", queryset.annotate)
+        queryset = add_lower(tgr_email_lower=Lower("email")).filter(
+            Q(**{f"{field}__isnull": True}) | ~Q(**{field: F("tgr_email_lower")})
+        )
+
+        updated = 0
+        last_pk = options["start_after"]
+        while True:
+            chunk_queryset = queryset.order_by("pk")
+            if last_pk is not None:
+                chunk_queryset = chunk_queryset.filter(pk__gt=last_pk)
+
+            users = list(chunk_queryset.only("pk", "email", field)[:chunk_size])
+            if not users:
+                break
+
+            for user in users:
+                setattr(user, field, user.email.lower())
+
+            if not options["dry_run"]:
+                with transaction.atomic():
+                    user_model.objects.bulk_update(users, [field])
+
+            updated += len(users)
+            last_pk = users[-1].pk
+            self.stdout.write(f"{updated} updated (last user {last_pk})")
+
+        verb = "would be updated" if options["dry_run"] else "updated"
+        self.stdout.write(self.style.SUCCESS(f"Done, {updated} users {verb}"))
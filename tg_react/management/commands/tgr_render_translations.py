@@ -0,0 +1,71 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tg_react.api.translations.catalog import (
+    get_catalog,
+    get_catalog_language,
+    get_catalog_languages,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the translation catalogs served by tg_react.api.translations to static files: "
+        "<language>.<hash>.json, <language>.json and manifest.json mapping languages to the "
+        "hashed file names."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output-dir",
+            default=None,
+            help="Directory for the files (default: STATIC_ROOT/tg_react/translations).",
+        )
+        parser.add_argument(
+            "--language",
+            action="append",
+            dest="languages",
+            default=[],
+            help="Only render this language, can be given multiple times.",
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options["output_dir"]
+        if output_dir is None:
+            if not settings.STATIC_ROOT:
+                raise CommandError("Set STATIC_ROOT or pass --output-dir")
+
+            output_dir = os.path.join(settings.STATIC_ROOT, "tg_react", "translations")
+
+        languages = []
+        for code in options["languages"] or get_catalog_languages():
+            language = get_catalog_language(code)
+            if language is None:
+                raise CommandError(f"Unsupported language: {code}")
+
+            languages.append(language)
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        manifest = {}
+        for language in languages:
+            catalog = get_catalog(language)
+            hashed_name = f"{language}.{catalog.content_hash}.json"
+
+            for name in (hashed_name, f"{language}.json"):
+                with open(os.path.join(output_dir, name), "wb") as f:
+                    f.write(catalog.content)
+
+            manifest[language] = hashed_name
+
+            if options["verbosity"] >= 1:
+                self.stdout.write(f"{language}: {hashed_name}")
+
+        with open(
+            os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8"
+        ) as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+            f.write("\n")
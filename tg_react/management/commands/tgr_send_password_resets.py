@@ -0,0 +1,148 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
+
+from tg_react.api.accounts.emails import build_password_reset_message
+from tg_react.api.accounts.serializers import ForgotPasswordSerializer
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = (
+        "Send password reset e-mails to many users at once. Messages are sent in chunks, "
+        "each chunk over a single e-mail backend connection."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--email",
+            action="append",
+            dest="emails",
+            default=[],
+            help="Only send to this e-mail address, can be given multiple times.",
+        )
+        parser.add_argument(
+            "--include-inactive",
+            action="store_true",
+            help="Also send to inactive users.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=100,
+            help="Number of messages sent over one connection (default: 100).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Number of chunks sent in parallel, each over its own connection (default: 1).",
+        )
+        parser.add_argument(
+            "--start-after",
+            type=int,
+            default=None,
+            help="Skip users with a primary key lower or equal to this value.",
+        )
+        parser.add_argument(
+            "--state-file",
+            default=None,
+            help=(
+                "File used to store the primary key of the last user that was sent an e-mail. "
+                "When the file exists sending resumes after that user."
+            ),
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Build the messages but do not send them.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        concurrency = options["concurrency"]
+        if chunk_size < 1 or concurrency < 1:
+            raise CommandError("--chunk-size and --concurrency must be positive")
+
+        state_file = options["state_file"]
+        start_after = options["start_after"]
+        if start_after is None and state_file and os.path.exists(state_file):
+            with open(state_file, encoding="utf-8") as f:
+                start_after = int(f.read().strip())
+
+            self.stdout.write(f"Resuming after user {start_after}")
+
+        queryset = self.get_queryset(options, start_after)
+        total = queryset.count()
+        sent = 0
+
+        self.stdout.write(f"Sending password reset e-mails to {total} users")
+
+        chunks = chunked(queryset.iterator(chunk_size=chunk_size), chunk_size)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            while True:
+                # A window of chunks is sent in parallel, the state file is only updated once the
+                # whole window is sent so resuming never skips users
+                window = list(islice(chunks, concurrency))
+                if not window:
+                    break
+
+                sent += sum(
+                    executor.map(
+                        lambda chunk: self.send_chunk(chunk, options["dry_run"]),
+                        window,
+                    )
+                )
+
+                last_pk = window[-1][-1].pk
+                if state_file and not options["dry_run"]:
+                    with open(state_file, "w", encoding="utf-8") as f:
+                        f.write(str(last_pk))
+
+                self.stdout.write(f"{sent}/{total} sent (last user {last_pk})")
+
+        self.stdout.write(self.style.SUCCESS(f"Done, sent {sent} e-mails"))
+
+    def get_queryset(self, options, start_after):
+        user_model = get_user_model()
+        queryset = user_model.objects.exclude(email="").exclude(email=None)
+
+        if options["emails"]:
+            queryset = queryset.filter(email__in=options["emails"])
+
+        if not options["include_inactive"] and any(
+            f.name == "is_active" for f in user_model._meta.fields
+        ):
+            queryset = queryset.filter(is_active=True)
+
+        if start_after is not None:
+            queryset = queryset.filter(pk__gt=start_after)
+
+        return queryset.order_by("pk")
+
+    def send_chunk(self, users, dry_run):
+        messages = [
+            build_password_reset_message(
+                user, ForgotPasswordSerializer.make_uid_and_token_b64(user)
+            )
+            for user in users
+        ]
+
+        if dry_run:
+            return 0
+
+        with get_connection() as connection:
+            return connection.send_messages(messages) or 0
@@ -0,0 +1,218 @@
+"""
+Timings and counters for the expensive phases of the account views.
+
+Measured phases (names are prefixed by the sink):
+
+- ``login.authenticate`` password verification, ``login.success`` / ``login.failure`` counters
+- ``signup.hash_password`` and ``signup.create_user``
+- ``forgot_password.render`` building the e-mail and ``forgot_password.send`` handing it to the
+  delivery (see ``TGR_EMAIL_DELIVERY``)
+- ``restore_password.validate_token`` and ``restore_password.hash_password``
+- ``login.hooks`` / ``logout.hooks`` post login/logout hook execution
+
+Choose the sink with ``TGR_METRICS_SINK``, a module path or ``[path, options]``. Included are
+:class:`NoopMetricsSink` (default), :class:`StatsdMetricsSink` and :class:`PrometheusMetricsSink`.
+"""
+import logging
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+from django.http import Http404, HttpResponse
+
+from tg_react.settings import get_config
+
+
+logger = logging.getLogger(__name__)
+
+
+class BaseMetricsSink:
+    enabled = True
+
+    def __init__(self, **options):
+        self.options = options
+
+    def timing(self, name, seconds):
+        raise NotImplementedError
+
+    def increment(self, name, value=1):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class NoopMetricsSink(BaseMetricsSink):
+    enabled = False
+
+    def timing(self, name, seconds):
+        pass
+
+    def increment(self, name, value=1):
+        pass
+
+
+class StatsdMetricsSink(BaseMetricsSink):
+    """Sends metrics to statsd over UDP, fire and forget
+
+    Options: ``host`` (default 127.0.0.1), ``port`` (8125) and ``prefix`` (tg_react).
+    """
+
+    def __init__(self, host="127.0.0.1", port=8125, prefix="tg_react", **options):
+        super().__init__(**options)
+
+        self.address = (host, port)
+        self.prefix = prefix
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+
+    def send(self, line):
+        try:
+            self.socket.sendto(line.encode("ascii"), self.address)
+        except OSError:
+            # Metrics must never break a request
+            logger.debug("Failed to send metric %s", line, exc_info=True)
+
+    def timing(self, name, seconds):
+        self.send(f"{self.prefix}.{name}:{seconds * 1000:.3f}|ms")
+
+    def increment(self, name, value=1):
+        self.send(f"{self.prefix}.{name}:{value}|c")
+
+    def close(self):
+        self.socket.close()
+
+
+class PrometheusMetricsSink(BaseMetricsSink):
+    """Keeps histograms and counters in memory for :func:`prometheus_metrics_view`
+
+    Options: ``prefix`` (tg_react) and ``buckets`` (histogram upper bounds in seconds). Values are
+    per process, with several worker processes every one of them has to be scraped.
+    """
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, prefix="tg_react", buckets=DEFAULT_BUCKETS, **options):
+        super().__init__(**options)
+
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+
+        self._lock = threading.Lock()
+        # name -> [bucket counts..., count, sum]
+        self._histograms = {}
+        self._counters = {}
+
+    def metric_name(self, name):
+        return f"{self.prefix}_{name}".replace(".", "_")
+
+    def timing(self, name, seconds):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = [0] * (len(self.buckets) + 2)
+
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[index] += 1
+
+            histogram[-2] += 1
+            histogram[-1] += seconds
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def render(self):
+        """Return the metrics in the Prometheus text exposition format"""
+        with self._lock:
+            histograms = {
+                name: list(values) for name, values in self._histograms.items()
+            }
+            counters = dict(self._counters)
+
+        lines = []
+        for name, values in sorted(histograms.items()):
+            metric = f"{self.metric_name(name)}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+
+            for bound, count in zip(self.buckets, values):
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {count}')
+
+            lines.append(f'{metric}_bucket{{le="+Inf"}} {values[-2]}')
+            lines.append(f"{metric}_sum {values[-1]}")
+            lines.append(f"{metric}_count {values[-2]}")
+
+        for name, value in sorted(counters.items()):
+            metric = f"{self.metric_name(name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_metrics_sink():
+    """Return the process wide sink for the current TGR_METRICS_SINK setting"""
+    global _sink  # pylint: disable=global-statement
+
+    sink_class, options = get_config().metrics_sink
+
+    current = _sink
+    if current is not None and current[0] == (sink_class, options):
+        return current[1]
+
+    with _sink_lock:
+        if _sink is not None and _sink[0] != (sink_class, options):
+            _sink[1].close()
+            _sink = None
+
+        if _sink is None:
+            _sink = ((sink_class, options), sink_class(**options))
+
+        return _sink[1]
+
+
+@contextmanager
+def timed(name):
+    """Report the duration of the block as timing ``name``, also when it raises"""
+    sink = get_metrics_sink()
+    if not sink.enabled:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        try:
+            sink.timing(name, time.perf_counter() - started)
+        except Exception:  # pylint: disable=broad-except
+            # Metrics must never break a request or hide the error raised by the block
+            logger.exception("Metrics sink failed to record timing %s", name)
+
+
+def increment(name, value=1):
+    sink = get_metrics_sink()
+    if not sink.enabled:
+        return
+
+    try:
+        sink.increment(name, value)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("Metrics sink failed to record counter %s", name)
+
+
+def prometheus_metrics_view(request):
+    """Expose :class:`PrometheusMetricsSink` values, add it to your urls behind access control"""
+    sink = get_metrics_sink()
+    if not isinstance(sink, PrometheusMetricsSink):
+        raise Http404("Prometheus metrics sink is not configured")
+
+    return HttpResponse(
+        sink.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
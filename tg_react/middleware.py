@@ -1,6 +1,29 @@
+import logging
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.utils import translation
 from django.utils.cache import patch_vary_headers
+from django.utils.functional import empty
+
+from tg_react.compat import iscoroutinefunction, markcoroutinefunction
+from tg_react.language import get_language_from_request
+from tg_react.settings import get_config
+
+
+logger = logging.getLogger(__name__)
+
+
+def user_needs_loading(request):
+    """True when evaluating request.user may hit the session store or the database"""
+    user = getattr(request, "user", None)
+    if getattr(user, "_wrapped", None) is not empty:
+        return False
+
+    session = getattr(request, "session", None)
+    return session is not None and session.session_key is not None
 
 
 class LocaleMiddleware:
@@ -10,40 +33,120 @@ class LocaleMiddleware:
     thread context depending on the selected language.
 
     This also allows us to update the language cookie whenever our api endpoint is used.
+
+    Works both under WSGI and ASGI, in the latter case without a thread hop unless the user
+    has to be loaded from the session. Note that Django's MiddlewareMixin based middleware in
+    front of it then also run in async mode, which costs them a thread hop each (see
+    ``benchmarks/asgi_locale.py``), so the gain depends on the rest of the middleware stack.
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
 
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
     def get_language_for_user(self, request):
         if request.user.is_authenticated and hasattr(request.user, "language"):
             return getattr(request.user, "language")
 
-        return translation.get_language_from_request(request)
+        return get_language_from_request(request)
+
+    async def aget_language_for_user(self, request):
+        if user_needs_loading(request):
+            return await sync_to_async(self.get_language_for_user)(request)
+
+        return self.get_language_for_user(request)
 
     def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
         with translation.override(self.get_language_for_user(request)):
             request.LANGUAGE_CODE = translation.get_language()
             response = self.get_response(request)
 
-            language = getattr(request, "update_language_cookie", False)
+            self.update_response(request, response)
+
+        return response
+
+    async def __acall__(self, request):
+        with translation.override(await self.aget_language_for_user(request)):
+            request.LANGUAGE_CODE = translation.get_language()
+            response = await self.get_response(request)
+
+            self.update_response(request, response)
+
+        return response
+
+    def update_response(self, request, response):
+        language = getattr(request, "update_language_cookie", False)
+
+        if language:
+            if request.user.is_authenticated and hasattr(request.user, "language"):
+                language = getattr(request.user, "language")
+
+            else:
+                language = language or request.LANGUAGE_CODE
+
+            response.set_cookie(
+                settings.LANGUAGE_COOKIE_NAME,
+                language,
+                max_age=settings.LANGUAGE_COOKIE_AGE,
+                path=settings.LANGUAGE_COOKIE_PATH,
+                domain=settings.LANGUAGE_COOKIE_DOMAIN,
+            )
+
+        patch_vary_headers(response, ("Accept-Language",))
+        response["Content-Language"] = translation.get_language()
+
+
+class QueryBudgetMiddleware:
+    """Warn about (or with ``TGR_QUERY_BUDGET_ACTION = "raise"`` fail) tg_react requests over their
+    query budget or with repeated queries. Only active while DEBUG is on.
+
+    The query count is added to the response as ``X-TGR-Query-Count``.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # Imports django.test, only needed when DEBUG is on
+        from tg_react.querycount import (  # NOQA
+            QueryBudgetExceeded,
+            QueryRecorder,
+            get_query_budgets,
+        )
+
+        with QueryRecorder(connections["default"]) as recorder:
+            response = self.get_response(request)
+
+        url_name = getattr(getattr(request, "resolver_match", None), "url_name", None)
+        budgets = get_query_budgets()
+        if url_name not in budgets:
+            return response
 
-            if language:
-                if request.user.is_authenticated and hasattr(request.user, "language"):
-                    language = getattr(request.user, "language")
+        response["X-TGR-Query-Count"] = str(len(recorder))
 
-                else:
-                    language = language or request.LANGUAGE_CODE
+        problems = recorder.check(
+            budgets[url_name],
+            get_config().query_budget_max_repeats,
+            label=f"{request.method} {request.path} ({url_name})",
+        )
+        if problems:
+            message = "\n".join(problems) + "\n\nQueries:\n" + recorder.report()
 
-                response.set_cookie(
-                    settings.LANGUAGE_COOKIE_NAME,
-                    language,
-                    max_age=settings.LANGUAGE_COOKIE_AGE,
-                    path=settings.LANGUAGE_COOKIE_PATH,
-                    domain=settings.LANGUAGE_COOKIE_DOMAIN,
-                )
+            if get_config().query_budget_action == "raise":
+                raise QueryBudgetExceeded(message)
 
-            patch_vary_headers(response, ("Accept-Language",))
-            response["Content-Language"] = translation.get_language()
+            logger.warning(message)
 
         return response
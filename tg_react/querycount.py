@@ -0,0 +1,99 @@
+"""
+Query budgets for the tg_react endpoints.
+
+:func:`assert_query_budget` is a test helper failing when a block runs more queries than allowed
+or repeats the same query (N+1). ``tg_react.middleware.QueryBudgetMiddleware`` checks every
+request to a tg_react endpoint against ``TGR_QUERY_BUDGETS`` while ``DEBUG`` is on.
+
+Budgets are keyed by URL name. The defaults are the query counts of the endpoints with database
+backed sessions and no extra fields; ``TGR_QUERY_BUDGETS`` entries are merged over them.
+"""
+import re
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from tg_react.settings import get_config
+
+
+DEFAULT_QUERY_BUDGETS = {
+    "api-user-details": 3,
+    "api-user-login": 5,
+    "api-user-language": 2,
+    "api-user-logout": 4,
+    "api-signup": 6,
+    "api-forgot-password": 3,
+    "api-forgot-password-token": 2,
+    "api-token-refresh": 1,
+}
+
+# Depend on whether the view runs inside an outer transaction (e.g. in tests), not counted
+_SAVEPOINTS = re.compile(r"^(?:SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT) ")
+
+# Literals are replaced so queries that only differ in their parameters count as repeats
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def normalize_sql(sql):
+    return _LITERALS.sub("?", sql)
+
+
+class QueryRecorder(CaptureQueriesContext):
+    """CaptureQueriesContext with N+1 detection, savepoint statements are left out"""
+
+    @property
+    def captured_queries(self):
+        return [
+            query
+            for query in super().captured_queries
+            if not _SAVEPOINTS.match(query["sql"])
+        ]
+
+    def repeated_queries(self, min_count=2):
+        """Return {normalized sql: count} for queries run at least ``min_count`` times"""
+        counts = Counter(normalize_sql(query["sql"]) for query in self.captured_queries)
+
+        return {sql: count for sql, count in counts.items() if count >= min_count}
+
+    def check(self, budget, max_repeats=None, label="block"):
+        """Return a list of problems, empty when the budget is kept"""
+        problems = []
+
+        if budget is not None and len(self) > budget:
+            problems.append(f"{label} ran {len(self)} queries, budget is {budget}")
+
+        if max_repeats is not None:
+            for sql, count in self.repeated_queries(max_repeats + 1).items():
+                problems.append(f"{label} repeated a query {count} times: {sql}")
+
+        return problems
+
+    def report(self):
+        return "\n".join(
+            f"{index}. {query['sql']}"
+            for index, query in enumerate(self.captured_queries, start=1)
+        )
+
+
+@contextmanager
+def assert_query_budget(budget, max_repeats=None, using="default"):
+    """Fail with QueryBudgetExceeded when the block runs more than ``budget`` queries or the same
+    query (ignoring parameters) more than ``max_repeats`` times"""
+    with QueryRecorder(connections[using]) as recorder:
+        yield recorder
+
+    problems = recorder.check(budget, max_repeats)
+    if problems:
+        raise QueryBudgetExceeded(
+            "\n".join(problems) + "\n\nQueries:\n" + recorder.report()
+        )
+
+
+def get_query_budgets():
+    return {**DEFAULT_QUERY_BUDGETS, **get_config().query_budgets}
@@ -0,0 +1,26 @@
+"""
+User model signal receivers, connected in ``TgReactConfig.ready``.
+
+The modules doing the work (and DRF with them) are imported on first use so that
+``django.setup()`` stays cheap for processes that never serve the tg_react endpoints.
+"""
+import sys
+
+from tg_react.settings import get_config
+
+
+def invalidate_user_details(sender, instance, **kwargs):
+    if get_config().user_details_cache:
+        from tg_react.api.accounts.details_cache import (  # NOQA
+            invalidate_user_details as invalidate,
+        )
+
+        invalidate(instance.pk)
+
+
+def forget_user_snapshot(sender, instance, **kwargs):
+    # Snapshots only exist once tg_react.tokens has been imported
+    tokens = sys.modules.get("tg_react.tokens")
+
+    if tokens is not None:
+        tokens.forget_user(instance.pk)
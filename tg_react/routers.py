@@ -1,9 +1,137 @@
-from rest_framework.routers import DefaultRouter
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import NoReverseMatch, get_urlconf, path, reverse
+from rest_framework.response import Response
+from rest_framework.routers import APIRootView, DefaultRouter
+
+
+# Entries kept per API root view, keys only vary with the namespace, urlconf and root url kwargs
+API_ROOT_CACHE_SIZE = 128
+
+
+class CachedAPIRootView(APIRootView):
+    """APIRootView resolving the listed urls once, only the host part is added per request"""
+
+    root_cache = None
+
+    def get_root_paths(self, namespace, args, kwargs):
+        paths = {}
+        for key, url_name in self.api_root_dict.items():
+            if namespace:
+                url_name = namespace + ":" + url_name
+            try:
+                paths[key] = reverse(url_name, args=args, kwargs=kwargs)
+            except NoReverseMatch:
+                # Same as APIRootView, viewsets without a list route are left out
+                continue
+
+        return paths
+
+    def get(self, request, *args, **kwargs):
+        # Versioning schemes may rewrite the reversed urls per request
+        if self.root_cache is None or request.versioning_scheme is not None:
+            return super().get(request, *args, **kwargs)
+
+        namespace = request.resolver_match.namespace
+        key = (
+            namespace,
+            get_urlconf(settings.ROOT_URLCONF),
+            args,
+            tuple(sorted(kwargs.items())),
+        )
+
+        paths = self.root_cache.get(key)
+        if paths is None:
+            paths = self.get_root_paths(namespace, args, kwargs)
+            if len(self.root_cache) < API_ROOT_CACHE_SIZE:
+                self.root_cache[key] = paths
+
+        # Same as build_absolute_uri for each path, reversed paths are already quoted
+        scheme_host = request.build_absolute_uri("/")[:-1]
+
+        return Response({name: scheme_host + url for name, url in paths.items()})
 
 
 class SuffixlessRouter(DefaultRouter):
     """
     So far we have never used this feature and it just makes our life harder, so we disable it
+
+    With ``use_path=True`` the routes are ``path()`` patterns, the lookup uses the viewset's
+    ``lookup_value_converter`` (``str`` by default) instead of ``lookup_value_regex``.
     """
 
     include_format_suffixes = False
+    APIRootView = CachedAPIRootView
+
+    def __init__(self, *args, use_path=False, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.use_path = use_path
+        if use_path:
+            self.routes = [
+                route._replace(url=route.url.lstrip("^").rstrip("$"))
+                for route in self.routes
+            ]
+
+    def get_api_root_view(self, api_urls=None):
+        api_root_dict = {}
+        list_name = self.routes[0].name
+        for prefix, _viewset, basename in self.registry:
+            api_root_dict[prefix] = list_name.format(basename=basename)
+
+        return self.APIRootView.as_view(api_root_dict=api_root_dict, root_cache={})
+
+    def get_lookup_path(self, viewset, lookup_prefix=""):
+        """``path()`` counterpart of get_lookup_regex"""
+        lookup_field = getattr(viewset, "lookup_field", "pk")
+        lookup_url_kwarg = getattr(viewset, "lookup_url_kwarg", None) or lookup_field
+        converter = getattr(viewset, "lookup_value_converter", None)
+
+        if converter is None:
+            if getattr(viewset, "lookup_value_regex", None) is not None:
+                raise ImproperlyConfigured(
+                    f"{viewset.__name__} sets lookup_value_regex, set "
+                    "lookup_value_converter to register it with use_path=True"
+                )
+
+            converter = "str"
+
+        return f"<{converter}:{lookup_prefix}{lookup_url_kwarg}>"
+
+    def get_urls(self):
+        if not self.use_path:
+            return super().get_urls()
+
+        ret = []
+        for prefix, viewset, basename in self.registry:
+            lookup = self.get_lookup_path(viewset)
+
+            for route in self.get_routes(viewset):
+                # Only actions which actually exist on the viewset will be bound
+                mapping = self.get_method_map(viewset, route.mapping)
+                if not mapping:
+                    continue
+
+                route_path = route.url.format(
+                    prefix=prefix, lookup=lookup, trailing_slash=self.trailing_slash
+                )
+                # Same as SimpleRouter, an empty prefix must not add a leading slash
+                if not prefix:
+                    route_path = route_path.lstrip("/")
+
+                initkwargs = {
+                    **route.initkwargs,
+                    "basename": basename,
+                    "detail": route.detail,
+                }
+                view = viewset.as_view(mapping, **initkwargs)
+                ret.append(
+                    path(route_path, view, name=route.name.format(basename=basename))
+                )
+
+        if self.include_root_view:
+            ret.append(
+                path("", self.get_api_root_view(api_urls=ret), name=self.root_view_name)
+            )
+
+        return ret
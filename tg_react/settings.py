@@ -1,7 +1,13 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+
 from django.core.exceptions import ImproperlyConfigured
 from django.conf import settings
+from django.core.signals import setting_changed
 from django.utils.module_loading import import_string
 
+from tg_react.hooks import resolve_hooks
+
 
 # fields unconditionally excluded from user signup data
 USER_SIGNUP_SKIPPED_FIELDS = {
@@ -35,6 +41,14 @@ def get_email_case_sensitive():
     )  # True by default to maintain compatibility
 
 
+def get_email_lookup():
+    return getattr(settings, "TGR_EMAIL_LOOKUP", "exact")
+
+
+def get_normalized_email_field():
+    return getattr(settings, "TGR_NORMALIZED_EMAIL_FIELD", "normalized_email")
+
+
 def exclude_fields_from_user_details():
     return getattr(settings, "TGR_EXCLUDED_USER_FIELDS", [])
 
@@ -61,10 +75,139 @@ def get_user_extra_fields(validate=False):
     return res
 
 
+def get_user_details_compiled_representation():
+    return getattr(settings, "TGR_USER_DETAILS_COMPILED_REPRESENTATION", False)
+
+
+def get_email_delivery_config(validate=False):
+    conf = getattr(
+        settings, "TGR_EMAIL_DELIVERY", "tg_react.delivery.InlineEmailDelivery"
+    )
+
+    if validate and not isinstance(conf, (str, list, tuple)):
+        raise ImproperlyConfigured(
+            "settings.TGR_EMAIL_DELIVERY must be a module path or list[path, options]"
+        )
+
+    path = conf if isinstance(conf, str) else conf[0]
+    options = {} if isinstance(conf, str) else conf[1] or {}
+
+    return import_string(path), options
+
+
+def get_metrics_sink_config(validate=False):
+    conf = getattr(settings, "TGR_METRICS_SINK", "tg_react.metrics.NoopMetricsSink")
+
+    if validate and not isinstance(conf, (str, list, tuple)):
+        raise ImproperlyConfigured(
+            "settings.TGR_METRICS_SINK must be a module path or list[path, options]"
+        )
+
+    path = conf if isinstance(conf, str) else conf[0]
+    options = {} if isinstance(conf, str) else conf[1] or {}
+
+    return import_string(path), options
+
+
+def get_user_details_cache():
+    return getattr(settings, "TGR_USER_DETAILS_CACHE", False)
+
+
+def get_user_details_cache_alias():
+    return getattr(settings, "TGR_USER_DETAILS_CACHE_ALIAS", "default")
+
+
+def get_user_details_cache_timeout():
+    return getattr(settings, "TGR_USER_DETAILS_CACHE_TIMEOUT", 300)
+
+
+def get_auth_mode():
+    return getattr(settings, "TGR_AUTH_MODE", "session")
+
+
+def get_access_token_lifetime():
+    return getattr(settings, "TGR_ACCESS_TOKEN_LIFETIME", 300)
+
+
+def get_refresh_token_lifetime():
+    return getattr(settings, "TGR_REFRESH_TOKEN_LIFETIME", 14 * 24 * 3600)
+
+
+def get_token_user_cache_timeout():
+    return getattr(settings, "TGR_TOKEN_USER_CACHE_TIMEOUT", 60)
+
+
+def get_translation_domain():
+    return getattr(settings, "TGR_TRANSLATION_DOMAIN", "django")
+
+
+def get_translation_packages():
+    return getattr(settings, "TGR_TRANSLATION_PACKAGES", None)
+
+
+def get_use_orjson():
+    return getattr(settings, "TGR_USE_ORJSON", True)
+
+
+def get_precompile_email_templates():
+    return getattr(settings, "TGR_PRECOMPILE_EMAIL_TEMPLATES", False)
+
+
+def get_throttle_rates():
+    return getattr(settings, "TGR_THROTTLE_RATES", {})
+
+
+def parse_throttle_rate(rate):
+    """Parse a DRF style rate string (``"10/min"``) into (number of requests, period in seconds)"""
+    try:
+        num, period = rate.split("/")
+        return int(num), {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+    except (AttributeError, ValueError, KeyError, IndexError):
+        raise ImproperlyConfigured(
+            "settings.TGR_THROTTLE_RATES values must be rate strings like '10/min'"
+        )
+
+
+def get_auth_concurrency_limit():
+    return getattr(settings, "TGR_AUTH_CONCURRENCY_LIMIT", None)
+
+
+def get_auth_concurrency_retry_after():
+    return getattr(settings, "TGR_AUTH_CONCURRENCY_RETRY_AFTER", 1)
+
+
+def get_signed_password_reset_tokens():
+    return getattr(settings, "TGR_SIGNED_PASSWORD_RESET_TOKENS", False)
+
+
+def get_accept_legacy_password_reset_tokens():
+    return getattr(settings, "TGR_ACCEPT_LEGACY_PASSWORD_RESET_TOKENS", True)
+
+
+def get_query_budgets():
+    return getattr(settings, "TGR_QUERY_BUDGETS", {})
+
+
+def get_query_budget_action():
+    return getattr(settings, "TGR_QUERY_BUDGET_ACTION", "warn")
+
+
+def get_query_budget_max_repeats():
+    return getattr(settings, "TGR_QUERY_BUDGET_MAX_REPEATS", 1)
+
+
 def get_password_recovery_url():
     return getattr(settings, "TGR_PASSWORD_RECOVERY_URL", "/reset_password/%s")
 
 
+def get_password_hashing_processes():
+    return getattr(settings, "TGR_PASSWORD_HASHING_PROCESSES", None)
+
+
+def get_hook_executor_workers():
+    return getattr(settings, "TGR_HOOK_EXECUTOR_WORKERS", 4)
+
+
 def get_post_login_handler():
     return getattr(settings, "TGR_POST_LOGIN_HANDLER", None)
 
@@ -73,7 +216,70 @@ def get_post_logout_handler():
     return getattr(settings, "TGR_POST_LOGOUT_HANDLER", None)
 
 
+@dataclass(frozen=True)
+class TgReactSettings:
+    """Validated snapshot of all TGR_* settings
+
+    Built once by :func:`configure` (on first use or by the ``tg_react.checks`` system check) so
+    request handling code does not need to hit ``django.conf.settings`` or ``import_string`` on
+    every call. Use :func:`get_config` to access the current snapshot.
+    """
+
+    user_signup_fields: tuple
+    signup_skipped_fields: frozenset
+    email_case_sensitive: bool
+    # exact|lower|normalized, see tg_react.email_lookup
+    email_lookup: str
+    normalized_email_field: str
+    excluded_user_fields: tuple
+    # name -> (field class, field kwargs) with the dotted paths already imported
+    user_extra_fields: MappingProxyType
+    compiled_user_representation: bool
+    # see tg_react.api.accounts.details_cache
+    user_details_cache: bool
+    user_details_cache_alias: str
+    user_details_cache_timeout: int
+    # session|token|both, lifetimes and timeout in seconds, see tg_react.tokens
+    auth_mode: str
+    access_token_lifetime: int
+    refresh_token_lifetime: int
+    token_user_cache_timeout: int
+    # see tg_react.api.translations.catalog, packages None means all installed apps
+    translation_domain: str
+    translation_packages: tuple
+    # see tg_react.api.fast_json
+    use_orjson: bool
+    # (delivery class, options), see tg_react.delivery
+    email_delivery: tuple
+    precompile_email_templates: bool
+    # (sink class, options), see tg_react.metrics
+    metrics_sink: tuple
+    # scope -> (number of requests, period in seconds), see tg_react.throttling
+    throttle_rates: MappingProxyType
+    auth_concurrency_limit: int
+    auth_concurrency_retry_after: int
+    # url name -> max queries, merged over tg_react.querycount.DEFAULT_QUERY_BUDGETS
+    query_budgets: MappingProxyType
+    query_budget_action: str
+    query_budget_max_repeats: int
+    password_recovery_url: str
+    # see RecoveryPasswordSerializer.decode_uid_and_token_b64
+    signed_password_reset_tokens: bool
+    accept_legacy_password_reset_tokens: bool
+    password_hashing_processes: int
+    hook_executor_workers: int
+    # resolved tg_react.hooks.Hook instances
+    post_login_hooks: tuple
+    post_logout_hooks: tuple
+
+
+_config = None
+
+
 def configure():
+    """Validate TGR_* settings and build a fresh :class:`TgReactSettings` snapshot"""
+    global _config  # pylint: disable=global-statement
+
     if not isinstance(exclude_fields_from_user_details(), (list, tuple)):
         raise ImproperlyConfigured(
             "settings.TGR_EXCLUDED_USER_FIELDS must be list|tuple"
@@ -82,16 +288,17 @@ def configure():
     if not isinstance(get_user_signup_fields(), (list, tuple)):
         raise ImproperlyConfigured("settings.TGR_USER_SIGNUP_FIELDS must be list|tuple")
 
-    handler = get_post_login_handler()
-    if handler is not None and not isinstance(handler, str):
-        raise ImproperlyConfigured(
-            "settings.TGR_POST_LOGIN_HANDLER must be module path"
-        )
+    post_login_hooks = resolve_hooks(get_post_login_handler(), "TGR_POST_LOGIN_HANDLER")
+    post_logout_hooks = resolve_hooks(
+        get_post_logout_handler(), "TGR_POST_LOGOUT_HANDLER"
+    )
 
-    handler = get_post_logout_handler()
-    if handler is not None and not isinstance(handler, str):
+    if not isinstance(get_query_budgets(), dict):
+        raise ImproperlyConfigured("settings.TGR_QUERY_BUDGETS must be a dict")
+
+    if get_query_budget_action() not in ("warn", "raise"):
         raise ImproperlyConfigured(
-            "settings.TGR_POST_LOGOUT_HANDLER must be module path"
+            "settings.TGR_QUERY_BUDGET_ACTION must be either warn or raise"
         )
 
     recovery_url = get_password_recovery_url()
@@ -106,7 +313,134 @@ def configure():
             "formatting token for base64 encoded data"
         )
 
-    get_user_extra_fields(validate=True)
+    email_lookup = get_email_lookup()
+    if email_lookup not in ("exact", "lower", "normalized"):
+        raise ImproperlyConfigured(
+            "settings.TGR_EMAIL_LOOKUP must be one of exact, lower, normalized"
+        )
+
+    if not isinstance(get_normalized_email_field(), str):
+        raise ImproperlyConfigured("settings.TGR_NORMALIZED_EMAIL_FIELD must be str")
+
+    user_extra_fields = get_user_extra_fields(validate=True)
+
+    user_details_cache_alias = get_user_details_cache_alias()
+    if get_user_details_cache() and user_details_cache_alias not in settings.CACHES:
+        raise ImproperlyConfigured(
+            "settings.TGR_USER_DETAILS_CACHE_ALIAS must be a key of settings.CACHES"
+        )
+
+    auth_mode = get_auth_mode()
+    if auth_mode not in ("session", "token", "both"):
+        raise ImproperlyConfigured(
+            "settings.TGR_AUTH_MODE must be one of session, token, both"
+        )
+
+    translation_packages = get_translation_packages()
+    if translation_packages is not None and not isinstance(
+        translation_packages, (list, tuple)
+    ):
+        raise ImproperlyConfigured(
+            "settings.TGR_TRANSLATION_PACKAGES must be list|tuple or None"
+        )
+
+    throttle_rates = get_throttle_rates()
+    if not isinstance(throttle_rates, dict):
+        raise ImproperlyConfigured("settings.TGR_THROTTLE_RATES must be a dict")
+
+    concurrency_limit = get_auth_concurrency_limit()
+    if concurrency_limit is not None and (
+        not isinstance(concurrency_limit, int) or concurrency_limit < 1
+    ):
+        raise ImproperlyConfigured(
+            "settings.TGR_AUTH_CONCURRENCY_LIMIT must be a positive int or None"
+        )
+
+    hashing_processes = get_password_hashing_processes()
+    if hashing_processes is not None and (
+        not isinstance(hashing_processes, int) or hashing_processes < 1
+    ):
+        raise ImproperlyConfigured(
+            "settings.TGR_PASSWORD_HASHING_PROCESSES must be a positive int or None"
+        )
+
+    hook_executor_workers = get_hook_executor_workers()
+    if not isinstance(hook_executor_workers, int) or hook_executor_workers < 1:
+        raise ImproperlyConfigured(
+            "settings.TGR_HOOK_EXECUTOR_WORKERS must be a positive int"
+        )
+
+    _config = TgReactSettings(
+        user_signup_fields=tuple(get_user_signup_fields()),
+        signup_skipped_fields=frozenset(get_signup_skipped_fields()),
+        email_case_sensitive=get_email_case_sensitive(),
+        email_lookup=email_lookup,
+        normalized_email_field=get_normalized_email_field(),
+        excluded_user_fields=tuple(exclude_fields_from_user_details()),
+        user_extra_fields=MappingProxyType(
+            {
+                name: (field_class, kwargs)
+                for name, (field_class, kwargs) in user_extra_fields.items()
+            }
+        ),
+        compiled_user_representation=bool(get_user_details_compiled_representation()),
+        user_details_cache=bool(get_user_details_cache()),
+        user_details_cache_alias=user_details_cache_alias,
+        user_details_cache_timeout=get_user_details_cache_timeout(),
+        auth_mode=auth_mode,
+        access_token_lifetime=get_access_token_lifetime(),
+        refresh_token_lifetime=get_refresh_token_lifetime(),
+        token_user_cache_timeout=get_token_user_cache_timeout(),
+        translation_domain=get_translation_domain(),
+        translation_packages=(
+            tuple(translation_packages) if translation_packages is not None else None
+        ),
+        use_orjson=bool(get_use_orjson()),
+        email_delivery=get_email_delivery_config(validate=True),
+        precompile_email_templates=bool(get_precompile_email_templates()),
+        metrics_sink=get_metrics_sink_config(validate=True),
+        throttle_rates=MappingProxyType(
+            {
+                scope: parse_throttle_rate(rate)
+                for scope, rate in throttle_rates.items()
+                if rate is not None
+            }
+        ),
+        auth_concurrency_limit=concurrency_limit,
+        auth_concurrency_retry_after=get_auth_concurrency_retry_after(),
+        query_budgets=MappingProxyType(dict(get_query_budgets())),
+        query_budget_action=get_query_budget_action(),
+        query_budget_max_repeats=get_query_budget_max_repeats(),
+        password_recovery_url=recovery_url,
+        signed_password_reset_tokens=bool(get_signed_password_reset_tokens()),
+        accept_legacy_password_reset_tokens=bool(
+            get_accept_legacy_password_reset_tokens()
+        ),
+        password_hashing_processes=hashing_processes,
+        hook_executor_workers=hook_executor_workers,
+        post_login_hooks=post_login_hooks,
+        post_logout_hooks=post_logout_hooks,
+    )
+
+    return _config
+
+
+def get_config():
+    """Return the current settings snapshot, building it on first access"""
+    config = _config
+
+    if config is None:
+        config = configure()
+
+    return config
+
+
+def reload_config(*, setting, **kwargs):
+    global _config  # pylint: disable=global-statement
+
+    if setting.startswith("TGR_"):
+        # Rebuilt lazily by get_config so that a partially applied override does not raise here
+        _config = None
 
 
-configure()
+setting_changed.connect(reload_config)
@@ -0,0 +1,192 @@
+"""
+Load shedding for the password hashing account endpoints.
+
+Two layers, both checked in ``APIView.initial`` so rejected requests never reach the password
+hasher:
+
+- :class:`IPTokenBucketThrottle` and :class:`UsernameTokenBucketThrottle` are cache backed token
+  buckets configured through ``TGR_THROTTLE_RATES`` (``{"ip": "30/min", "username": "5/min"}``).
+  Rejected requests get a 429 with ``Retry-After``.
+- :class:`ConcurrencyLimitMixin` caps the number of these requests a worker process handles at
+  once (``TGR_AUTH_CONCURRENCY_LIMIT``). Requests over the limit get a 503 with ``Retry-After``.
+
+Both are disabled unless configured.
+"""
+import hashlib
+import inspect
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as default_cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException, ParseError
+from rest_framework.throttling import BaseThrottle
+
+from tg_react.settings import get_config
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Token bucket stored in the Django cache
+
+    A bucket holds at most N tokens and refills at N tokens per period, so bursts of up to N
+    requests are allowed. Updates are not atomic across processes, concurrent requests may
+    occasionally consume the same token.
+    """
+
+    cache = default_cache
+    timer = time.time
+    cache_format = "tgr_throttle_%(scope)s_%(ident)s"
+    scope = None
+
+    def __init__(self):
+        self.rate = get_config().throttle_rates.get(self.scope)
+        self.wait_seconds = None
+
+    def get_cache_key(self, request, view):
+        """Return the bucket cache key, or None to not throttle the request"""
+        raise NotImplementedError(".get_cache_key() must be overridden")
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        capacity, period = self.rate
+        now = self.timer()
+
+        tokens, updated = self.cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * capacity / period)
+
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) * period / capacity
+            return False
+
+        self.cache.set(key, (tokens - 1, now), period)
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    scope = "ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class UsernameTokenBucketThrottle(TokenBucketThrottle):
+    """Bucket per submitted username (or email), regardless of the client address"""
+
+    scope = "username"
+
+    def get_username(self, request):
+        try:
+            data = request.data
+        except ParseError:
+            return None
+
+        if not hasattr(data, "get"):
+            return None
+
+        username = data.get(get_user_model().USERNAME_FIELD) or data.get("email")
+        if not isinstance(username, str) or not username:
+            return None
+
+        return username.strip().lower()
+
+    def get_cache_key(self, request, view):
+        username = self.get_username(request)
+        if username is None:
+            return None
+
+        # Usernames may be long or contain characters memcached does not accept in keys
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": hashlib.sha256(username.encode("utf-8")).hexdigest(),
+        }
+
+
+class ServiceOverloaded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Server is busy, please try again later.")
+    default_code = "service_overloaded"
+
+    def __init__(self, wait=None, detail=None, code=None):
+        super().__init__(detail, code)
+        # Picked up by DRF's exception handler for the Retry-After header
+        self.wait = wait
+
+
+_semaphore = None
+_semaphore_lock = threading.Lock()
+
+
+def get_concurrency_semaphore():
+    """Return the worker wide semaphore, or None when TGR_AUTH_CONCURRENCY_LIMIT is not set"""
+    global _semaphore  # pylint: disable=global-statement
+
+    limit = get_config().auth_concurrency_limit
+    if limit is None:
+        return None
+
+    with _semaphore_lock:
+        if _semaphore is None or _semaphore[0] != limit:
+            _semaphore = (limit, threading.BoundedSemaphore(limit))
+
+        return _semaphore[1]
+
+
+class ConcurrencyLimitMixin:
+    """Reject requests with a 503 once TGR_AUTH_CONCURRENCY_LIMIT of them are in progress
+
+    The slot is taken after the authentication, permission and throttle checks and released when
+    ``dispatch`` returns or raises, also for exceptions DRF does not turn into a response. Shared
+    by all views using the mixin within a worker process.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        semaphore = get_concurrency_semaphore()
+        if semaphore is None:
+            return
+
+        if not semaphore.acquire(blocking=False):
+            raise ServiceOverloaded(wait=get_config().auth_concurrency_retry_after)
+
+        self._concurrency_slot = semaphore
+
+    def release_concurrency_slot(self):
+        semaphore = getattr(self, "_concurrency_slot", None)
+        if semaphore is not None:
+            self._concurrency_slot = None
+            semaphore.release()
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        except BaseException:
+            self.release_concurrency_slot()
+            raise
+
+        if inspect.isawaitable(response):
+            # Async views, the slot is taken and released while the coroutine runs
+            return self._release_after(response)
+
+        self.release_concurrency_slot()
+        return response
+
+    async def _release_after(self, response):
+        try:
+            return await response
+        finally:
+            self.release_concurrency_slot()
@@ -0,0 +1,207 @@
+"""
+Stateless signed access/refresh tokens, enabled with ``TGR_AUTH_MODE``.
+
+- ``"session"`` (default): login and signup only create a session, tokens are not accepted.
+- ``"token"``: login and signup return tokens instead of creating a session.
+- ``"both"``: login and signup create a session and return tokens.
+
+Access tokens are short lived (``TGR_ACCESS_TOKEN_LIFETIME`` seconds) and are sent as
+``Authorization: Bearer <token>``. :class:`SignedTokenAuthentication` verifies them with an HMAC
+check and takes the user from a per process snapshot that is reloaded after
+``TGR_TOKEN_USER_CACHE_TIMEOUT`` seconds, so most requests need no database or session access.
+Add it to ``DEFAULT_AUTHENTICATION_CLASSES`` to use it in your own APIs.
+
+Refresh tokens (``TGR_REFRESH_TOKEN_LIFETIME`` seconds) are exchanged for a new access token at
+``api-token-refresh``, which always checks the user in the database. Both tokens are bound to the
+password hash, changing the password invalidates them (access tokens in other processes once
+their user snapshot expires). Being stateless, tokens can not be revoked by logging out.
+"""
+import copy
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+from tg_react.settings import get_config
+
+
+ACCESS_TOKEN_SALT = "tg_react.tokens.access"
+REFRESH_TOKEN_SALT = "tg_react.tokens.refresh"
+
+USER_SNAPSHOT_CACHE_SIZE = 1024
+
+# pk -> (expires at, user, session auth hash), plain dict so reads need no lock
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def tokens_enabled():
+    return get_config().auth_mode != "session"
+
+
+def _make_token(user, salt):
+    return signing.dumps(
+        {"u": user.pk, "h": user.get_session_auth_hash()},
+        salt=salt,
+    )
+
+
+def make_access_token(user):
+    return _make_token(user, ACCESS_TOKEN_SALT)
+
+
+def make_refresh_token(user):
+    return _make_token(user, REFRESH_TOKEN_SALT)
+
+
+def issue_tokens(user):
+    """Return the token fields added to the login and signup responses"""
+    return {
+        "access": make_access_token(user),
+        "refresh": make_refresh_token(user),
+        "expires_in": get_config().access_token_lifetime,
+    }
+
+
+def _load_token(token, salt, max_age):
+    """Return (user pk, session auth hash) or None for invalid or expired tokens"""
+    try:
+        payload = signing.loads(token, salt=salt, max_age=max_age)
+        return payload["u"], payload["h"]
+
+    except (signing.BadSignature, TypeError, KeyError, ValueError):
+        return None
+
+
+def _load_user(pk):
+    user = get_user_model()._default_manager.filter(pk=pk).first()
+
+    if user is None or not getattr(user, "is_active", True):
+        return None
+
+    return user
+
+
+def remember_user(user):
+    """Store a snapshot of ``user`` for :func:`get_user_snapshot`"""
+    entry = (
+        time.monotonic() + get_config().token_user_cache_timeout,
+        user,
+        user.get_session_auth_hash(),
+    )
+
+    with _snapshots_lock:
+        if user.pk not in _snapshots and len(_snapshots) >= USER_SNAPSHOT_CACHE_SIZE:
+            _snapshots.pop(next(iter(_snapshots)))
+
+        _snapshots[user.pk] = entry
+
+    return entry
+
+
+def get_user_snapshot(pk):
+    """Return (user, session auth hash), the user is a copy that can be modified freely"""
+    entry = _snapshots.get(pk)
+
+    if entry is None or entry[0] <= time.monotonic():
+        user = _load_user(pk)
+        if user is None:
+            forget_user(pk)
+            return None, None
+
+        entry = remember_user(user)
+
+    return copy.copy(entry[1]), entry[2]
+
+
+def forget_user(pk):
+    with _snapshots_lock:
+        _snapshots.pop(pk, None)
+
+
+def clear_user_snapshots():
+    with _snapshots_lock:
+        _snapshots.clear()
+
+
+def authenticate_access_token(token):
+    """Return the user of a valid access token or None"""
+    loaded = _load_token(token, ACCESS_TOKEN_SALT, get_config().access_token_lifetime)
+    if loaded is None:
+        return None
+
+    pk, auth_hash = loaded
+
+    user, current_hash = get_user_snapshot(pk)
+    if user is None or not constant_time_compare(auth_hash, current_hash):
+        return None
+
+    return user
+
+
+def refresh_access_token(token):
+    """Return a new access token for a valid refresh token, or None"""
+    loaded = _load_token(token, REFRESH_TOKEN_SALT, get_config().refresh_token_lifetime)
+    if loaded is None:
+        return None
+
+    pk, auth_hash = loaded
+
+    user = _load_user(pk)
+    if user is None or not constant_time_compare(
+        auth_hash, user.get_session_auth_hash()
+    ):
+        return None
+
+    remember_user(user)
+
+    return make_access_token(user)
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """Authenticate ``Authorization: Bearer <access token>`` requests, see the module docs"""
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        if not tokens_enabled():
+            return None
+
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(_("Invalid token header."))
+
+        try:
+            token = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+        user = authenticate_access_token(token)
+        if user is None:
+            raise exceptions.AuthenticationFailed(_("Invalid or expired token."))
+
+        return user, token
+
+    def authenticate_header(self, request):
+        return self.keyword
+
+
+class TokenAuthenticationMixin:
+    """Try SignedTokenAuthentication before the view's own authentication classes when
+    ``TGR_AUTH_MODE`` enables tokens"""
+
+    def get_authenticators(self):
+        authenticators = super().get_authenticators()
+
+        if tokens_enabled():
+            authenticators = [SignedTokenAuthentication(), *authenticators]
+
+        return authenticators